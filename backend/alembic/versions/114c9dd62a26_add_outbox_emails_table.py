@@ -0,0 +1,58 @@
+"""add_outbox_emails_table
+
+Revision ID: 114c9dd62a26
+Revises: 283243cb5559
+Create Date: 2026-10-18 09:12:44.318120
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '114c9dd62a26'
+down_revision: Union[str, Sequence[str], None] = '283243cb5559'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('outbox_emails',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('campaign_id', sa.Integer(), nullable=False),
+    sa.Column('campaign_contact_id', sa.Integer(), nullable=False),
+    sa.Column('job_id', sa.String(length=36), nullable=False),
+    sa.Column('status', sa.Enum('DRAFT', 'READY', 'SENDING', 'SENT', 'FAILED', name='outboxstatus'), nullable=False),
+    sa.Column('sequence_step', sa.Integer(), nullable=False),
+    sa.Column('template_override', sa.String(length=255), nullable=True),
+    sa.Column('idempotency_key', sa.String(length=100), nullable=False),
+    sa.Column('attempts', sa.Integer(), nullable=False),
+    sa.Column('last_error', sa.Text(), nullable=True),
+    sa.Column('provider_message_id', sa.String(length=255), nullable=True),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.Column('updated_at', sa.DateTime(), nullable=False),
+    sa.Column('sent_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['campaign_id'], ['campaigns.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['campaign_contact_id'], ['campaign_contacts.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('idempotency_key')
+    )
+    op.create_index(op.f('ix_outbox_emails_id'), 'outbox_emails', ['id'], unique=False)
+    op.create_index(op.f('ix_outbox_emails_user_id'), 'outbox_emails', ['user_id'], unique=False)
+    op.create_index(op.f('ix_outbox_emails_job_id'), 'outbox_emails', ['job_id'], unique=False)
+    op.create_index('ix_outbox_emails_job_status', 'outbox_emails', ['job_id', 'status'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_outbox_emails_job_status', table_name='outbox_emails')
+    op.drop_index(op.f('ix_outbox_emails_job_id'), table_name='outbox_emails')
+    op.drop_index(op.f('ix_outbox_emails_user_id'), table_name='outbox_emails')
+    op.drop_index(op.f('ix_outbox_emails_id'), table_name='outbox_emails')
+    op.drop_table('outbox_emails')
+    sa.Enum(name='outboxstatus').drop(op.get_bind(), checkfirst=True)
@@ -0,0 +1,48 @@
+"""drop_outbox_draft_status
+
+Revision ID: 3e8a5c1f7b90
+Revises: f1b6c9d3a7e2
+Create Date: 2026-10-18 20:42:11.806532
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '3e8a5c1f7b90'
+down_revision: Union[str, Sequence[str], None] = 'f1b6c9d3a7e2'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _recreate_status_type(values: Sequence[str]) -> None:
+    """Swap the outboxstatus enum type for one with these values (PostgreSQL can't drop a value)."""
+    labels = ", ".join(f"'{value}'" for value in values)
+    op.execute("ALTER TYPE outboxstatus RENAME TO outboxstatus_old")
+    op.execute(f"CREATE TYPE outboxstatus AS ENUM ({labels})")
+    op.execute(
+        "ALTER TABLE outbox_emails ALTER COLUMN status TYPE outboxstatus "
+        "USING status::text::outboxstatus"
+    )
+    op.execute("DROP TYPE outboxstatus_old")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Nothing ever created drafts: a leftover one would never be sent
+    op.execute(sa.text(
+        "UPDATE outbox_emails SET status = 'FAILED', last_error = 'Draft status removed' "
+        "WHERE status = 'DRAFT'"
+    ))
+
+    if op.get_bind().dialect.name == "postgresql":
+        _recreate_status_type(['READY', 'SENDING', 'SENT', 'FAILED'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "postgresql":
+        _recreate_status_type(['DRAFT', 'READY', 'SENDING', 'SENT', 'FAILED'])
@@ -0,0 +1,34 @@
+"""add_followup_due_index
+
+Revision ID: 5a2c8e71d4b3
+Revises: e9b3f5a07c21
+Create Date: 2026-10-18 15:12:40.318205
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5a2c8e71d4b3'
+down_revision: Union[str, Sequence[str], None] = 'e9b3f5a07c21'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_campaign_contacts_followup_due',
+        'campaign_contacts',
+        ['next_follow_up_scheduled_at'],
+        unique=False,
+        postgresql_where=sa.text("status = 'contacted' AND next_follow_up_scheduled_at IS NOT NULL")
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_campaign_contacts_followup_due', table_name='campaign_contacts')
@@ -0,0 +1,26 @@
+"""add_gmail_history_id
+
+Revision ID: 5c2e8a91d4f7
+Revises: 114c9dd62a26
+Create Date: 2026-10-18 10:02:31.554208
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '5c2e8a91d4f7'
+down_revision: Union[str, Sequence[str], None] = '114c9dd62a26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('gmail_history_id', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'gmail_history_id')
@@ -0,0 +1,182 @@
+"""campaign_stats_deltas
+
+Revision ID: 7db685f1db26
+Revises: 3e8a5c1f7b90
+Create Date: 2026-10-18 22:14:37.402118
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '7db685f1db26'
+down_revision: Union[str, Sequence[str], None] = '3e8a5c1f7b90'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# One delta row per (campaign, status) changed by a statement: appended
+# only, concurrent senders never wait on the same counter row
+DELTAS_FUNCTION = """
+CREATE OR REPLACE FUNCTION campaign_contacts_stats_deltas() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        INSERT INTO campaign_stats_deltas (campaign_id, status, contact_count, emails_sent)
+        SELECT campaign_id, status, COUNT(*), SUM(email_sequence_step)
+        FROM new_rows
+        GROUP BY campaign_id, status;
+    ELSIF TG_OP = 'DELETE' THEN
+        INSERT INTO campaign_stats_deltas (campaign_id, status, contact_count, emails_sent)
+        SELECT campaign_id, status, -COUNT(*), -SUM(email_sequence_step)
+        FROM old_rows
+        GROUP BY campaign_id, status;
+    ELSE
+        INSERT INTO campaign_stats_deltas (campaign_id, status, contact_count, emails_sent)
+        SELECT campaign_id, status, SUM(contacts), SUM(emails)
+        FROM (
+            SELECT campaign_id, status, 1 AS contacts, email_sequence_step AS emails FROM new_rows
+            UNION ALL
+            SELECT campaign_id, status, -1, -email_sequence_step FROM old_rows
+        ) changes
+        GROUP BY campaign_id, status
+        HAVING SUM(contacts) <> 0 OR SUM(emails) <> 0;
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+# Transition tables can't be used with a column list (UPDATE OF ...)
+TRIGGERS = [
+    """
+    CREATE TRIGGER campaign_contacts_stats_insert
+    AFTER INSERT ON campaign_contacts REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION campaign_contacts_stats_deltas()
+    """,
+    """
+    CREATE TRIGGER campaign_contacts_stats_update
+    AFTER UPDATE ON campaign_contacts REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION campaign_contacts_stats_deltas()
+    """,
+    """
+    CREATE TRIGGER campaign_contacts_stats_delete
+    AFTER DELETE ON campaign_contacts REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION campaign_contacts_stats_deltas()
+    """,
+]
+
+# Previous version (d5a9e2b7c318): one counter row updated by every change
+APPLY_FUNCTION = """
+CREATE OR REPLACE FUNCTION campaign_stats_apply(
+    p_campaign_id integer,
+    p_status varchar,
+    p_contacts integer,
+    p_emails integer,
+    p_last_email_sent_at timestamp
+) RETURNS void AS $$
+BEGIN
+    INSERT INTO campaign_stats (campaign_id, status, contact_count, emails_sent, last_email_sent_at)
+    VALUES (p_campaign_id, p_status, p_contacts, p_emails, p_last_email_sent_at)
+    ON CONFLICT (campaign_id, status) DO UPDATE SET
+        contact_count = campaign_stats.contact_count + EXCLUDED.contact_count,
+        emails_sent = campaign_stats.emails_sent + EXCLUDED.emails_sent,
+        last_email_sent_at = GREATEST(campaign_stats.last_email_sent_at, EXCLUDED.last_email_sent_at);
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+ROW_TRIGGER_FUNCTION = """
+CREATE OR REPLACE FUNCTION campaign_contacts_update_stats() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.campaign_id = NEW.campaign_id AND OLD.status = NEW.status THEN
+        PERFORM campaign_stats_apply(
+            NEW.campaign_id, NEW.status, 0,
+            NEW.email_sequence_step - OLD.email_sequence_step, NEW.last_email_sent_at
+        );
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM campaign_stats_apply(OLD.campaign_id, OLD.status, -1, -OLD.email_sequence_step, NULL);
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM campaign_stats_apply(NEW.campaign_id, NEW.status, 1, NEW.email_sequence_step, NEW.last_email_sent_at);
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+ROW_TRIGGER = """
+CREATE TRIGGER campaign_contacts_stats
+AFTER INSERT OR DELETE OR UPDATE OF campaign_id, status, email_sequence_step, last_email_sent_at
+ON campaign_contacts
+FOR EACH ROW EXECUTE FUNCTION campaign_contacts_update_stats();
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('campaign_stats_deltas',
+    sa.Column('id', sa.BigInteger(), nullable=False),
+    sa.Column('campaign_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=50), nullable=False),
+    sa.Column('contact_count', sa.Integer(), nullable=False),
+    sa.Column('emails_sent', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['campaign_id'], ['campaigns.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_index('ix_campaign_stats_deltas_campaign_id', 'campaign_stats_deltas', ['campaign_id'], unique=False)
+
+    # Last send of a campaign: MAX over its contacts, read from this index
+    op.create_index(
+        'ix_campaign_contacts_campaign_last_sent',
+        'campaign_contacts',
+        ['campaign_id', 'last_email_sent_at'],
+        unique=False
+    )
+    op.drop_column('campaign_stats', 'last_email_sent_at')
+
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute("DROP TRIGGER IF EXISTS campaign_contacts_stats ON campaign_contacts")
+    op.execute("DROP FUNCTION IF EXISTS campaign_contacts_update_stats()")
+    op.execute("DROP FUNCTION IF EXISTS campaign_stats_apply(integer, varchar, integer, integer, timestamp)")
+
+    op.execute(DELTAS_FUNCTION)
+    for trigger in TRIGGERS:
+        op.execute(trigger)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('campaign_stats', sa.Column('last_email_sent_at', sa.DateTime(), nullable=True))
+
+    if op.get_bind().dialect.name == "postgresql":
+        for trigger in ("campaign_contacts_stats_insert", "campaign_contacts_stats_update", "campaign_contacts_stats_delete"):
+            op.execute(f"DROP TRIGGER IF EXISTS {trigger} ON campaign_contacts")
+        op.execute("DROP FUNCTION IF EXISTS campaign_contacts_stats_deltas()")
+
+        # Rebuild the counters, then go back to the row trigger
+        op.execute("LOCK TABLE campaign_contacts IN SHARE MODE")
+        op.execute("DELETE FROM campaign_stats")
+        op.execute("""
+            INSERT INTO campaign_stats (campaign_id, status, contact_count, emails_sent, last_email_sent_at)
+            SELECT campaign_id, status, COUNT(*), COALESCE(SUM(email_sequence_step), 0), MAX(last_email_sent_at)
+            FROM campaign_contacts
+            GROUP BY campaign_id, status
+        """)
+        op.execute(APPLY_FUNCTION)
+        op.execute(ROW_TRIGGER_FUNCTION)
+        op.execute(ROW_TRIGGER)
+
+    op.drop_index('ix_campaign_contacts_campaign_last_sent', table_name='campaign_contacts')
+    op.drop_index('ix_campaign_stats_deltas_campaign_id', table_name='campaign_stats_deltas')
+    op.drop_table('campaign_stats_deltas')
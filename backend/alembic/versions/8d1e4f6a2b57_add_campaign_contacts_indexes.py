@@ -0,0 +1,106 @@
+"""add_campaign_contacts_indexes
+
+Revision ID: 8d1e4f6a2b57
+Revises: 5a2c8e71d4b3
+Create Date: 2026-10-18 16:02:11.507942
+
+"""
+from typing import Sequence, Union
+import logging
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = '8d1e4f6a2b57'
+down_revision: Union[str, Sequence[str], None] = '5a2c8e71d4b3'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Duplicate (campaign, prospect) links: all but the most advanced one in the
+# sequence (oldest on ties)
+DUPLICATE_CONTACTS = """
+    SELECT id FROM (
+        SELECT id, ROW_NUMBER() OVER (
+            PARTITION BY campaign_id, prospect_id
+            ORDER BY email_sequence_step DESC, id
+        ) AS row_number
+        FROM campaign_contacts
+    ) ranked
+    WHERE ranked.row_number > 1
+"""
+
+# Removed rows are copied here first (deleting a contact cascades to its
+# outbox emails and staged emails). Kept on downgrade: drop them by hand.
+ARCHIVE_TABLES = {
+    "campaign_contacts": "campaign_contacts_dedup_archive",
+    "outbox_emails": "outbox_emails_dedup_archive",
+    "staged_emails": "staged_emails_dedup_archive",
+}
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Remove duplicate links before adding the unique constraint, archiving
+    # them with the rows that reference them
+    bind = op.get_bind()
+    duplicates = bind.execute(sa.text(f"SELECT COUNT(*) FROM ({DUPLICATE_CONTACTS}) duplicates")).scalar()
+
+    if duplicates:
+        op.execute(f"""
+            CREATE TABLE {ARCHIVE_TABLES['campaign_contacts']} AS
+            SELECT * FROM campaign_contacts WHERE id IN ({DUPLICATE_CONTACTS})
+        """)
+        for table in ("outbox_emails", "staged_emails"):
+            op.execute(f"""
+                CREATE TABLE {ARCHIVE_TABLES[table]} AS
+                SELECT * FROM {table}
+                WHERE campaign_contact_id IN (SELECT id FROM {ARCHIVE_TABLES['campaign_contacts']})
+            """)
+
+        # Plain text in the archive: later migrations may change the enum type
+        if bind.dialect.name == "postgresql":
+            op.execute(f"ALTER TABLE {ARCHIVE_TABLES['outbox_emails']} ALTER COLUMN status TYPE VARCHAR(20)")
+
+        op.execute(f"""
+            DELETE FROM campaign_contacts
+            WHERE id IN (SELECT id FROM {ARCHIVE_TABLES['campaign_contacts']})
+        """)
+
+        logging.getLogger("alembic.runtime.migration").warning(
+            "Removed %s duplicate campaign_contacts rows, archived with their "
+            "outbox and staged emails in %s",
+            duplicates, ", ".join(ARCHIVE_TABLES.values())
+        )
+
+    op.create_unique_constraint(
+        'uq_campaign_contacts_campaign_prospect',
+        'campaign_contacts',
+        ['campaign_id', 'prospect_id']
+    )
+    op.create_index(
+        'ix_campaign_contacts_campaign_status',
+        'campaign_contacts',
+        ['campaign_id', 'status'],
+        unique=False
+    )
+    op.create_index(
+        'ix_campaign_contacts_open_threads',
+        'campaign_contacts',
+        ['campaign_id'],
+        unique=False,
+        postgresql_where=sa.text("status = 'contacted' AND email_thread_id IS NOT NULL")
+    )
+
+    # campaign_id is the leading column of both new indexes
+    op.drop_index(op.f('ix_campaign_contacts_campaign_id'), table_name='campaign_contacts')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.create_index(op.f('ix_campaign_contacts_campaign_id'), 'campaign_contacts', ['campaign_id'], unique=False)
+    op.drop_index('ix_campaign_contacts_open_threads', table_name='campaign_contacts')
+    op.drop_index('ix_campaign_contacts_campaign_status', table_name='campaign_contacts')
+    op.drop_constraint('uq_campaign_contacts_campaign_prospect', 'campaign_contacts', type_='unique')
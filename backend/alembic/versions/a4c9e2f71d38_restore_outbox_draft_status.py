@@ -0,0 +1,46 @@
+"""restore_outbox_draft_status
+
+Revision ID: a4c9e2f71d38
+Revises: 7db685f1db26
+Create Date: 2026-10-19 09:12:48.530217
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a4c9e2f71d38'
+down_revision: Union[str, Sequence[str], None] = '7db685f1db26'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _recreate_status_type(values: Sequence[str]) -> None:
+    """Swap the outboxstatus enum type for one with these values (PostgreSQL can't drop a value)."""
+    labels = ", ".join(f"'{value}'" for value in values)
+    op.execute("ALTER TYPE outboxstatus RENAME TO outboxstatus_old")
+    op.execute(f"CREATE TYPE outboxstatus AS ENUM ({labels})")
+    op.execute(
+        "ALTER TABLE outbox_emails ALTER COLUMN status TYPE outboxstatus "
+        "USING status::text::outboxstatus"
+    )
+    op.execute("DROP TYPE outboxstatus_old")
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Drafts: rows of a bulk send written but not handed to the workers yet
+    if op.get_bind().dialect.name == "postgresql":
+        _recreate_status_type(['DRAFT', 'READY', 'SENDING', 'SENT', 'FAILED'])
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    # Hand the leftover drafts to the workers (the stale sweep enqueues them)
+    op.execute(sa.text("UPDATE outbox_emails SET status = 'READY' WHERE status = 'DRAFT'"))
+
+    if op.get_bind().dialect.name == "postgresql":
+        _recreate_status_type(['READY', 'SENDING', 'SENT', 'FAILED'])
@@ -0,0 +1,26 @@
+"""add_outlook_delta_link
+
+Revision ID: a83f0c6e2b19
+Revises: 5c2e8a91d4f7
+Create Date: 2026-10-18 10:41:07.902113
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a83f0c6e2b19'
+down_revision: Union[str, Sequence[str], None] = '5c2e8a91d4f7'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('outlook_delta_link', sa.String(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'outlook_delta_link')
@@ -0,0 +1,33 @@
+"""add_campaign_contacts_keyset_index
+
+Revision ID: b7c2d9e4f130
+Revises: 8d1e4f6a2b57
+Create Date: 2026-10-18 16:47:35.902116
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b7c2d9e4f130'
+down_revision: Union[str, Sequence[str], None] = '8d1e4f6a2b57'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_index(
+        'ix_campaign_contacts_campaign_added',
+        'campaign_contacts',
+        ['campaign_id', 'added_at', 'id'],
+        unique=False
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_campaign_contacts_campaign_added', table_name='campaign_contacts')
@@ -0,0 +1,47 @@
+"""add_campaign_products_unique_link
+
+Revision ID: c3f8a1d6e924
+Revises: b7c2d9e4f130
+Create Date: 2026-10-18 17:21:08.443571
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c3f8a1d6e924'
+down_revision: Union[str, Sequence[str], None] = 'b7c2d9e4f130'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Remove duplicate (campaign, product) links, keep the oldest one
+    op.execute("""
+        DELETE FROM campaign_products
+        WHERE id IN (
+            SELECT id FROM (
+                SELECT id, ROW_NUMBER() OVER (
+                    PARTITION BY campaign_id, product_id
+                    ORDER BY id
+                ) AS row_number
+                FROM campaign_products
+            ) ranked
+            WHERE ranked.row_number > 1
+        )
+    """)
+
+    op.create_unique_constraint(
+        'uq_campaign_products_campaign_product',
+        'campaign_products',
+        ['campaign_id', 'product_id']
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_constraint('uq_campaign_products_campaign_product', 'campaign_products', type_='unique')
@@ -0,0 +1,28 @@
+"""add_oauth_token_expiry
+
+Revision ID: c4d71b2f9e05
+Revises: a83f0c6e2b19
+Create Date: 2026-10-18 11:52:33.418207
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'c4d71b2f9e05'
+down_revision: Union[str, Sequence[str], None] = 'a83f0c6e2b19'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column('users', sa.Column('gmail_token_expires_at', sa.DateTime(), nullable=True))
+    op.add_column('users', sa.Column('outlook_token_expires_at', sa.DateTime(), nullable=True))
+
+
+def downgrade() -> None:
+    op.drop_column('users', 'outlook_token_expires_at')
+    op.drop_column('users', 'gmail_token_expires_at')
@@ -0,0 +1,111 @@
+"""add_campaign_stats_table
+
+Revision ID: d5a9e2b7c318
+Revises: c3f8a1d6e924
+Create Date: 2026-10-18 17:58:44.120937
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'd5a9e2b7c318'
+down_revision: Union[str, Sequence[str], None] = 'c3f8a1d6e924'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+# Adds a delta to the counters of one (campaign, status)
+APPLY_FUNCTION = """
+CREATE OR REPLACE FUNCTION campaign_stats_apply(
+    p_campaign_id integer,
+    p_status varchar,
+    p_contacts integer,
+    p_emails integer,
+    p_last_email_sent_at timestamp
+) RETURNS void AS $$
+BEGIN
+    INSERT INTO campaign_stats (campaign_id, status, contact_count, emails_sent, last_email_sent_at)
+    VALUES (p_campaign_id, p_status, p_contacts, p_emails, p_last_email_sent_at)
+    ON CONFLICT (campaign_id, status) DO UPDATE SET
+        contact_count = campaign_stats.contact_count + EXCLUDED.contact_count,
+        emails_sent = campaign_stats.emails_sent + EXCLUDED.emails_sent,
+        last_email_sent_at = GREATEST(campaign_stats.last_email_sent_at, EXCLUDED.last_email_sent_at);
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+TRIGGER_FUNCTION = """
+CREATE OR REPLACE FUNCTION campaign_contacts_update_stats() RETURNS trigger AS $$
+BEGIN
+    IF TG_OP = 'UPDATE' AND OLD.campaign_id = NEW.campaign_id AND OLD.status = NEW.status THEN
+        PERFORM campaign_stats_apply(
+            NEW.campaign_id, NEW.status, 0,
+            NEW.email_sequence_step - OLD.email_sequence_step, NEW.last_email_sent_at
+        );
+        RETURN NULL;
+    END IF;
+
+    IF TG_OP IN ('UPDATE', 'DELETE') THEN
+        PERFORM campaign_stats_apply(OLD.campaign_id, OLD.status, -1, -OLD.email_sequence_step, NULL);
+    END IF;
+
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM campaign_stats_apply(NEW.campaign_id, NEW.status, 1, NEW.email_sequence_step, NEW.last_email_sent_at);
+    END IF;
+
+    RETURN NULL;
+END;
+$$ LANGUAGE plpgsql;
+"""
+
+TRIGGER = """
+CREATE TRIGGER campaign_contacts_stats
+AFTER INSERT OR DELETE OR UPDATE OF campaign_id, status, email_sequence_step, last_email_sent_at
+ON campaign_contacts
+FOR EACH ROW EXECUTE FUNCTION campaign_contacts_update_stats();
+"""
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('campaign_stats',
+    sa.Column('campaign_id', sa.Integer(), nullable=False),
+    sa.Column('status', sa.String(length=50), nullable=False),
+    sa.Column('contact_count', sa.Integer(), nullable=False),
+    sa.Column('emails_sent', sa.Integer(), nullable=False),
+    sa.Column('last_email_sent_at', sa.DateTime(), nullable=True),
+    sa.ForeignKeyConstraint(['campaign_id'], ['campaigns.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('campaign_id', 'status')
+    )
+
+    # Counters are maintained by a trigger: PostgreSQL only (the app falls
+    # back to an aggregate query on other databases)
+    if op.get_bind().dialect.name != "postgresql":
+        return
+
+    op.execute(APPLY_FUNCTION)
+    op.execute(TRIGGER_FUNCTION)
+
+    # Backfill existing campaigns, then keep counting from the trigger
+    op.execute("LOCK TABLE campaign_contacts IN SHARE MODE")
+    op.execute("""
+        INSERT INTO campaign_stats (campaign_id, status, contact_count, emails_sent, last_email_sent_at)
+        SELECT campaign_id, status, COUNT(*), COALESCE(SUM(email_sequence_step), 0), MAX(last_email_sent_at)
+        FROM campaign_contacts
+        GROUP BY campaign_id, status
+    """)
+    op.execute(TRIGGER)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    if op.get_bind().dialect.name == "postgresql":
+        op.execute("DROP TRIGGER IF EXISTS campaign_contacts_stats ON campaign_contacts")
+        op.execute("DROP FUNCTION IF EXISTS campaign_contacts_update_stats()")
+        op.execute("DROP FUNCTION IF EXISTS campaign_stats_apply(integer, varchar, integer, integer, timestamp)")
+
+    op.drop_table('campaign_stats')
@@ -0,0 +1,46 @@
+"""add_staged_emails_table
+
+Revision ID: e9b3f5a07c21
+Revises: c4d71b2f9e05
+Create Date: 2026-10-18 13:05:18.660431
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e9b3f5a07c21'
+down_revision: Union[str, Sequence[str], None] = 'c4d71b2f9e05'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table('staged_emails',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('campaign_id', sa.Integer(), nullable=False),
+    sa.Column('campaign_contact_id', sa.Integer(), nullable=False),
+    sa.Column('sequence_step', sa.Integer(), nullable=False),
+    sa.Column('template_name', sa.String(length=255), nullable=False),
+    sa.Column('template_version', sa.String(length=64), nullable=False),
+    sa.Column('provider', sa.String(length=20), nullable=False),
+    sa.Column('payload', sa.LargeBinary(), nullable=False),
+    sa.Column('created_at', sa.DateTime(), nullable=False),
+    sa.ForeignKeyConstraint(['campaign_id'], ['campaigns.id'], ondelete='CASCADE'),
+    sa.ForeignKeyConstraint(['campaign_contact_id'], ['campaign_contacts.id'], ondelete='CASCADE'),
+    sa.PrimaryKeyConstraint('id'),
+    sa.UniqueConstraint('campaign_contact_id', 'sequence_step', name='uq_staged_emails_contact_step')
+    )
+    op.create_index(op.f('ix_staged_emails_id'), 'staged_emails', ['id'], unique=False)
+    op.create_index(op.f('ix_staged_emails_campaign_id'), 'staged_emails', ['campaign_id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_staged_emails_campaign_id'), table_name='staged_emails')
+    op.drop_index(op.f('ix_staged_emails_id'), table_name='staged_emails')
+    op.drop_table('staged_emails')
@@ -10,6 +10,7 @@ from sqlalchemy.orm import Session
 from app.db import SessionLocal
 from app.models.user import User
 from app.services.auth import SECRET_KEY, ALGORITHM
+from app.services.imports.executor import release_slot, try_acquire_slot
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="api/auth/login")
 
@@ -45,3 +46,17 @@ def get_current_user(
         raise credentials_exception
     
     return user
+
+def import_slot() -> Generator:
+    """Hold a slot of the import pool for the request (503 when it is full)."""
+    if not try_acquire_slot():
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many imports in progress, please retry in a moment",
+            headers={"Retry-After": "30"},
+        )
+
+    try:
+        yield
+    finally:
+        release_slot()
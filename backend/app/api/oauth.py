@@ -16,6 +16,7 @@ from app.services.oauth import (
     exchange_outlook_code,
     get_outlook_user_info,
 )
+from app.services.email.gmail_client import invalidate_gmail_service
 
 router = APIRouter(tags=["oauth"])
 
@@ -95,6 +96,8 @@ async def gmail_callback(
         user.gmail_email = user_info["email"]
         user.gmail_access_token = tokens["access_token"]
         user.gmail_refresh_token = tokens["refresh_token"]
+        user.gmail_token_expires_at = tokens["expires_at"]
+        invalidate_gmail_service(user.id)
         
         # Set as default provider if none set
         if not user.default_email_provider:
@@ -166,6 +169,7 @@ async def outlook_callback(
         user.outlook_email = user_info["email"]
         user.outlook_access_token = tokens["access_token"]
         user.outlook_refresh_token = tokens["refresh_token"]
+        user.outlook_token_expires_at = tokens["expires_at"]
         
         # Set as default provider if none set
         if not user.default_email_provider:
@@ -201,6 +205,8 @@ async def disconnect_provider(
         current_user.gmail_email = None
         current_user.gmail_access_token = None
         current_user.gmail_refresh_token = None
+        current_user.gmail_token_expires_at = None
+        invalidate_gmail_service(current_user.id)
         
         # Switch default provider if needed
         if current_user.default_email_provider == "gmail":
@@ -211,6 +217,7 @@ async def disconnect_provider(
         current_user.outlook_email = None
         current_user.outlook_access_token = None
         current_user.outlook_refresh_token = None
+        current_user.outlook_token_expires_at = None
         
         # Switch default provider if needed
         if current_user.default_email_provider == "outlook":
@@ -2,6 +2,7 @@
 Application configuration.
 """
 import os
+import tempfile
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -25,3 +26,74 @@ MICROSOFT_CLIENT_ID = os.getenv("MICROSOFT_CLIENT_ID")
 MICROSOFT_CLIENT_SECRET = os.getenv("MICROSOFT_CLIENT_SECRET")
 MICROSOFT_TENANT_ID = os.getenv("MICROSOFT_TENANT_ID", "common")
 MICROSOFT_REDIRECT_URI = os.getenv("MICROSOFT_REDIRECT_URI", "http://localhost:8000/api/oauth/outlook/callback")
+
+# Redis / RQ (background workers)
+# Leave REDIS_URL unset to run jobs in-process (dev & tests)
+REDIS_URL = os.getenv("REDIS_URL")
+IN_PROCESS_WORKERS = int(os.getenv("IN_PROCESS_WORKERS", 4))
+
+# Outbox
+OUTBOX_QUEUE_NAME = os.getenv("OUTBOX_QUEUE_NAME", "outbox")
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", 3))
+OUTBOX_RETRY_DELAY = int(os.getenv("OUTBOX_RETRY_DELAY", 60))  # seconds before the 1st retry, doubled at each attempt
+OUTBOX_SENDING_TIMEOUT = int(os.getenv("OUTBOX_SENDING_TIMEOUT", 600))  # seconds 'sending' before the worker is presumed dead
+OUTBOX_STALE_AFTER = int(os.getenv("OUTBOX_STALE_AFTER", 1800))  # seconds 'ready' / 'draft' before the email is enqueued again (lost job, interrupted request)
+
+# Follow-up scheduler (see app/services/outbox/scheduler.py)
+SCHEDULER_LOOKAHEAD = int(os.getenv("SCHEDULER_LOOKAHEAD", 900))  # seconds of upcoming follow-ups kept in memory
+SCHEDULER_REFRESH_INTERVAL = int(os.getenv("SCHEDULER_REFRESH_INTERVAL", 60))  # seconds between reloads
+
+# Campaign stats (see app/services/campaign_stats.py)
+CAMPAIGN_STATS_COMPACT_INTERVAL = int(os.getenv("CAMPAIGN_STATS_COMPACT_INTERVAL", 60))  # seconds between compactions in the API process
+
+# Email sending
+# Max concurrent provider calls per user (bulk sends + outbox workers)
+EMAIL_SEND_CONCURRENCY = int(os.getenv("EMAIL_SEND_CONCURRENCY", 4))
+
+# Gmail API service cache (see app/services/email/gmail_client.py)
+GMAIL_SERVICE_CACHE_SIZE = int(os.getenv("GMAIL_SERVICE_CACHE_SIZE", 256))
+GMAIL_SERVICE_CACHE_TTL = int(os.getenv("GMAIL_SERVICE_CACHE_TTL", 1800))  # seconds
+
+# Microsoft Graph HTTP client (see app/services/email/graph_client.py)
+GRAPH_POOL_SIZE = int(os.getenv("GRAPH_POOL_SIZE", 20))  # keep >= concurrent Outlook calls
+GRAPH_CONNECT_TIMEOUT = float(os.getenv("GRAPH_CONNECT_TIMEOUT", 5))  # seconds
+GRAPH_READ_TIMEOUT = float(os.getenv("GRAPH_READ_TIMEOUT", 30))  # seconds
+GRAPH_MAX_RETRIES = int(os.getenv("GRAPH_MAX_RETRIES", 3))
+
+# OAuth tokens are refreshed this long before they expire
+OAUTH_REFRESH_MARGIN = int(os.getenv("OAUTH_REFRESH_MARGIN", 300))  # seconds
+
+# Provider rate limits, per user (see app/services/email/rate_limiter.py)
+GMAIL_QUOTA_UNITS_PER_SECOND = int(os.getenv("GMAIL_QUOTA_UNITS_PER_SECOND", 250))
+GRAPH_REQUESTS_PER_SECOND = float(os.getenv("GRAPH_REQUESTS_PER_SECOND", 16))  # ~10,000 per 10 min per mailbox
+RATE_LIMIT_MAX_RETRIES = int(os.getenv("RATE_LIMIT_MAX_RETRIES", 5))  # retries of a throttled call
+
+# Email templates (see app/services/email/template_renderer.py)
+# Auto-reload re-reads edited templates without a restart: dev only
+EMAIL_TEMPLATES_AUTO_RELOAD = os.getenv("EMAIL_TEMPLATES_AUTO_RELOAD", "false").lower() in ("1", "true", "yes")
+EMAIL_TEMPLATES_BYTECODE_DIR = os.getenv("EMAIL_TEMPLATES_BYTECODE_DIR")  # default: system temp dir
+
+# Email staging (see app/services/email/email_staging.py)
+EMAIL_STAGING_QUEUE_NAME = os.getenv("EMAIL_STAGING_QUEUE_NAME", "staging")
+EMAIL_STAGING_CHUNK_SIZE = int(os.getenv("EMAIL_STAGING_CHUNK_SIZE", 250))
+EMAIL_STAGING_PROCESS_THRESHOLD = int(os.getenv("EMAIL_STAGING_PROCESS_THRESHOLD", 1000))  # emails, below: in-process
+EMAIL_STAGING_PROCESSES = int(os.getenv("EMAIL_STAGING_PROCESSES", os.cpu_count() or 2))
+
+# Bulk linking of prospects / products to campaigns (see app/services/campaign_links.py)
+CAMPAIGN_LINK_CHUNK_SIZE = int(os.getenv("CAMPAIGN_LINK_CHUNK_SIZE", 1000))  # ids per INSERT
+CAMPAIGN_LINK_MAX_IDS = int(os.getenv("CAMPAIGN_LINK_MAX_IDS", 100000))  # ids per NDJSON request
+
+# Excel imports (see app/services/imports/)
+IMPORT_CHUNK_SIZE = int(os.getenv("IMPORT_CHUNK_SIZE", 1000))  # rows per INSERT ... ON CONFLICT
+IMPORT_MAX_REPORTED_ERRORS = int(os.getenv("IMPORT_MAX_REPORTED_ERRORS", 100))  # row errors returned to the client
+IMPORT_WORKERS = int(os.getenv("IMPORT_WORKERS", 2))  # threads parsing / writing imports (see imports/executor.py)
+IMPORT_MAX_QUEUED = int(os.getenv("IMPORT_MAX_QUEUED", 4))  # imports waiting for a thread, past that: 503
+
+# Background import jobs (see app/services/imports/jobs.py)
+IMPORT_QUEUE_NAME = os.getenv("IMPORT_QUEUE_NAME", "imports")
+# Uploaded files wait here for their job: must be shared with the RQ workers
+IMPORT_UPLOAD_DIR = os.getenv("IMPORT_UPLOAD_DIR", os.path.join(tempfile.gettempdir(), "spine-imports"))
+IMPORT_JOB_STALE_AFTER = int(os.getenv("IMPORT_JOB_STALE_AFTER", 300))  # seconds without heartbeat before a running job is resumed
+IMPORT_JOB_TIMEOUT = int(os.getenv("IMPORT_JOB_TIMEOUT", 3600))  # seconds before RQ kills a run (resumed by the stale job sweep)
+IMPORT_MAX_ATTEMPTS = int(os.getenv("IMPORT_MAX_ATTEMPTS", 3))
+IMPORT_RETRY_DELAY = int(os.getenv("IMPORT_RETRY_DELAY", 30))  # seconds before the 1st retry, doubled at each attempt (keep below IMPORT_JOB_STALE_AFTER)
@@ -0,0 +1,97 @@
+"""
+Keyset (cursor) pagination helpers.
+
+A cursor holds the sort value and id of the last row of a page: the next
+page starts strictly after that row. Unlike OFFSET, a page costs the same
+whatever its position in the list.
+
+Rows with a NULL sort value always come last, in both directions.
+"""
+from datetime import datetime
+from typing import Any, List, Tuple
+import base64
+import json
+
+from sqlalchemy import and_, or_, tuple_
+
+
+class InvalidCursor(ValueError):
+    """Raised when a cursor is malformed or was built for another sort."""
+
+
+def encode_cursor(sort: str, descending: bool, value: Any, row_id: int) -> str:
+    """
+    Build the opaque cursor pointing after a row.
+
+    Args:
+        sort: Sort key the page was built with
+        descending: Sort direction the page was built with
+        value: Sort value of the last row (datetime, int, str or None)
+        row_id: ID of the last row (tie-breaker)
+    """
+    is_datetime = isinstance(value, datetime)
+    data = {
+        "s": sort,
+        "d": descending,
+        "v": value.isoformat() if is_datetime else value,
+        "dt": is_datetime,
+        "id": row_id,
+    }
+    return base64.urlsafe_b64encode(json.dumps(data).encode('utf-8')).decode('ascii')
+
+
+def decode_cursor(cursor: str, sort: str, descending: bool) -> Tuple[Any, int]:
+    """
+    Read a cursor built by encode_cursor().
+
+    Returns:
+        (sort value, row id) of the last row of the previous page
+
+    Raises:
+        InvalidCursor: If the cursor can't be read or doesn't match the sort
+    """
+    try:
+        data = json.loads(base64.urlsafe_b64decode(cursor.encode('ascii')))
+        value = datetime.fromisoformat(data["v"]) if data["dt"] else data["v"]
+        row_id = int(data["id"])
+    except (ValueError, KeyError, TypeError):
+        raise InvalidCursor("Invalid cursor")
+
+    if data.get("s") != sort or data.get("d") != descending:
+        raise InvalidCursor("Cursor was built for another sort order")
+
+    return value, row_id
+
+
+def keyset_filter(column, id_column, value: Any, row_id: int, descending: bool, nullable: bool = False):
+    """
+    Filter keeping the rows after (value, row_id) in keyset order.
+
+    On NOT NULL columns this is a row comparison, (column, id) > (value,
+    row_id), which an index on (..., column, id) serves directly.
+    """
+    if not nullable:
+        if descending:
+            return tuple_(column, id_column) < tuple_(value, row_id)
+        return tuple_(column, id_column) > tuple_(value, row_id)
+
+    after_id = id_column < row_id if descending else id_column > row_id
+
+    if value is None:
+        # Already in the NULLs (last): only the remaining NULL rows
+        return and_(column.is_(None), after_id)
+
+    after_value = column < value if descending else column > value
+
+    return or_(
+        after_value,
+        and_(column == value, after_id),
+        column.is_(None)
+    )
+
+
+def keyset_order_by(column, id_column, descending: bool) -> List:
+    """ORDER BY matching keyset_filter() (NULLs last, id as tie-breaker)."""
+    if descending:
+        return [column.desc().nulls_last(), id_column.desc()]
+    return [column.asc().nulls_last(), id_column.asc()]
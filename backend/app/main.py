@@ -1,13 +1,31 @@
 """
 Spine CRM - FastAPI Application
 """
+from contextlib import asynccontextmanager
+import asyncio
+
 from fastapi import FastAPI
+from fastapi.concurrency import run_in_threadpool
 from fastapi.middleware.cors import CORSMiddleware
 
 # Import the main API router (contains all sub-routers)
 from app.routes import api_router
 from app.api.oauth import router as oauth_router
 from app.routes import auth, prospects, products, campaigns
+from app.services.campaign_stats import compact_campaign_stats_periodically
+from app.services.imports.jobs import resume_import_jobs
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Import jobs interrupted by a restart pick up where they stopped
+    await run_in_threadpool(resume_import_jobs)
+
+    # Campaign stats deltas folded in the background (scheduler or not)
+    compaction = asyncio.create_task(compact_campaign_stats_periodically())
+    yield
+    compaction.cancel()
+
 
 # Create FastAPI app
 app = FastAPI(
@@ -15,7 +33,8 @@ app = FastAPI(
     description="Email automation CRM for prospect management",
     version="1.0.0",
     docs_url="/docs",
-    redoc_url="/redoc"
+    redoc_url="/redoc",
+    lifespan=lifespan
 )
 
 # CORS configuration
@@ -7,6 +7,10 @@ from .product import Product
 from .prospect import Prospect, ProspectSource, ProspectStatus
 from .prospect_product import ProspectProduct
 from .campaign import Campaign, CampaignContact, CampaignProduct  # ← AJOUTÉ
+from .outbox import OutboxEmail, OutboxStatus
+from .staged_email import StagedEmail
+from .campaign_stats import CampaignStat, CampaignStatDelta
+from .import_job import ImportJob, ImportJobError, ImportJobStatus
 
 __all__ = [
     "Base",
@@ -19,4 +23,12 @@ __all__ = [
     "Campaign",             
     "CampaignContact",      
     "CampaignProduct",      
+    "OutboxEmail",
+    "OutboxStatus",
+    "StagedEmail",
+    "CampaignStat",
+    "CampaignStatDelta",
+    "ImportJob",
+    "ImportJobError",
+    "ImportJobStatus",
 ]
\ No newline at end of file
@@ -1,7 +1,7 @@
 """
 Campaign model for tracking trade show leads.
 """
-from sqlalchemy import Column, Integer, String, Text, Date, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Text, Date, DateTime, ForeignKey, Enum, Index, UniqueConstraint, text
 from sqlalchemy.orm import relationship
 from datetime import datetime
 import enum
@@ -58,7 +58,8 @@ class CampaignContact(Base):
     __tablename__ = "campaign_contacts"
     
     id = Column(Integer, primary_key=True, index=True)
-    campaign_id = Column(Integer, ForeignKey("campaigns.id"), nullable=False, index=True)
+    # Indexé par ix_campaign_contacts_campaign_status et uq_campaign_contacts_campaign_prospect
+    campaign_id = Column(Integer, ForeignKey("campaigns.id"), nullable=False)
     prospect_id = Column(Integer, ForeignKey("prospects.id"), nullable=False, index=True)
     
     # Status du contact dans cette campagne
@@ -109,6 +110,29 @@ class CampaignContact(Base):
     campaign = relationship("Campaign", back_populates="contacts")
     prospect = relationship("Prospect")
 
+    __table_args__ = (
+        # Un prospect n'est lié qu'une fois à une campagne
+        UniqueConstraint('campaign_id', 'prospect_id', name='uq_campaign_contacts_campaign_prospect'),
+        # Contacts d'une campagne filtrés par statut
+        Index('ix_campaign_contacts_campaign_status', 'campaign_id', 'status'),
+        # Pagination (keyset) des contacts d'une campagne
+        Index('ix_campaign_contacts_campaign_added', 'campaign_id', 'added_at', 'id'),
+        # Dernier envoi d'une campagne (MAX, voir services/campaign_stats.py)
+        Index('ix_campaign_contacts_campaign_last_sent', 'campaign_id', 'last_email_sent_at'),
+        # Threads ouverts (vérification / synchro des réponses)
+        Index(
+            'ix_campaign_contacts_open_threads',
+            'campaign_id',
+            postgresql_where=text("status = 'contacted' AND email_thread_id IS NOT NULL"),
+        ),
+        # Relances dues, toutes campagnes confondues (scheduler)
+        Index(
+            'ix_campaign_contacts_followup_due',
+            'next_follow_up_scheduled_at',
+            postgresql_where=text("status = 'contacted' AND next_follow_up_scheduled_at IS NOT NULL"),
+        ),
+    )
+
 
 class CampaignProduct(Base):
     """
@@ -126,4 +150,9 @@ class CampaignProduct(Base):
     
     # Relations
     campaign = relationship("Campaign", back_populates="products")
-    product = relationship("Product")
\ No newline at end of file
+    product = relationship("Product")
+
+    __table_args__ = (
+        # Un produit n'est lié qu'une fois à une campagne
+        UniqueConstraint('campaign_id', 'product_id', name='uq_campaign_products_campaign_product'),
+    )
\ No newline at end of file
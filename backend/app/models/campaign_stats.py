@@ -0,0 +1,50 @@
+"""
+Campaign stats models - contact counters of a campaign, kept up to date by the database.
+"""
+from sqlalchemy import BigInteger, Column, Integer, String, ForeignKey, Index
+
+from app.models.base import Base
+
+
+class CampaignStat(Base):
+    """
+    Counters of the contacts of a campaign, one row per contact status.
+
+    Compacted from campaign_stats_deltas (see services/campaign_stats.py):
+    never written by the app otherwise. Current value = this row + the
+    deltas not compacted yet.
+    """
+    __tablename__ = "campaign_stats"
+
+    campaign_id = Column(Integer, ForeignKey("campaigns.id", ondelete="CASCADE"), primary_key=True)
+    status = Column(String(50), primary_key=True)
+
+    contact_count = Column(Integer, default=0, nullable=False)
+    emails_sent = Column(Integer, default=0, nullable=False)  # Somme des email_sequence_step
+
+    def __repr__(self) -> str:
+        return f"<CampaignStat campaign={self.campaign_id} status={self.status} contacts={self.contact_count}>"
+
+
+class CampaignStatDelta(Base):
+    """
+    Change of the counters of one (campaign, status), appended by the
+    campaign_contacts_stats_* triggers (PostgreSQL) for each statement on
+    campaign_contacts. Insert-only: concurrent writers never lock the same
+    row. Folded into campaign_stats by compact_campaign_stats().
+    """
+    __tablename__ = "campaign_stats_deltas"
+
+    id = Column(BigInteger, primary_key=True)
+    campaign_id = Column(Integer, ForeignKey("campaigns.id", ondelete="CASCADE"), nullable=False)
+    status = Column(String(50), nullable=False)
+
+    contact_count = Column(Integer, nullable=False)  # Peut être négatif
+    emails_sent = Column(Integer, nullable=False)
+
+    __table_args__ = (
+        Index('ix_campaign_stats_deltas_campaign_id', 'campaign_id'),
+    )
+
+    def __repr__(self) -> str:
+        return f"<CampaignStatDelta campaign={self.campaign_id} status={self.status} contacts={self.contact_count:+}>"
@@ -0,0 +1,79 @@
+"""
+Import job models - prospect / product imports running in the background.
+"""
+from sqlalchemy import Column, Integer, String, Text, Boolean, DateTime, ForeignKey, Enum, Index
+from datetime import datetime
+import enum
+
+from app.models.base import Base
+
+
+class ImportJobStatus(str, enum.Enum):
+    """Lifecycle of an import job."""
+    QUEUED = "queued"         # En attente d'un worker (ou d'un nouvel essai)
+    RUNNING = "running"       # Pris par un worker (reprise si plus de heartbeat)
+    COMPLETED = "completed"   # Toutes les lignes traitées
+    FAILED = "failed"         # Arrêté après IMPORT_MAX_ATTEMPTS essais
+
+
+class ImportJob(Base):
+    """
+    One uploaded file imported in the background.
+
+    Rows are committed chunk by chunk together with the counters: after a
+    worker restart, the import resumes at rows_processed.
+    """
+    __tablename__ = "import_jobs"
+
+    # UUID, returned to the client as job_id
+    id = Column(String(36), primary_key=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+
+    # "prospects" ou "products"
+    kind = Column(String(20), nullable=False)
+    filename = Column(String(255), nullable=False)
+    # Copie du fichier, supprimée quand le job est terminé (completed / failed)
+    file_path = Column(String(500), nullable=False)
+    update_existing = Column(Boolean, default=False, nullable=False)
+
+    status = Column(Enum(ImportJobStatus), default=ImportJobStatus.QUEUED, nullable=False)
+    attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(Text, nullable=True)
+
+    # Progression (lignes de données, en-tête exclu)
+    rows_processed = Column(Integer, default=0, nullable=False)
+    total_rows = Column(Integer, nullable=True)  # Connu à la fin du job
+    created = Column(Integer, default=0, nullable=False)
+    updated = Column(Integer, default=0, nullable=False)
+    skipped = Column(Integer, default=0, nullable=False)
+    error_count = Column(Integer, default=0, nullable=False)
+
+    # Métadonnées (updated_at sert de heartbeat pendant le job)
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    started_at = Column(DateTime, nullable=True)
+    finished_at = Column(DateTime, nullable=True)
+
+    __table_args__ = (
+        Index('ix_import_jobs_status_updated', 'status', 'updated_at'),
+    )
+
+    def __repr__(self) -> str:
+        return f"<ImportJob {self.id} {self.kind} status={self.status}>"
+
+
+class ImportJobError(Base):
+    """One row rejected by an import job (full error report)."""
+    __tablename__ = "import_job_errors"
+
+    id = Column(Integer, primary_key=True)
+    job_id = Column(String(36), ForeignKey("import_jobs.id", ondelete="CASCADE"), nullable=False)
+
+    # Ligne Excel + valeur de la clé (email / item_number)
+    row = Column(Integer, nullable=False)
+    value = Column(String(255), nullable=True)
+    message = Column(Text, nullable=False)
+
+    __table_args__ = (
+        Index('ix_import_job_errors_job_row', 'job_id', 'row'),
+    )
@@ -0,0 +1,62 @@
+"""
+Outbox model - durable queue of campaign emails waiting to be sent by workers.
+"""
+from sqlalchemy import Column, Integer, String, Text, DateTime, ForeignKey, Enum, Index
+from sqlalchemy.orm import relationship
+from datetime import datetime
+import enum
+
+from app.models.base import Base
+
+
+class OutboxStatus(str, enum.Enum):
+    """Lifecycle of an outbox email."""
+    DRAFT = "draft"         # Écrit par l'API, pas encore confié aux workers
+    READY = "ready"         # En attente d'un worker
+    SENDING = "sending"     # Pris par un worker
+    SENT = "sent"           # Envoyé chez le provider
+    FAILED = "failed"       # Abandonné après OUTBOX_MAX_ATTEMPTS
+
+
+class OutboxEmail(Base):
+    """
+    One email to send to one campaign contact.
+    Rows are created by the API and consumed by the outbox workers.
+    """
+    __tablename__ = "outbox_emails"
+
+    id = Column(Integer, primary_key=True, index=True)
+    user_id = Column(Integer, ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True)
+    campaign_id = Column(Integer, ForeignKey("campaigns.id", ondelete="CASCADE"), nullable=False)
+    campaign_contact_id = Column(Integer, ForeignKey("campaign_contacts.id", ondelete="CASCADE"), nullable=False)
+
+    # Bulk send this email belongs to (returned to the client as job_id)
+    job_id = Column(String(36), nullable=False, index=True)
+
+    status = Column(Enum(OutboxStatus), default=OutboxStatus.READY, nullable=False)
+
+    # Étape de séquence visée + template éventuel
+    sequence_step = Column(Integer, nullable=False)
+    template_override = Column(String(255), nullable=True)
+
+    # Anti double-send: "<campaign_contact_id>:<sequence_step>"
+    idempotency_key = Column(String(100), nullable=False, unique=True)
+
+    attempts = Column(Integer, default=0, nullable=False)
+    last_error = Column(Text, nullable=True)
+    provider_message_id = Column(String(255), nullable=True)
+
+    # Métadonnées
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
+    updated_at = Column(DateTime, default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False)
+    sent_at = Column(DateTime, nullable=True)
+
+    # Relations
+    contact = relationship("CampaignContact")
+
+    __table_args__ = (
+        Index('ix_outbox_emails_job_status', 'job_id', 'status'),
+    )
+
+    def __repr__(self) -> str:
+        return f"<OutboxEmail {self.id} contact={self.campaign_contact_id} status={self.status}>"
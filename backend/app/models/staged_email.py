@@ -0,0 +1,36 @@
+"""
+Staged email model - campaign emails rendered and encoded ahead of the send window.
+"""
+from sqlalchemy import Column, Integer, String, LargeBinary, DateTime, ForeignKey, UniqueConstraint
+from datetime import datetime
+
+from app.models.base import Base
+
+
+class StagedEmail(Base):
+    """
+    Finished payload of one email for one campaign contact and sequence step.
+    Used (then deleted) by the send path instead of rendering again, as long
+    as the version still matches (template + rendered data unchanged).
+    """
+    __tablename__ = "staged_emails"
+    __table_args__ = (
+        UniqueConstraint("campaign_contact_id", "sequence_step", name="uq_staged_emails_contact_step"),
+    )
+
+    id = Column(Integer, primary_key=True, index=True)
+    campaign_id = Column(Integer, ForeignKey("campaigns.id", ondelete="CASCADE"), nullable=False, index=True)
+    campaign_contact_id = Column(Integer, ForeignKey("campaign_contacts.id", ondelete="CASCADE"), nullable=False)
+
+    # Étape de séquence + version (hash du template ET des données rendues)
+    sequence_step = Column(Integer, nullable=False)
+    template_name = Column(String(255), nullable=False)
+    template_version = Column(String(64), nullable=False)
+
+    # gmail = MIME encodé (raw), outlook = sujet + HTML
+    provider = Column(String(20), nullable=False)
+
+    # JSON compressé (zlib), voir app/services/email/email_staging.py
+    payload = Column(LargeBinary, nullable=False)
+
+    created_at = Column(DateTime, default=datetime.utcnow, nullable=False)
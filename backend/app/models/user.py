@@ -2,9 +2,10 @@
 User model for authentication
 """
 
-from sqlalchemy import String, Boolean
+from sqlalchemy import String, Boolean, DateTime
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 from typing import Optional, TYPE_CHECKING
+from datetime import datetime
 
 from app.models.base import Base, TimestampMixin
 
@@ -31,12 +32,16 @@ class User(Base, TimestampMixin):
     gmail_email: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     gmail_access_token: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     gmail_refresh_token: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    gmail_token_expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)  # UTC
+    gmail_history_id: Mapped[Optional[str]] = mapped_column(String, nullable=True)  # Reply sync checkpoint
 
     # Outlook Oauth fields
     outlook_connected: Mapped[bool] = mapped_column(Boolean, default=False)
     outlook_email: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     outlook_access_token: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     outlook_refresh_token: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    outlook_token_expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)  # UTC
+    outlook_delta_link: Mapped[Optional[str]] = mapped_column(String, nullable=True)  # Reply sync checkpoint
 
     # Default provider
     default_email_provider: Mapped[Optional[str]] = mapped_column(String, nullable=True)
@@ -11,6 +11,7 @@ from .prospect_import import router as prospect_import_router
 from .campaign_emails import router as campaign_emails_router
 from .email_responses import router as email_responses_router
 from .followups import router as followups_router
+from .import_jobs import router as import_jobs_router
 
 # Create the main API router
 api_router = APIRouter()
@@ -19,6 +20,7 @@ api_router = APIRouter()
 api_router.include_router(auth_router, prefix="/api/auth", tags=["auth"])  
 api_router.include_router(product_import_router) 
 api_router.include_router(prospect_import_router) 
+api_router.include_router(import_jobs_router)
 api_router.include_router(products_router)         
 api_router.include_router(prospects_router)
 api_router.include_router(prospect_products_router)
@@ -12,12 +12,17 @@ from app.models.campaign import Campaign, CampaignContact
 from app.models.prospect import Prospect
 from app.schemas.email import (
     EmailSendResponse,
-    BulkEmailSendResponse,
+    BulkEmailJobResponse,
+    EmailJobProgress,
+    EmailStagingJobResponse,
     EmailPreviewResponse,
 )
 from app.api.deps import get_current_user
-from app.services.email.email_service import EmailService
+from app.core.config import EMAIL_STAGING_QUEUE_NAME
+from app.services.email.email_service import EmailService, run_staging_job
 from app.services.email.template_renderer import email_renderer
+from app.services.outbox import enqueue_campaign_emails, get_job_progress
+from app.services.task_queue import enqueue
 
 router = APIRouter(prefix="/campaigns", tags=["campaign-emails"])
 
@@ -110,7 +115,11 @@ def send_email_to_contact(
 
 # ==================== ENVOI EN MASSE =====================
 
-@router.post("/{campaign_id}/emails/send-bulk", response_model=BulkEmailSendResponse)
+@router.post(
+    "/{campaign_id}/emails/send-bulk",
+    response_model=BulkEmailJobResponse,
+    status_code=status.HTTP_202_ACCEPTED
+)
 def send_bulk_emails(
     campaign_id: int,
     contact_ids: Optional[List[int]] = Body(None),
@@ -120,7 +129,9 @@ def send_bulk_emails(
     current_user: User = Depends(get_current_user)
 ):
     """
-    Send emails to multiple campaign contacts in bulk.
+    Queue emails to multiple campaign contacts in the outbox.
+    Emails are sent by background workers, poll the returned job for progress
+    (no job when every contact was already queued or sent).
     """
     # Verify campaign exists and belongs to user
     campaign = db.query(Campaign).filter(
@@ -162,54 +173,131 @@ def send_bulk_emails(
             detail="No contacts found matching the criteria"
         )
     
-    # Send emails
-    email_service = EmailService(db)
+    # Queue emails in the outbox
+    result = enqueue_campaign_emails(
+        db=db,
+        campaign=campaign,
+        contacts=contacts,
+        user=current_user,
+        template_override=template_override
+    )
     
-    try:
-        result = email_service.send_bulk_campaign_emails(
-            campaign=campaign,
-            contacts=contacts,
-            user=current_user
+    job_id = result["job_id"]
+
+    return BulkEmailJobResponse(
+        job_id=job_id,
+        queued=result["queued"],
+        skipped=result["skipped"],
+        status_url=f"/api/campaigns/{campaign_id}/emails/jobs/{job_id}" if job_id else None
+    )
+
+
+@router.get("/{campaign_id}/emails/jobs/{job_id}", response_model=EmailJobProgress)
+def get_bulk_email_job(
+    campaign_id: int,
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get progress counters of a bulk send job.
+    """
+    progress = get_job_progress(db, current_user.id, job_id, campaign_id=campaign_id)
+    
+    if not progress:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Email job {job_id} not found"
         )
-        
-        # Build detailed response with sent contacts
-        sent_contacts = []
-        for contact in contacts:
-            prospect = db.query(Prospect).filter(Prospect.id == contact.prospect_id).first()
-            if prospect and contact.last_email_sent_at:
-                sent_contacts.append({
-                    "prospect_id": prospect.id,
-                    "email": prospect.email,
-                    "name": f"{prospect.first_name} {prospect.last_name}",
-                    "sequence_step": contact.email_sequence_step,
-                    "sent_at": contact.last_email_sent_at.isoformat()
-                })
-        
-        return BulkEmailSendResponse(
-            total=result["total"],
-            sent=result["sent"],
-            failed=result["failed"],
-            errors=result["errors"],
-            sent_contacts=sent_contacts
+    
+    return EmailJobProgress(**progress)
+
+
+# ==================== PRÉ-RENDU (STAGING) =====================
+
+@router.post(
+    "/{campaign_id}/emails/stage",
+    response_model=EmailStagingJobResponse,
+    status_code=status.HTTP_202_ACCEPTED
+)
+def stage_campaign_emails(
+    campaign_id: int,
+    contact_ids: Optional[List[int]] = Body(None),
+    status_filter: Optional[str] = Body(None),
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Queue the rendering and encoding of each contact's next email ahead of
+    the send window (background worker, CPU bound).
+    Later sends (bulk, follow-ups, outbox) use the staged emails directly.
+    """
+    # Verify campaign exists and belongs to user
+    campaign = db.query(Campaign).filter(
+        Campaign.id == campaign_id,
+        Campaign.user_id == current_user.id
+    ).first()
+    
+    if not campaign:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Campaign {campaign_id} not found"
         )
-        
-    except Exception as e:
+    
+    # Check user has email configured
+    if not current_user.has_email_configured:
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to send bulk emails: {str(e)}"
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="You must connect Gmail or Outlook before staging emails"
         )
+    
+    # Build query for contacts to stage
+    query = db.query(CampaignContact).filter(
+        CampaignContact.campaign_id == campaign_id
+    )
+    
+    # Filter by specific contact IDs
+    if contact_ids:
+        query = query.filter(CampaignContact.prospect_id.in_(contact_ids))
+    
+    # Filter by status
+    if status_filter:
+        query = query.filter(CampaignContact.status == status_filter)
+    
+    contact_count = query.count()
+    
+    if not contact_count:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="No contacts found matching the criteria"
+        )
+    
+    enqueue(
+        EMAIL_STAGING_QUEUE_NAME,
+        run_staging_job,
+        campaign_id,
+        current_user.id,
+        contact_ids,
+        status_filter
+    )
+    
+    return EmailStagingJobResponse(contacts=contact_count)
 
 
 # ==================== RACCOURCIS PRATIQUES =====================
 
-@router.post("/{campaign_id}/emails/send-initial", response_model=BulkEmailSendResponse)
+@router.post(
+    "/{campaign_id}/emails/send-initial",
+    response_model=BulkEmailJobResponse,
+    status_code=status.HTTP_202_ACCEPTED
+)
 def send_initial_emails(
     campaign_id: int,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    Send initial emails to all pending contacts.
+    Queue initial emails to all pending contacts.
     """
     return send_bulk_emails(
         campaign_id=campaign_id,
@@ -221,7 +309,11 @@ def send_initial_emails(
     )
 
 
-@router.post("/{campaign_id}/emails/send-followup", response_model=BulkEmailSendResponse)
+@router.post(
+    "/{campaign_id}/emails/send-followup",
+    response_model=BulkEmailJobResponse,
+    status_code=status.HTTP_202_ACCEPTED
+)
 def send_followup_emails(
     campaign_id: int,
     status_filter: Optional[str] = Body("contacted"),
@@ -229,7 +321,7 @@ def send_followup_emails(
     current_user: User = Depends(get_current_user)
 ):
     """
-    Send follow-up emails to contacted prospects.
+    Queue follow-up emails to contacted prospects.
     """
     return send_bulk_emails(
         campaign_id=campaign_id,
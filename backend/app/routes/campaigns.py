@@ -1,9 +1,13 @@
 """
 API routes for campaign (trade show) management.
 """
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, status
+from fastapi.concurrency import run_in_threadpool
+from sqlalchemy import and_, not_
+from sqlalchemy.exc import IntegrityError
 from sqlalchemy.orm import Session
-from typing import List, Optional
+from typing import List, Literal, Optional
+from datetime import datetime
 
 from app.db import get_db
 from app.models.user import User
@@ -12,11 +16,107 @@ from app.schemas.campaign import (
     CampaignCreate,
     CampaignUpdate,
     CampaignResponse,
+    CampaignContactListItem,
+    CampaignContactPage,
+    CampaignProductListItem,
 )
 from app.api.deps import get_current_user
+from app.core.config import CAMPAIGN_LINK_CHUNK_SIZE, CAMPAIGN_LINK_MAX_IDS
+from app.core.pagination import (
+    InvalidCursor,
+    decode_cursor,
+    encode_cursor,
+    keyset_filter,
+    keyset_order_by,
+)
+from app.services.campaign_links import CampaignLinker, iter_ndjson_ids
+from app.services.campaign_stats import (
+    campaign_count_columns,
+    contacts_by_status,
+    get_contact_stats,
+)
 
 router = APIRouter(prefix="/campaigns", tags=["campaigns"])
 
+# ==================== HELPERS =====================
+
+def _campaign_response(
+    campaign: Campaign,
+    contact_count: int,
+    product_count: int,
+    status_counts: Optional[dict] = None
+) -> CampaignResponse:
+    """Campaign with its counters, as returned by the API."""
+    return CampaignResponse.model_validate(campaign).model_copy(update={
+        "contact_count": contact_count,
+        "product_count": product_count,
+        "contacts_by_status": status_counts,
+    })
+
+
+def _get_campaign_or_404(db: Session, campaign_id: int, user: User) -> Campaign:
+    """Return the user's campaign, or raise 404."""
+    campaign = db.query(Campaign).filter(
+        Campaign.id == campaign_id,
+        Campaign.user_id == user.id
+    ).first()
+
+    if not campaign:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Campaign {campaign_id} not found")
+
+    return campaign
+
+
+async def _link_ndjson(request: Request, db: Session, campaign_id: int, user: User, target: str, key: str, label: str) -> dict:
+    """
+    Link the ids of a streamed NDJSON body to a campaign, one chunk of
+    CAMPAIGN_LINK_CHUNK_SIZE ids at a time, each chunk committed on its own.
+
+    At most CAMPAIGN_LINK_MAX_IDS ids per request. On an invalid line, or
+    past the limit, the ids before it stay linked: the error detail holds
+    their summary, the client resumes after them.
+    """
+    await run_in_threadpool(_get_campaign_or_404, db, campaign_id, user)
+
+    linker = CampaignLinker(db, campaign_id, user.id, target)
+    chunk = []
+    received = 0
+
+    def link(ids: List[int]) -> None:
+        try:
+            linker.add(ids)
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
+
+    try:
+        async for item_id in iter_ndjson_ids(request.stream(), key):
+            received += 1
+            if received > CAMPAIGN_LINK_MAX_IDS:
+                raise OverflowError(f"More than {CAMPAIGN_LINK_MAX_IDS} ids, send the rest in another request")
+
+            chunk.append(item_id)
+            if len(chunk) >= CAMPAIGN_LINK_CHUNK_SIZE:
+                await run_in_threadpool(link, chunk)
+                chunk = []
+    except (ValueError, OverflowError) as e:
+        if chunk:
+            await run_in_threadpool(link, chunk)
+        raise HTTPException(
+            status_code=(
+                status.HTTP_413_REQUEST_ENTITY_TOO_LARGE if isinstance(e, OverflowError)
+                else status.HTTP_400_BAD_REQUEST
+            ),
+            detail={"error": str(e), **linker.summary(label)}
+        )
+
+    if chunk:
+        await run_in_threadpool(link, chunk)
+
+    return linker.summary(label)
+
+
 # ==================== CRUD DE BASE =====================
 
 @router.get("/", response_model=List[CampaignResponse])
@@ -24,6 +124,7 @@ def list_campaigns(
     skip: int = 0,
     limit: int = 100,
     status_filter: Optional[str] = None,
+    include_status_counts: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -34,11 +135,14 @@ def list_campaigns(
     - skip: number of records to skip (for pagination)
     - limit: max number of results (max 100)
     - status_filter: filter by status (upcoming, active, completed, archived)
+    - include_status_counts: also return contacts_by_status for each campaign
 
     Returns:
-    - List of campaigns with basic info
+    - List of campaigns with basic info, contact_count and product_count
     """
-    query = db.query(Campaign).filter(Campaign.user_id == current_user.id)
+    # Counts come with the campaigns (correlated subqueries, one query)
+    contact_count, product_count = campaign_count_columns(db)
+    query = db.query(Campaign, contact_count, product_count).filter(Campaign.user_id == current_user.id)
 
     # Optional status filter
     if status_filter:
@@ -55,8 +159,16 @@ def list_campaigns(
     # Sort by event date
     query = query.order_by(Campaign.event_date.desc())
 
-    campaigns = query.offset(skip).limit(limit).all()
-    return campaigns
+    rows = query.offset(skip).limit(limit).all()
+
+    breakdowns = None
+    if include_status_counts:
+        breakdowns = contacts_by_status(db, [campaign.id for campaign, _, _ in rows])
+
+    return [
+        _campaign_response(campaign, contacts, products, breakdowns[campaign.id] if breakdowns else None)
+        for campaign, contacts, products in rows
+    ]
 
 @router.post("/", response_model=CampaignResponse, status_code=status.HTTP_201_CREATED)
 def create_campaign(
@@ -102,6 +214,7 @@ def create_campaign(
 @router.get("/{campaign_id}", response_model=CampaignResponse)
 def get_campaign(
     campaign_id: int,
+    include_status_counts: bool = False,
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
@@ -111,18 +224,28 @@ def get_campaign(
     Path params:
     - campaign_id: ID of the campaign to retrieve
 
+    Query params:
+    - include_status_counts: also return contacts_by_status
+
     Returns:
-    - Campaign details
+    - Campaign details with contact_count and product_count
     """
-    campaign = db.query(Campaign).filter(
+    contact_count, product_count = campaign_count_columns(db)
+    row = db.query(Campaign, contact_count, product_count).filter(
         Campaign.id == campaign_id,
         Campaign.user_id == current_user.id
     ).first()
 
-    if not campaign:
+    if not row:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Campaign {campaign_id} not found")
 
-    return campaign
+    campaign, contacts, products = row
+
+    breakdown = None
+    if include_status_counts:
+        breakdown = contacts_by_status(db, [campaign.id])[campaign.id]
+
+    return _campaign_response(campaign, contacts, products, breakdown)
 
 @router.put("/{campaign_id}", response_model=CampaignResponse)
 def update_campaign(
@@ -202,20 +325,40 @@ def delete_campaign(
 
 # ==================== CONTACTS MANAGEMENT =====================
 
-@router.get("/{campaign_id}/contacts", response_model=List[dict])
+@router.get("/{campaign_id}/contacts", response_model=CampaignContactPage)
 def list_campaign_contacts(
     campaign_id: int, 
+    limit: int = Query(50, ge=1, le=500),
+    cursor: Optional[str] = None,
+    status_filter: Optional[str] = None,
+    sequence_step: Optional[int] = None,
+    responded: Optional[bool] = None,
+    followup_due: Optional[bool] = None,
+    sort: Literal["added_at", "last_name", "email_sequence_step", "last_email_sent_at", "next_follow_up_scheduled_at"] = "added_at",
+    order: Literal["asc", "desc"] = "asc",
     db: Session = Depends(get_db),
     current_user: User = Depends(get_current_user)
 ):
     """
-    List all contacts (prospects) linked to campaign.
+    List the contacts (prospects) linked to a campaign, one page at a time.
     
     Path params:
     - campaign_id: ID of the campaign
 
+    Query params:
+    - limit: page size (default 50, max 500)
+    - cursor: next_cursor of the previous page (omit for the first page)
+    - status_filter: only contacts with this status
+    - sequence_step: only contacts at this step of the email sequence
+    - responded: true = the prospect replied, false = no reply yet
+    - followup_due: true = scheduled follow-up is due now, false = not due
+    - sort: added_at (default), last_name, email_sequence_step,
+      last_email_sent_at, next_follow_up_scheduled_at
+    - order: asc (default) or desc. Contacts without a value for the sort
+      key come last.
+
     Returns:
-    - List of contacts with prospect details, status, and email sequence info
+    - Page of contacts with prospect details, status, and email sequence info
     """
     # Verify campaign exists and belongs to user
     campaign = db.query(Campaign).filter(
@@ -226,34 +369,95 @@ def list_campaign_contacts(
     if not campaign:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Campaign {campaign_id} not found")
     
-    # get all contacts with prospect data
+    # get contacts with prospect data
     from app.models.campaign import CampaignContact
     from app.models.prospect import Prospect
 
-    contacts = db.query(CampaignContact).filter(
+    sort_columns = {
+        "added_at": (CampaignContact.added_at, False),
+        "last_name": (Prospect.last_name, False),
+        "email_sequence_step": (CampaignContact.email_sequence_step, False),
+        "last_email_sent_at": (CampaignContact.last_email_sent_at, True),
+        "next_follow_up_scheduled_at": (CampaignContact.next_follow_up_scheduled_at, True),
+    }
+    sort_column, nullable = sort_columns[sort]
+    descending = order == "desc"
+
+    # One query: contacts joined with their prospect
+    query = db.query(CampaignContact, Prospect).join(
+        Prospect, Prospect.id == CampaignContact.prospect_id
+    ).filter(
         CampaignContact.campaign_id == campaign_id
-    ).all()
+    )
+
+    # Filters
+    if status_filter:
+        query = query.filter(CampaignContact.status == status_filter)
+
+    if sequence_step is not None:
+        query = query.filter(CampaignContact.email_sequence_step == sequence_step)
+
+    if responded is True:
+        query = query.filter(CampaignContact.response_received_at.isnot(None))
+    elif responded is False:
+        query = query.filter(CampaignContact.response_received_at.is_(None))
+
+    now = datetime.utcnow()
+    is_due = and_(
+        CampaignContact.status == "contacted",
+        CampaignContact.next_follow_up_scheduled_at.isnot(None),
+        CampaignContact.next_follow_up_scheduled_at <= now
+    )
+    if followup_due is True:
+        query = query.filter(is_due)
+    elif followup_due is False:
+        query = query.filter(not_(is_due))
+
+    # Start after the last row of the previous page
+    if cursor:
+        try:
+            value, row_id = decode_cursor(cursor, sort, descending)
+        except InvalidCursor as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+        query = query.filter(keyset_filter(sort_column, CampaignContact.id, value, row_id, descending, nullable))
+
+    # One extra row tells if there is a next page
+    rows = query.order_by(
+        *keyset_order_by(sort_column, CampaignContact.id, descending)
+    ).limit(limit + 1).all()
+
+    has_more = len(rows) > limit
+    rows = rows[:limit]
 
     # Build response with prospect details
-    result = []
-    for contact in contacts:
-        prospect = db.query(Prospect).filter(Prospect.id == contact.prospect_id).first()
-        if prospect:
-            result.append({
-                "prospect_id": prospect.id,
-                "first_name": prospect.first_name,
-                "last_name": prospect.last_name,
-                "email": prospect.email,
-                "phone_number": prospect.phone_number,
-                "company_name": prospect.company_name,
-                "position": prospect.position,
-                "status": contact.status,
-                "notes": contact.notes,
-                "email_sequence_step": contact.email_sequence_step,
-                "last_email_sent_at": contact.last_email_sent_at,
-                "added_at": contact.added_at
-            })
-    return result
+    items = [
+        CampaignContactListItem(
+            prospect_id=prospect.id,
+            first_name=prospect.first_name,
+            last_name=prospect.last_name,
+            email=prospect.email,
+            phone_number=prospect.phone_number,
+            company_name=prospect.company_name,
+            position=prospect.position,
+            status=contact.status,
+            notes=contact.notes,
+            email_sequence_step=contact.email_sequence_step,
+            last_email_sent_at=contact.last_email_sent_at,
+            next_follow_up_scheduled_at=contact.next_follow_up_scheduled_at,
+            response_received_at=contact.response_received_at,
+            added_at=contact.added_at
+        )
+        for contact, prospect in rows
+    ]
+
+    next_cursor = None
+    if has_more:
+        last_contact, last_prospect = rows[-1]
+        last_value = last_prospect.last_name if sort == "last_name" else getattr(last_contact, sort)
+        next_cursor = encode_cursor(sort, descending, last_value, last_contact.id)
+
+    return CampaignContactPage(items=items, next_cursor=next_cursor, has_more=has_more)
 
 
 @router.post("/{campaign_id}/contacts", status_code=status.HTTP_201_CREATED)
@@ -308,7 +512,12 @@ def add_contact_to_campaign(
     )
 
     db.add(contact)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # Linked by a concurrent request (unique campaign_id + prospect_id)
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Prospect {prospect_id} is already linked to campaign {campaign_id}")
     db.refresh(contact)
 
     return {
@@ -337,62 +546,40 @@ def add_campaign_contacts_bulk(
     - Summary of added/skipped contacts
 
     """
-    from app.models.campaign import CampaignContact
-    from app.models.prospect import Prospect
-
     # Verify campaign exists and belongs to user
-    campaign = db.query(Campaign).filter(
-        Campaign.id == campaign_id,
-        Campaign.user_id == current_user.id
-    ).first()
+    _get_campaign_or_404(db, campaign_id, current_user)
 
-    if not campaign:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Campaign {campaign_id} not found")
-    
-    added = []
-    skipped = []
-    not_found = []
-
-    for prospect_id in prospect_ids:
-        # Check if already linked
-        prospect = db.query(Prospect).filter(
-            Prospect.id == prospect_id,
-            Prospect.user_id == current_user.id
-        ).first()
-
-        if not prospect:
-            not_found.append(prospect_id)
-            continue
-
-        # Check if already linked
-        existing = db.query(CampaignContact).filter(
-            CampaignContact.campaign_id == campaign_id,
-            CampaignContact.prospect_id == prospect_id
-        ).first()
-
-        if existing:
-            skipped.append(prospect_id)
-            continue
-
-        # Create link
-        contact = CampaignContact(
-            campaign_id=campaign_id,
-            prospect_id=prospect_id,
-            status="pending",
-            email_sequence_step=0
-        )
+    # One ownership query + one INSERT ... ON CONFLICT per chunk of ids
+    linker = CampaignLinker(db, campaign_id, current_user.id, "prospects")
+    linker.add(prospect_ids)
+    db.commit()
 
-        db.add(contact)
-        added.append(prospect_id)
+    return linker.summary("contacts")
 
-    db.commit()
 
-    return {
-        "message": f"Added {len(added)} contacts",
-        "added": added,
-        "skipped": skipped,
-        "not_found": not_found
-    }
+@router.post("/{campaign_id}/contacts/bulk/ndjson", status_code=status.HTTP_201_CREATED)
+async def add_campaign_contacts_ndjson(
+    campaign_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Add contacts (prospects) to a campaign from a streamed NDJSON body.
+
+    Ids are linked chunk by chunk while the body is received, so lists of
+    any size can be sent without building a huge JSON array.
+
+    Body (Content-Type: application/x-ndjson), one per line:
+    123
+    {"prospect_id": 456}
+
+    Returns:
+    - Summary of added/skipped contacts. On an invalid line (400) or past
+      CAMPAIGN_LINK_MAX_IDS ids (413), the ids before it are linked and the
+      error detail holds their summary
+    """
+    return await _link_ndjson(request, db, campaign_id, current_user, "prospects", "prospect_id", "contacts")
 
 @router.patch("/{campaign_id}/contacts/{prospect_id}")
 def update_campaign_contact(
@@ -503,7 +690,7 @@ def remove_contact_from_campaign(
     return None  # 204 No Content
 
 # ==================== PRODUCTS MANAGEMENT =====================
-@router.get("/{campaign_id}/products", response_model=List[dict])
+@router.get("/{campaign_id}/products", response_model=List[CampaignProductListItem])
 def list_campaign_products(
     campaign_id: int, 
     db: Session = Depends(get_db),
@@ -531,23 +718,24 @@ def list_campaign_products(
     from app.models.campaign import CampaignProduct
     from app.models.product import Product
 
-    campaign_products = db.query(CampaignProduct).filter(
+    # One query: links joined with their product
+    rows = db.query(CampaignProduct.added_at, Product).join(
+        Product, Product.id == CampaignProduct.product_id
+    ).filter(
         CampaignProduct.campaign_id == campaign_id
     ).all()
 
     # Build response with product details
-    result = []
-    for cp in campaign_products:
-        product = db.query(Product).filter(Product.id == cp.product_id).first()
-        if product:
-            result.append({
-                "product_id": product.id,
-                "name": product.name,
-                "short_description": product.short_description,
-                "item_number": product.item_number,
-                "added_at": cp.added_at
-            })
-    return result
+    return [
+        CampaignProductListItem(
+            product_id=product.id,
+            name=product.name,
+            short_description=product.short_description,
+            item_number=product.item_number,
+            added_at=added_at
+        )
+        for added_at, product in rows
+    ]
 
 @router.post("/{campaign_id}/products", status_code=status.HTTP_201_CREATED)
 def add_product_to_campaign(
@@ -605,7 +793,12 @@ def add_product_to_campaign(
     )
 
     db.add(campaign_product)
-    db.commit()
+    try:
+        db.commit()
+    except IntegrityError:
+        # Linked by a concurrent request (unique campaign_id + product_id)
+        db.rollback()
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Product {product_id} is already linked to campaign {campaign_id}")
     db.refresh(campaign_product)
 
     return {
@@ -634,60 +827,37 @@ def add_campaign_products_bulk(
     - Summary of added/skipped products
 
     """
-    from app.models.campaign import CampaignProduct
-    from app.models.product import Product
-
     # Verify campaign exists and belongs to user
-    campaign = db.query(Campaign).filter(
-        Campaign.id == campaign_id,
-        Campaign.user_id == current_user.id
-    ).first()
+    _get_campaign_or_404(db, campaign_id, current_user)
 
-    if not campaign:
-        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Campaign {campaign_id} not found")
-    
-    added = []
-    skipped = []
-    not_found = []
-
-    for product_id in product_ids:
-        # Check if product exists and belongs to user
-        product = db.query(Product).filter(
-            Product.id == product_id,
-            Product.user_id == current_user.id
-        ).first()
-
-        if not product:
-            not_found.append(product_id)
-            continue
-
-        # Check if already linked
-        existing = db.query(CampaignProduct).filter(
-            CampaignProduct.campaign_id == campaign_id,
-            CampaignProduct.product_id == product_id
-        ).first()
-
-        if existing:
-            skipped.append(product_id)
-            continue
-
-        # Create link
-        campaign_product = CampaignProduct(
-            campaign_id=campaign_id,
-            product_id=product_id
-        )
+    # One ownership query + one INSERT ... ON CONFLICT per chunk of ids
+    linker = CampaignLinker(db, campaign_id, current_user.id, "products")
+    linker.add(product_ids)
+    db.commit()
 
-        db.add(campaign_product)
-        added.append(product_id)
+    return linker.summary("products")
 
-    db.commit()
 
-    return {
-        "message": f"Added {len(added)} products",
-        "added": added,
-        "skipped": skipped,
-        "not_found": not_found
-    }
+@router.post("/{campaign_id}/products/bulk/ndjson", status_code=status.HTTP_201_CREATED)
+async def add_campaign_products_ndjson(
+    campaign_id: int,
+    request: Request,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Add products to a campaign from a streamed NDJSON body.
+
+    Body (Content-Type: application/x-ndjson), one per line:
+    123
+    {"product_id": 456}
+
+    Returns:
+    - Summary of added/skipped products. On an invalid line (400) or past
+      CAMPAIGN_LINK_MAX_IDS ids (413), the ids before it are linked and the
+      error detail holds their summary
+    """
+    return await _link_ndjson(request, db, campaign_id, current_user, "products", "product_id", "products")
 
 @router.delete("/{campaign_id}/products/{product_id}", status_code=status.HTTP_204_NO_CONTENT)
 def remove_product_from_campaign(
@@ -747,8 +917,7 @@ def get_campaign_stats(
     Returns:
     - Statistics about the campaign
     """
-    from app.models.campaign import CampaignContact, CampaignProduct
-    from sqlalchemy import func
+    from app.models.campaign import CampaignProduct
 
     # Verify campaign exists and belongs to user
     campaign = db.query(Campaign).filter(
@@ -759,29 +928,12 @@ def get_campaign_stats(
     if not campaign:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Campaign {campaign_id} not found")
     
-    # Get all contacts for this campaign
-    contacts = db.query(CampaignContact).filter(
-        CampaignContact.campaign_id == campaign_id
-    ).all()
+    # Contact counters (maintained by the database, see services/campaign_stats.py)
+    contact_stats = get_contact_stats(db, campaign_id)
 
-    # Count contacts by status
-    status_counts = {}
-    total_contacts = len(contacts)
-
-    for contact in contacts:
-        status = contact.status or "pending"
-        status_counts[status] = status_counts.get(status, 0) + 1
-
-    # Email sequence stats
-    total_emails_sent = sum(c.email_sequence_step for c in contacts if c.email_sequence_step)
+    total_contacts = contact_stats["total"]
+    total_emails_sent = contact_stats["total_emails_sent"]
     avg_email_step = (total_emails_sent / total_contacts) if total_contacts > 0 else 0
-
-    # Get last email sent timestamp
-    last_email_sent = None 
-    for contact in contacts:
-        if contact.last_email_sent_at:
-            if last_email_sent is None or contact.last_email_sent_at > last_email_sent:
-                last_email_sent = contact.last_email_sent_at
     
     # Get product count
     product_count = db.query(CampaignProduct).filter(
@@ -801,15 +953,15 @@ def get_campaign_stats(
         },
         "contacts": {
             "total": total_contacts,
-            "by_status": status_counts,
+            "by_status": contact_stats["by_status"],
         },
         "products": {
             "total": product_count
         },
         "email_sequence": {
             "total_emails_sent": total_emails_sent,
-            "avg_step": (avg_email_step, 2),
-            "last_sent": last_email_sent        
+            "avg_step": round(avg_email_step, 2),
+            "last_sent": contact_stats["last_email_sent_at"]
         }
     }
 
@@ -12,12 +12,53 @@ from app.models.user import User
 from app.models.campaign import Campaign, CampaignContact
 from app.models.prospect import Prospect
 from app.api.deps import get_current_user
-from app.services.email.gmail_response_checker import check_gmail_thread_for_response
-from app.services.email.outlook_response_checker import check_outlook_conversation_for_response
+from app.services.email.gmail_response_checker import (
+    check_gmail_thread_for_response,
+    check_gmail_threads_for_responses,
+)
+from app.services.email.outlook_response_checker import (
+    check_outlook_conversation_for_response,
+    check_outlook_conversations_for_responses,
+)
+from app.services.email.gmail_sync import sync_gmail_replies
+from app.services.email.outlook_sync import sync_outlook_replies
 
 router = APIRouter(prefix="/campaigns", tags=["email-responses"])
 
 
+@router.post("/responses/sync")
+def sync_responses(
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Detect new replies across all campaigns of the user.
+    Only reads mail received since the last sync
+    (Gmail History API / Outlook delta query).
+    """
+    if not current_user.has_email_configured:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="You must connect Gmail or Outlook before syncing responses"
+        )
+    
+    result = {}
+    
+    try:
+        if current_user.gmail_connected:
+            result["gmail"] = sync_gmail_replies(current_user, db)
+        
+        if current_user.outlook_connected:
+            result["outlook"] = sync_outlook_replies(current_user, db)
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Failed to sync responses: {str(e)}"
+        )
+    
+    return result
+
+
 @router.post("/{campaign_id}/contacts/{prospect_id}/check-response")
 def check_contact_response(
     campaign_id: int,
@@ -144,14 +185,16 @@ def check_all_campaign_responses(
             detail=f"Campaign {campaign_id} not found"
         )
     
-    # Get all contacts that have been emailed but not responded
-    contacts = db.query(CampaignContact).filter(
+    # Get all contacts that have been emailed but not responded (+ prospect email)
+    rows = db.query(CampaignContact, Prospect.email).join(
+        Prospect, Prospect.id == CampaignContact.prospect_id
+    ).filter(
         CampaignContact.campaign_id == campaign_id,
         CampaignContact.email_thread_id.isnot(None),
         CampaignContact.status == "contacted"
     ).all()
     
-    if not contacts:
+    if not rows:
         return {
             "checked": 0,
             "responses_found": 0,
@@ -167,45 +210,59 @@ def check_all_campaign_responses(
     responses_found = 0
     errors = []
     
-    for contact in contacts:
+    # Collect response data per contact
+    responses = []
+    
+    if provider == "gmail":
+        # Batched: up to 100 threads per HTTP request
         try:
-            # Get prospect
-            prospect = db.query(Prospect).filter(Prospect.id == contact.prospect_id).first()
-            if not prospect:
-                continue
-            
-            # Check for response
-            if provider == "gmail":
-                response_data = check_gmail_thread_for_response(
-                    user=current_user,
-                    db=db,
-                    thread_id=contact.email_thread_id,
-                    prospect_email=prospect.email
-                )
-            elif provider == "outlook":
-                response_data = check_outlook_conversation_for_response(
-                    user=current_user,
-                    db=db,
-                    conversation_id=contact.email_thread_id,
-                    prospect_email=prospect.email
-                )
-            else:
-                continue
-            
-            checked += 1
-            
-            # Update if response found
-            if response_data["has_response"]:
-                contact.status = "responded"
-                contact.response_received_at = datetime.utcnow()
-                contact.last_response_content = response_data.get("response_content", "")[:1000]
-                responses_found += 1
-            
+            results = check_gmail_threads_for_responses(
+                user=current_user,
+                db=db,
+                threads={contact.email_thread_id: email for contact, email in rows}
+            )
         except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to check for responses: {str(e)}"
+            )
+        
+        for contact, email in rows:
+            responses.append((contact, results.get(contact.email_thread_id, {"error": "Thread not checked"})))
+    
+    elif provider == "outlook":
+        # Batched: up to 20 conversations per Graph $batch request
+        try:
+            results = check_outlook_conversations_for_responses(
+                user=current_user,
+                db=db,
+                conversations={contact.email_thread_id: email for contact, email in rows}
+            )
+        except Exception as e:
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail=f"Failed to check for responses: {str(e)}"
+            )
+        
+        for contact, email in rows:
+            responses.append((contact, results.get(contact.email_thread_id, {"error": "Conversation not checked"})))
+    
+    for contact, response_data in responses:
+        if "error" in response_data:
             errors.append({
                 "prospect_id": contact.prospect_id,
-                "error": str(e)
+                "error": response_data["error"]
             })
+            continue
+        
+        checked += 1
+        
+        # Update if response found
+        if response_data["has_response"]:
+            contact.status = "responded"
+            contact.response_received_at = datetime.utcnow()
+            contact.last_response_content = (response_data.get("response_content") or "")[:1000]
+            responses_found += 1
     
     db.commit()
     
@@ -214,4 +271,4 @@ def check_all_campaign_responses(
         "responses_found": responses_found,
         "new_responded": responses_found,
         "errors": errors if errors else None
-    }
\ No newline at end of file
+    }
@@ -29,6 +29,21 @@ class ScheduleFollowUpResponse(BaseModel):
     scheduled_at: datetime
     message: str
 
+class ScheduledFollowUp(BaseModel):
+    prospect_id: int
+    prospect_name: str
+    prospect_email: str
+    current_step: int
+    last_sent: Optional[datetime]
+    scheduled_at: datetime
+    is_due: bool
+
+class ScheduledFollowUpsResponse(BaseModel):
+    campaign_id: int
+    campaign_name: str
+    total_scheduled: int
+    scheduled_followups: List[ScheduledFollowUp]
+
 
 # ================= PLANNIFIER UN FOLLOW-UP =================
 @router.post("/{campaign_id}/contacts/{prospect_id}/schedule-followup")
@@ -119,7 +134,7 @@ def suggest_followup_date(
     )
 
 # ================= VOIR LES FOLLOW-UPS PLANIFIÉS =================
-@router.get("/{campaign_id}/followups/scheduled")
+@router.get("/{campaign_id}/followups/scheduled", response_model=ScheduledFollowUpsResponse)
 def get_scheduled_followups(
     campaign_id: int, 
     db: Session = Depends(get_db),
@@ -140,33 +155,35 @@ def get_scheduled_followups(
             detail=f"Campaign {campaign_id} not found"
         )
     
-    # Get contacts with scheduled follow-ups
-    contacts = db.query(CampaignContact).filter(
+    # Get contacts with scheduled follow-ups + their prospect (one query)
+    rows = db.query(CampaignContact, Prospect).join(
+        Prospect, Prospect.id == CampaignContact.prospect_id
+    ).filter(
         CampaignContact.campaign_id == campaign_id,
         CampaignContact.next_follow_up_scheduled_at.isnot(None),
         CampaignContact.status == "contacted"  # Only show those that have been contacted but not responded
     ).order_by(CampaignContact.next_follow_up_scheduled_at).all()
 
-    scheduled = []
-    for contact in contacts:
-        prospect = db.query(Prospect).filter(Prospect.id == contact.prospect_id).first()
-        if prospect:
-            scheduled.append({
-                "prospect_id": prospect.id,
-                "prospect_name": f"{prospect.first_name} {prospect.last_name}",
-                "prospect_email": prospect.email,
-                "current_step": contact.email_sequence_step,
-                "last_sent": contact.last_email_sent_at.isoformat(),
-                "scheduled_at": contact.next_follow_up_scheduled_at.isoformat(),
-                "is_due": contact.next_follow_up_scheduled_at <= datetime.utcnow()
-            })
+    now = datetime.utcnow()
+    scheduled = [
+        ScheduledFollowUp(
+            prospect_id=prospect.id,
+            prospect_name=f"{prospect.first_name} {prospect.last_name}",
+            prospect_email=prospect.email,
+            current_step=contact.email_sequence_step,
+            last_sent=contact.last_email_sent_at,
+            scheduled_at=contact.next_follow_up_scheduled_at,
+            is_due=contact.next_follow_up_scheduled_at <= now
+        )
+        for contact, prospect in rows
+    ]
     
-    return {
-        "campaign_id": campaign_id,
-        "campaign_name": campaign.name,
-        "total_scheduled": len(scheduled),
-        "scheduled_followups": scheduled
-    }
+    return ScheduledFollowUpsResponse(
+        campaign_id=campaign_id,
+        campaign_name=campaign.name,
+        total_scheduled=len(scheduled),
+        scheduled_followups=scheduled
+    )
 
 # ================= ENVOYER LES FOLLOW-UPS DUS =================
 @router.post("/{campaign_id}/followups/send-due")
@@ -214,41 +231,26 @@ def send_due_followups(
             "message": "No follow-ups are due at this time"
         }
     
-    # Send follow-ups
+    # Send follow-ups (parallel, one commit at the end)
     email_service = EmailService(db)
-    sent = 0
-    failed = 0
-    errors = []
+    result = email_service.send_bulk_campaign_emails(
+        campaign=campaign,
+        contacts=contacts,
+        user=current_user
+    )
 
+    # Clear scheduled date of the follow-ups that went out
+    sent_ids = set(result["sent_contact_ids"])
     for contact in contacts:
-        try:
-            # Get prospect
-            prospect = db.query(Prospect).filter(Prospect.id == contact.prospect_id).first()
-            if not prospect:
-                failed += 1
-                continue
-            
-            # Send follow-up
-            result = email_service.send_campaign_email(
-                campaign=campaign,
-                contact=contact,
-                prospect=prospect,
-                user=current_user,
-            )
-
-            # Clear scheduled date
+        if contact.id in sent_ids:
             contact.next_follow_up_scheduled_at = None
-            sent += 1
-
-        except Exception as e:
-            failed += 1
-            errors.append({
-                "prospect_id": contact.prospect_id,
-                "error": str(e)
-            })
 
     db.commit()
 
+    sent = result["sent"]
+    failed = result["failed"]
+    errors = result["errors"]
+
     return {
         "due_contacts": len(contacts),
         "sent": sent,
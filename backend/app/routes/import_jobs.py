@@ -0,0 +1,80 @@
+"""
+Import job routes - progress and error report of background imports.
+Jobs are created by POST /api/prospects/import/jobs and /api/products/import/jobs.
+"""
+from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi.responses import StreamingResponse
+from sqlalchemy.orm import Session
+
+from app.api.deps import get_current_user, get_db
+from app.models.import_job import ImportJob, ImportJobStatus
+from app.models.user import User
+from app.schemas import ImportJobProgress
+from app.services.imports.jobs import IMPORTERS, get_import_job, iter_error_report
+
+router = APIRouter(prefix="/api/imports", tags=["imports"])
+
+
+def _get_job_or_404(db: Session, user_id: int, job_id: str) -> ImportJob:
+    job = get_import_job(db, user_id, job_id)
+
+    if not job:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"Import job {job_id} not found"
+        )
+
+    return job
+
+
+@router.get("/{job_id}", response_model=ImportJobProgress)
+def get_import_job_progress(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Get progress counters of an import job.
+    Rows are committed chunk by chunk: the counters match what is in the database.
+    """
+    job = _get_job_or_404(db, current_user.id, job_id)
+
+    return ImportJobProgress(
+        job_id=job.id,
+        kind=job.kind,
+        filename=job.filename,
+        status=job.status.value,
+        rows_processed=job.rows_processed,
+        total_rows=job.total_rows,
+        created=job.created,
+        updated=job.updated,
+        skipped=job.skipped,
+        error_count=job.error_count,
+        last_error=job.last_error,
+        created_at=job.created_at,
+        started_at=job.started_at,
+        finished_at=job.finished_at,
+        done=job.status in (ImportJobStatus.COMPLETED, ImportJobStatus.FAILED),
+        errors_url=f"/api/imports/{job.id}/errors"
+    )
+
+
+@router.get("/{job_id}/errors")
+def download_import_job_errors(
+    job_id: str,
+    db: Session = Depends(get_db),
+    current_user: User = Depends(get_current_user)
+):
+    """
+    Download every row error of an import job as CSV (row, key value, error).
+    Available while the job runs: it holds the errors of the rows processed so far.
+    """
+    job = _get_job_or_404(db, current_user.id, job_id)
+
+    return StreamingResponse(
+        iter_error_report(job.id, IMPORTERS[job.kind].KEY_COLUMN),
+        media_type="text/csv",
+        headers={
+            "Content-Disposition": f"attachment; filename=import_{job.id}_errors.csv"
+        }
+    )
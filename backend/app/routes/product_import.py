@@ -2,17 +2,23 @@
 Product import routes - Upload Excel/CSV files to bulk import products into the system.
 """
 
-from fastapi import APIRouter, File, UploadFile, HTTPException, Depends
+from fastapi import APIRouter, File, UploadFile, HTTPException, Depends, status
 from sqlalchemy.orm import Session
 import pandas as pd
 import io
-from typing import List
+from collections import Counter
+from typing import List, Tuple
 
 from app.db import get_db
 from app.models.user import User
 from app.models.product import Product
-from app.schemas import ProductImportResult, ProductImportPreview
-from app.api.deps import get_current_user
+from app.schemas import ProductImportResult, ProductImportPreview, ImportJobResponse
+from app.api.deps import get_current_user, import_slot
+from app.services.imports.common import missing_columns, normalize_text
+from app.services.imports.product_import import REQUIRED_COLUMNS, import_product_frames
+from app.services.imports.executor import run_import
+from app.services.imports.jobs import create_import_job
+from app.services.imports.reader import SheetReader
 
 router = APIRouter(prefix="/api/products", tags=["product-import"])
 
@@ -67,7 +73,7 @@ async def download_import_template():
         }
     )
 
-@router.post("/import/preview", response_model=ProductImportPreview)
+@router.post("/import/preview", response_model=ProductImportPreview, dependencies=[Depends(import_slot)])
 async def preview_product_import(
     file: UploadFile = File(...),
     user: User = Depends(get_current_user)
@@ -76,56 +82,78 @@ async def preview_product_import(
     Preview Excel/CSV file before importing.
     Returns first 10 rows and validation warnings.
 
+    Only the first 10 rows are parsed in full, the warnings come from
+    one streamed pass over the item_number column.
+
     Excpected columns:
     - item_number (required)
     - name (required)
-    - description (optional)
+    - short_description (optional)
     """
     if not file.filename.endswith(('.csv', '.xlsx', '.xls')):
         raise HTTPException(400, "File must be CSV or Excel format")
-    
-    contents = await file.read()
 
     try:
-        if file.filename.endswith('.csv'):
-            df = pd.read_csv(io.BytesIO(contents))
-        else:
-            df = pd.read_excel(io.BytesIO(contents))
+        reader = await run_import(SheetReader, file.file, file.filename)
     except Exception as e:
         raise HTTPException(400, f"Error reading file: {str(e)}")
-    
-    # Validate required columns
-    required_columns = {'item_number', 'name'}
-    missing = [col for col in required_columns if col not in df.columns]
+
+    try:
+        # Validate required columns
+        missing = missing_columns(reader.columns, REQUIRED_COLUMNS)
+
+        sample = await run_import(reader.head, 10)
+        total_rows, empty_rows, duplicates = await run_import(_scan_item_numbers, reader)
+    except Exception as e:
+        raise HTTPException(400, f"Error reading file: {str(e)}")
+    finally:
+        reader.close()
 
     warnings = []
     if missing:
         warnings.append(f"❌ Missing required columns: {', '.join(missing)}")
         warnings.append("Required: item_number, name")
-        warnings.append("Optional: description")
+        warnings.append("Optional: short_description")
     else:
         # Check for empty rows
-        empty_rows = df[df['item_number'].isna()].index.tolist()
         if empty_rows:
-            warnings.append(f"⚠️ Found {len(empty_rows)} rows with empty item_number (will be skipped)")
+            warnings.append(f"⚠️ Found {empty_rows} rows with empty item_number (will be skipped)")
 
         # Check for duplicates in the file
-        duplicates = df[df.duplicated(subset=['item_number'], keep=False)]
-        if not duplicates.empty:
-            dup_items = duplicates['item_number'].unique().tolist()[:5]
-            warnings.append(f"⚠️ Found duplicate item_numbers in file: {dup_items}")
-        
+        if duplicates:
+            warnings.append(f"⚠️ Found duplicate item_numbers in file: {duplicates[:5]}")
+
         if not warnings:
             warnings.append("✅ File looks good! No issues found.")
 
     return ProductImportPreview(
-        sample_data=df.head(10).fillna("").to_dict('records'),
-        total_rows=len(df),
-        columns_detected=list(df.columns),
+        sample_data=sample.fillna("").to_dict('records'),
+        total_rows=total_rows,
+        columns_detected=reader.columns,
         warnings=warnings
     )
 
-@router.post("/import", response_model=ProductImportResult)
+def _scan_item_numbers(reader: SheetReader) -> Tuple[int, int, List[str]]:
+    """
+    Stream the item_number column once.
+
+    Returns:
+        (total rows, rows with empty item_number, duplicated item_numbers)
+    """
+    total_rows = 0
+    empty_rows = 0
+    counts = Counter()
+
+    for frame in reader.frames(usecols=['item_number']):
+        total_rows += len(frame)
+        if 'item_number' in frame.columns:
+            item_numbers = normalize_text(frame['item_number'])
+            empty_rows += int(item_numbers.isna().sum())
+            counts.update(item_numbers.dropna())
+
+    return total_rows, empty_rows, [item for item, count in counts.items() if count > 1]
+
+@router.post("/import", response_model=ProductImportResult, dependencies=[Depends(import_slot)])
 async def import_products(
     file: UploadFile = File(...),
     update_existing: bool = False,
@@ -135,6 +163,9 @@ async def import_products(
     """
     Import products from Excel/CSV file.
 
+    The upload is read from its spooled temporary file chunk by chunk: memory
+    stays flat whatever the size of the catalog.
+
     Parameters:
     - file: Excel/CSV file containing product data.
     - update_existing: if True, updates existing products with same item_number
@@ -142,93 +173,66 @@ async def import_products(
     Excpected columns:
     - item_number (required)
     - name (required)
-    - description (optional)
+    - short_description (optional)
     """
     if not file.filename.endswith(('.csv', '.xlsx', '.xls')):
         raise HTTPException(400, "File must be CSV or Excel format")
-    
-    contents = await file.read()
 
     try:
-        if file.filename.endswith('.csv'):
-            df = pd.read_csv(io.BytesIO(contents))
-        else:
-            df = pd.read_excel(io.BytesIO(contents))
+        reader = await run_import(SheetReader, file.file, file.filename)
     except Exception as e:
         raise HTTPException(400, f"Error reading file: {str(e)}")
-    
-    # Validate required columns
-    if 'item_number' not in df.columns or 'name' not in df.columns:
-        raise HTTPException(400, "File must contain 'item_number' and 'name' columns")
-    
-    created = 0
-    updated = 0
-    skipped = 0
-    errors = []
 
-    for index, row in df.iterrows():
-        try:
-            # Skip empty rows
-            if pd.isna(row['item_number']) or pd.isna(row['name']):
-                skipped += 1
-                continue
-            
-            item_number = str(row['item_number']).strip()
-            name = str(row['name']).strip()
-
-            # Check if product already exists
-            existing = db.query(Product).filter(
-                Product.user_id == user.id,
-                Product.item_number == item_number
-            ).first()
-
-            if existing:
-                if update_existing:
-                    # Update existing product
-                    existing.name = name
-                    if 'short_description' in row and pd.notna(row['short_description']):
-                        existing.short_description = str(row['short_description']).strip()
-                    updated += 1
-                else:
-                    # Skip existing product
-                    errors.append({
-                        "row": index + 2,
-                        "item_number": item_number,
-                        "error": "Product with this item_number already exists (set update_existing=True to update)"
-                    })
-                    skipped += 1
-            else:
-                # Create new product
-                new_product = Product(
-                    user_id=user.id,
-                    item_number=item_number,
-                    name=name,
-                    short_description=str(row['short_description']).strip() if 'short_description' in row and pd.notna(row['short_description']) else None
-                )
-                db.add(new_product)
-                created += 1
+    try:
+        # Validate required columns
+        if missing_columns(reader.columns, REQUIRED_COLUMNS):
+            raise HTTPException(400, "File must contain 'item_number' and 'name' columns")
 
+        # Vectorized validation + chunked upserts (see services/imports/product_import.py)
+        try:
+            result = await run_import(import_product_frames, db, user.id, reader.frames(), update_existing)
+            await run_import(db.commit)
         except Exception as e:
-            errors.append({
-                "row": index + 2,
-                "item_number": row.get('item_number', 'N/A'),
-                "error": str(e)
-            })
-            skipped += 1
-
-    # Commit all changes to the database
+            await run_import(db.rollback)
+            raise HTTPException(500, f"Error saving to database: {str(e)}")
+    finally:
+        reader.close()
+
+    return ProductImportResult(**result)
+
+@router.post(
+    "/import/jobs",
+    response_model=ImportJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(import_slot)]
+)
+async def submit_product_import_job(
+    file: UploadFile = File(...),
+    update_existing: bool = False,
+    db: Session = Depends(get_db),
+    user: User = Depends(get_current_user)
+):
+    """
+    Import products from Excel/CSV file in the background.
+
+    For large catalogs: the file is saved and imported by a worker, chunk
+    by chunk. Poll status_url for progress, download errors_url for every
+    rejected row. A dropped connection doesn't stop the import.
+
+    Same parameters and columns as POST /api/products/import.
+    """
+    if not file.filename.endswith(('.csv', '.xlsx', '.xls')):
+        raise HTTPException(400, "File must be CSV or Excel format")
+
     try:
-        db.commit()
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(500, f"Error saving to database: {str(e)}")
-    
-    return ProductImportResult(
-        total_rows=len(df),
-        created=created,
-        updated=updated,
-        skipped=skipped,
-        errors=errors
+        job = await run_import(create_import_job, db, user.id, "products", file.file, file.filename, update_existing)
+    except ValueError as e:
+        raise HTTPException(400, str(e))
+
+    return ImportJobResponse(
+        job_id=job.id,
+        status_url=f"/api/imports/{job.id}",
+        errors_url=f"/api/imports/{job.id}/errors"
     )
 
 @router.get("/export")
@@ -2,16 +2,23 @@
 Prospect Import/Export Routes
 Allows bulk import and export of prospects via Excel files.
 """
-from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
+from fastapi import APIRouter, Depends, HTTPException, UploadFile, File, status
 from fastapi.responses import StreamingResponse
 from sqlalchemy.orm import Session
 from typing import List, Dict, Any
 import pandas as pd
 import io
+from collections import Counter
 
-from app.api.deps import get_current_user, get_db
+from app.api.deps import get_current_user, get_db, import_slot
 from app.models.user import User
 from app.models.prospect import Prospect
+from app.schemas import ImportJobResponse
+from app.services.imports.common import missing_columns, normalize_text
+from app.services.imports.prospect_import import REQUIRED_COLUMNS, import_prospect_frames
+from app.services.imports.executor import run_import
+from app.services.imports.jobs import create_import_job
+from app.services.imports.reader import SheetReader
 
 # Create router
 router = APIRouter(prefix="/api/prospects", tags=["prospect-import"])
@@ -73,7 +80,7 @@ def download_prospect_template():
         headers=headers
     )
 
-@router.post("/import/preview")
+@router.post("/import/preview", dependencies=[Depends(import_slot)])
 async def preview_prospect_import(
     file: UploadFile = File(...),
     current_user: User = Depends(get_current_user),
@@ -82,74 +89,92 @@ async def preview_prospect_import(
     """
     Preview prospect data before importing.
     Shows sample data and validation warnings.
+
+    Only the first 5 rows are parsed in full, the warnings come from one
+    streamed pass over the email and name columns.
     """
     # 1. Vérifier le type de fichier 
     if not file.filename.endswith((".xls", ".xlsx")):
         raise HTTPException(status_code=400, detail="Invalid file type. Please upload an Excel file.")
     
     try:
-      # 2. Lire le fichier Excel
-      contents = await file.read()
-      df = pd.read_excel(io.BytesIO(contents))
+      # 2. Ouvrir le fichier Excel (lecture en streaming, rien n'est chargé en entier)
+      reader = await run_import(SheetReader, file.file, file.filename)
+    except Exception as e:
+      raise HTTPException(status_code=400, detail=f"Error reading file: {str(e)}")
 
+    try:
       # 3. Colonnes requises
-      required_columns = ['email', 'first_name', 'last_name']
-      missing_columns = [col for col in required_columns if col not in df.columns]
-
-      if missing_columns:
-          raise HTTPException(status_code=400, detail=f"Missing required columns: {', '.join(missing_columns)}")
-      
-      # 4. Nettoyer les données
-      for col in df.columns:
-          if df[col].dtype == 'object':
-              df[col] = df[col].astype(str).str.strip()
-      
-      # 5. Détecter les problèmes potentiels
-      warnings = []
-
-      # A. emails vides
-      empty_emails = df[df['email'].isna() | (df['email'] == '') | (df['email'] == 'nan')].shape[0]
-      if empty_emails > 0:
-          warnings.append(f"⚠️  Found {empty_emails} rows with empty email.")
-
-      # B. Emails invalides
-      df['email'] = df['email'].astype(str)
-      invalid_emails = df[~df['email'].str.contains('@', na=False)].shape[0]
-      if invalid_emails > 0:
-          warnings.append(f"⚠️  Found {invalid_emails} rows with invalid email format.")
-
-      # C. Doublons dans le fichier
-      duplicate_emails = df[df['email'].duplicated(keep=False)].shape[0]
-      if duplicate_emails > 0:
-          warnings.append(f"⚠️  Found {duplicate_emails} duplicate emails in the file.")
-
-      # D. Champs first_name et last_name vides
-      empty_names = df[
-          (df['first_name'].isna() | (df['first_name'] == '') | (df['first_name'] == 'nan')) |
-          (df['last_name'].isna() | (df['last_name'] == '') | (df['last_name'] == 'nan'))
-      ].shape[0]
-      if empty_names > 0:
-          warnings.append(f"⚠️  Found {empty_names} rows with empty first_name or last_name.")
-
-      # 6. Préparer l'aperçu (5 premières lignes)
-      sample_data = df.head(5).fillna('').to_dict('records')
-
-      # 7. Message si tout est OK
-      if not warnings:
-          warnings.append("✅ File looks good! No issues found.")
-
-      # 8. Retourner le résultat
-      return {
-          "sample_data": sample_data,
-          "total_rows": len(df),
-          "columns_detected": list(df.columns),
-          "warnings": warnings
-      }
-    
+      missing = missing_columns(reader.columns, REQUIRED_COLUMNS)
+
+      if missing:
+          raise HTTPException(status_code=400, detail=f"Missing required columns: {', '.join(missing)}")
+
+      # 4. Aperçu (5 premières lignes) et statistiques sur tout le fichier
+      sample = await run_import(reader.head, 5)
+      stats = await run_import(_scan_prospect_rows, reader)
+
+    except HTTPException:
+      raise
     except Exception as e:
       raise HTTPException(status_code=400, detail=f"Error reading file: {str(e)}")
+    finally:
+      reader.close()
+
+    # 5. Détecter les problèmes potentiels
+    warnings = []
+
+    # A. emails vides
+    if stats["empty_emails"] > 0:
+        warnings.append(f"⚠️  Found {stats['empty_emails']} rows with empty email.")
+
+    # B. Emails invalides
+    if stats["invalid_emails"] > 0:
+        warnings.append(f"⚠️  Found {stats['invalid_emails']} rows with invalid email format.")
+
+    # C. Doublons dans le fichier
+    if stats["duplicate_emails"] > 0:
+        warnings.append(f"⚠️  Found {stats['duplicate_emails']} duplicate emails in the file.")
+
+    # D. Champs first_name et last_name vides
+    if stats["empty_names"] > 0:
+        warnings.append(f"⚠️  Found {stats['empty_names']} rows with empty first_name or last_name.")
+
+    # 6. Message si tout est OK
+    if not warnings:
+        warnings.append("✅ File looks good! No issues found.")
+
+    # 7. Retourner le résultat
+    return {
+        "sample_data": sample.fillna('').to_dict('records'),
+        "total_rows": stats["total_rows"],
+        "columns_detected": reader.columns,
+        "warnings": warnings
+    }
+
+def _scan_prospect_rows(reader: SheetReader) -> Dict[str, int]:
+    """
+    Stream the email and name columns once, counting the rows with problems.
+    """
+    stats = {"total_rows": 0, "empty_emails": 0, "invalid_emails": 0, "empty_names": 0}
+    email_counts = Counter()
+
+    for frame in reader.frames(usecols=REQUIRED_COLUMNS):
+        emails = normalize_text(frame['email']).str.lower()
+        empty_email = emails.isna()
+
+        stats["total_rows"] += len(frame)
+        stats["empty_emails"] += int(empty_email.sum())
+        stats["invalid_emails"] += int((~empty_email & ~emails.str.contains('@', na=False)).sum())
+        stats["empty_names"] += int(
+            (normalize_text(frame['first_name']).isna() | normalize_text(frame['last_name']).isna()).sum()
+        )
+        email_counts.update(emails.dropna())
+
+    stats["duplicate_emails"] = sum(count for count in email_counts.values() if count > 1)
+    return stats
     
-@router.post("/import")
+@router.post("/import", dependencies=[Depends(import_slot)])
 async def import_prospects(
     file: UploadFile = File(...),
     update_existing: bool = False,
@@ -172,120 +197,74 @@ async def import_prospects(
         raise HTTPException(status_code=400, detail="Invalid file type. Please upload an Excel file.")
     
     try:
-        # 2. Lire le fichier Excel
-        contents = await file.read()
-        df = pd.read_excel(io.BytesIO(contents))
+        # 2. Ouvrir le fichier Excel (lu par lots, tout en texte: téléphones, zéros initiaux...)
+        reader = await run_import(SheetReader, file.file, file.filename)
+    except Exception as e:
+        raise HTTPException(status_code=400, detail=f"Error processing file: {str(e)}")
 
+    try:
         # 3. Vérifier les colonnes requises
-        required_columns = ['email', 'first_name', 'last_name']
-        missing_columns = [col for col in required_columns if col not in df.columns]
+        missing = missing_columns(reader.columns, REQUIRED_COLUMNS)
 
-        if missing_columns:
-            raise HTTPException(status_code=400, detail=f"Missing required columns: {', '.join(missing_columns)}")
-        
-        # 4. Nettoyer les données
-        for col in df.columns:
-            if df[col].dtype == 'object':
-                df[col] = df[col].astype(str).str.strip()
-
-        # 5. Statistiques d'import
-        stats = {
-            'created': 0,
-            'updated': 0,
-            'skipped': 0,
-            'errors': []
-        }
+        if missing:
+            raise HTTPException(status_code=400, detail=f"Missing required columns: {', '.join(missing)}")
 
-        # 6. Traiter chaque ligne
-        for index, row in df.iterrows():
-            try:
-                # A. Valider l'email
-                email = str(row['email']).strip().lower()
-
-                if not email or email == 'nan' or '@' not in email:
-                    stats['errors'].append(f"Row {index + 2}: Invalid or empty email.")                  
-                    continue
-                
-                # B. Valider first_name et last_name
-                first_name = str(row['first_name']).strip()
-                last_name = str(row['last_name']).strip()
-
-                if not first_name or first_name == 'nan':
-                    stats['errors'].append(f"Row {index + 2}: Empty first_name.")
-                    continue
-                if not last_name or last_name == 'nan':
-                    stats['errors'].append(f"Row {index + 2}: Empty last_name.")
-                    continue
-                
-                # C. Chercher si le prospect existe déjà
-                existing_prospect = db.query(Prospect).filter(
-                    Prospect.email == email,
-                    Prospect.user_id == current_user.id
-                ).first()
-
-                # D. Préparer les champs optionnels
-                company = str(row.get('company', '')).strip() if 'company' in row else None
-                if company == 'nan' or company == '':
-                    company = None
-
-                job_title = str(row.get('job_title', '')).strip() if 'job_title' in row else None
-                if job_title == 'nan' or job_title == '':
-                    job_title = None
-
-                phone = str(row.get('phone', '')).strip() if 'phone' in row else None
-                if phone == 'nan' or phone == '':
-                    phone = None
-                
-                notes = str(row.get('notes', '')).strip() if 'notes' in row else None
-                if notes == 'nan' or notes == '':
-                    notes = None
-
-                # E. Logique de création ou mise à jour
-                if existing_prospect:
-                    if update_existing:
-                        existing_prospect.first_name = first_name
-                        existing_prospect.last_name = last_name
-                        existing_prospect.company = company
-                        existing_prospect.job_title = job_title
-                        existing_prospect.phone = phone
-                        existing_prospect.notes = notes
-                        stats['updated'] += 1
-                    else:
-                        stats['skipped'] += 1
-                else:
-                    new_prospect = Prospect(
-                        user_id=current_user.id,
-                        email=email,
-                        first_name=first_name,
-                        last_name=last_name,
-                        company=company,
-                        job_title=job_title,
-                        phone=phone,
-                        notes=notes
-                    )
-                    db.add(new_prospect)
-                    stats['created'] += 1
-
-            except Exception as e:
-                stats['errors'].append(f"Row {index + 2}: {str(e)}")
-                
-        # 7. Commit des changements
-        db.commit()
-
-        # 8. Retourner le résumé de l'import
-        return {
-            "success": True,
-            "total_rows": len(df),
-            "created": stats['created'],
-            "updated": stats['updated'],
-            "skipped": stats['skipped'],
-            "error_count": len(stats['errors']),
-            "errors": stats['errors'][:10]
-        }
+        try:
+            # 4. Import par lots (validation vectorisée, INSERT ... ON CONFLICT)
+            result = await run_import(import_prospect_frames, db, current_user.id, reader.frames(), update_existing)
+
+            # 5. Commit des changements (les lignes en erreur sont déjà écartées)
+            await run_import(db.commit)
+
+        except Exception as e:
+            await run_import(db.rollback)
+            raise HTTPException(status_code=400, detail=f"Error processing file: {str(e)}")
+    finally:
+        reader.close()
+
+    # 6. Retourner le résumé de l'import
+    return {
+        "success": True,
+        **result
+    }
     
-    except Exception as e:
-        db.rollback()
-        raise HTTPException(status_code=400, detail=f"Error processing file: {str(e)}")
+@router.post(
+    "/import/jobs",
+    response_model=ImportJobResponse,
+    status_code=status.HTTP_202_ACCEPTED,
+    dependencies=[Depends(import_slot)]
+)
+async def submit_prospect_import_job(
+    file: UploadFile = File(...),
+    update_existing: bool = False,
+    current_user: User = Depends(get_current_user),
+    db: Session = Depends(get_db)
+):
+    """
+    Import prospects from Excel file in the background.
+
+    For large show lists: the file is saved and imported by a worker, chunk
+    by chunk. Poll status_url for progress, download errors_url for every
+    rejected row. No need to upload again after a timeout.
+
+    Same parameters and columns as POST /api/prospects/import.
+    """
+    # 1. Vérifier le type de fichier
+    if not file.filename.endswith((".xls", ".xlsx")):
+        raise HTTPException(status_code=400, detail="Invalid file type. Please upload an Excel file.")
+
+    try:
+        # 2. Sauvegarder le fichier + vérifier les colonnes, puis mettre en file
+        job = await run_import(create_import_job, db, current_user.id, "prospects", file.file, file.filename, update_existing)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    # 3. Retourner les URLs de suivi
+    return ImportJobResponse(
+        job_id=job.id,
+        status_url=f"/api/imports/{job.id}",
+        errors_url=f"/api/imports/{job.id}/errors"
+    )
     
 @router.get("/export")
 def export_prospects(
@@ -309,10 +288,10 @@ def export_prospects(
                 "email": p.email,
                 "first_name": p.first_name,
                 "last_name": p.last_name,
-                "company": p.company,
-                "job_title": p.job_title,
-                "phone": p.phone,
-                "notes": p.notes
+                "company": p.company_name,
+                "job_title": p.position,
+                "phone": p.phone_number,
+                "notes": p.source_notes
             })
         
         df = pd.DataFrame(data)
@@ -13,19 +13,25 @@ from .campaign import (
     CampaignContactBulkAdd,
     CampaignContactUpdate,
     CampaignContactResponse,
+    CampaignContactListItem,
+    CampaignContactPage,
     CampaignProductAdd,
     CampaignProductBulkAdd,
     CampaignProductResponse,
+    CampaignProductListItem,
     CampaignStats
 )
 from .email import (
     EmailSendRequest,
     EmailSendResponse,
     BulkEmailSendRequest,
-    BulkEmailSendResponse,
+    BulkEmailJobResponse,
+    EmailJobProgress,
+    EmailStagingJobResponse,
     EmailPreviewRequest,
     EmailPreviewResponse,
 )
+from .import_job import ImportJobResponse, ImportJobProgress
 
 __all__ = [
     "Product",
@@ -47,17 +53,24 @@ __all__ = [
     "CampaignContactBulkAdd",
     "CampaignContactUpdate",
     "CampaignContactResponse",
+    "CampaignContactListItem",
+    "CampaignContactPage",
     "CampaignProductAdd",
     "CampaignProductBulkAdd",
     "CampaignProductResponse",
+    "CampaignProductListItem",
     "CampaignStats",
     # Email schemas
     "EmailSendRequest",
     "EmailSendResponse",
     "BulkEmailSendRequest",
-    "BulkEmailSendResponse",
+    "BulkEmailJobResponse",
+    "EmailJobProgress",
+    "EmailStagingJobResponse",
     "EmailPreviewRequest",
     "EmailPreviewResponse",
+    "ImportJobResponse",
+    "ImportJobProgress",
 ]
 
 from typing import List
@@ -76,4 +89,5 @@ class ProductImportResult(BaseModel):
     created: int
     updated: int
     skipped: int
+    error_count: int = 0
     errors: List[dict]
\ No newline at end of file
@@ -2,7 +2,7 @@
 Pydantic schemas for Campaign API
 """
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Dict, List, Optional
 from datetime import datetime, date
 
 # ==================== CAMPAIGN =====================
@@ -41,6 +41,7 @@ class CampaignResponse(CampaignBase):
     # Stats
     contact_count: Optional[int] = 0
     product_count: Optional[int] = 0
+    contacts_by_status: Optional[Dict[str, int]] = None  # Only with include_status_counts=true
 
     class Config:
         from_attributes = True
@@ -80,6 +81,29 @@ class CampaignContactResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class CampaignContactListItem(BaseModel):
+    """Contact of a campaign with its prospect details (contacts listing)."""
+    prospect_id: int
+    first_name: str
+    last_name: str
+    email: str
+    phone_number: Optional[str] = None
+    company_name: Optional[str] = None
+    position: Optional[str] = None
+    status: str
+    notes: Optional[str] = None
+    email_sequence_step: int
+    last_email_sent_at: Optional[datetime] = None
+    next_follow_up_scheduled_at: Optional[datetime] = None
+    response_received_at: Optional[datetime] = None
+    added_at: datetime
+
+class CampaignContactPage(BaseModel):
+    """One page of campaign contacts (keyset pagination)."""
+    items: List[CampaignContactListItem]
+    next_cursor: Optional[str] = None  # Pass it back as ?cursor= to get the next page
+    has_more: bool
+
 # ==================== CAMPAIGN PRODUCTS =====================
 class CampaignProductAdd(BaseModel):
     """Schema for adding a product to a campaign."""
@@ -103,6 +127,14 @@ class CampaignProductResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class CampaignProductListItem(BaseModel):
+    """Product of a campaign with its details (products listing)."""
+    product_id: int
+    name: str
+    short_description: Optional[str] = None
+    item_number: str
+    added_at: datetime
+
 # ==================== CAMPAIGN STATS =====================
 class CampaignStats(BaseModel):
     """Schema for campaign statistics."""
@@ -34,13 +34,29 @@ class BulkEmailSendRequest(BaseModel):
     template_override: Optional[str] = Field(None, description="Optional: override template")
 
 
-class BulkEmailSendResponse(BaseModel):
-    """Response after sending bulk emails."""
+class BulkEmailJobResponse(BaseModel):
+    """Response after queuing bulk emails in the outbox (202 Accepted)."""
+    job_id: Optional[str]  # None when every contact was skipped (nothing to poll)
+    queued: int
+    skipped: int  # Contacts already queued/sent for their current step
+    status_url: Optional[str]
+
+
+class EmailJobProgress(BaseModel):
+    """Progress counters of a bulk send job."""
+    job_id: str
     total: int
+    draft: int
+    ready: int
+    sending: int
     sent: int
     failed: int
-    errors: List[dict]
-    sent_contacts: List[dict]  # List of successfully sent emails with details
+    done: bool
+
+
+class EmailStagingJobResponse(BaseModel):
+    """Response after queuing the pre-rendering of campaign emails (202 Accepted)."""
+    contacts: int  # Contacts the background job will stage
 
 
 class EmailPreviewRequest(BaseModel):
@@ -0,0 +1,33 @@
+"""
+Pydantic schemas for background import jobs.
+"""
+from pydantic import BaseModel
+from typing import Optional
+from datetime import datetime
+
+
+class ImportJobResponse(BaseModel):
+    """Response after queuing an import (202 Accepted)."""
+    job_id: str
+    status_url: str
+    errors_url: str
+
+
+class ImportJobProgress(BaseModel):
+    """Progress counters of an import job."""
+    job_id: str
+    kind: str
+    filename: str
+    status: str  # queued, running, completed, failed
+    rows_processed: int
+    total_rows: Optional[int] = None  # Known once the job is completed
+    created: int
+    updated: int
+    skipped: int
+    error_count: int
+    last_error: Optional[str] = None
+    created_at: datetime
+    started_at: Optional[datetime] = None
+    finished_at: Optional[datetime] = None
+    done: bool
+    errors_url: str  # Full error report (CSV)
@@ -0,0 +1,182 @@
+"""
+Bulk linking of prospects and products to a campaign.
+
+Ids are processed in chunks of CAMPAIGN_LINK_CHUNK_SIZE, with two
+statements per chunk whatever its size:
+1. one ownership query (id IN (...) AND user_id = ...)
+2. one INSERT ... ON CONFLICT DO NOTHING RETURNING, which skips the links
+   that already exist (unique campaign_id + prospect_id / product_id)
+
+PostgreSQL only (ON CONFLICT of the postgresql dialect), like the
+migrations of the schema.
+"""
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Iterable, List
+import json
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import CAMPAIGN_LINK_CHUNK_SIZE
+from app.models.campaign import CampaignContact, CampaignProduct
+from app.models.product import Product
+from app.models.prospect import Prospect
+
+
+class CampaignLinker:
+    """
+    Links prospects or products to one campaign, chunk by chunk.
+
+    Nothing is committed: the caller commits (once, or after each add()).
+    """
+
+    # target -> (owned model, link model, link column, extra link values)
+    TARGETS = {
+        "prospects": (Prospect, CampaignContact, "prospect_id", {"status": "pending", "email_sequence_step": 0}),
+        "products": (Product, CampaignProduct, "product_id", {}),
+    }
+
+    def __init__(self, db: Session, campaign_id: int, user_id: int, target: str):
+        """
+        Args:
+            db: Database session
+            campaign_id: Campaign to link to (ownership already checked)
+            user_id: Owner of the campaign: only their prospects/products are linked
+            target: "prospects" or "products"
+        """
+        self.db = db
+        self.campaign_id = campaign_id
+        self.user_id = user_id
+        self.model, self.link_model, self.link_column, self.extra_values = self.TARGETS[target]
+
+        self.added: List[int] = []
+        self.skipped: List[int] = []
+        self.not_found: List[int] = []
+
+    def add(self, ids: Iterable[int]) -> None:
+        """Link ids, CAMPAIGN_LINK_CHUNK_SIZE at a time."""
+        chunk = []
+        for item_id in ids:
+            chunk.append(item_id)
+            if len(chunk) >= CAMPAIGN_LINK_CHUNK_SIZE:
+                self._link_chunk(chunk)
+                chunk = []
+
+        if chunk:
+            self._link_chunk(chunk)
+
+    def _link_chunk(self, ids: List[int]) -> None:
+        unique_ids = list(dict.fromkeys(ids))
+
+        # STEP 1: Ownership, one IN query
+        owned = {
+            row_id for (row_id,) in self.db.query(self.model.id).filter(
+                self.model.id.in_(unique_ids),
+                self.model.user_id == self.user_id
+            )
+        }
+
+        to_link = [item_id for item_id in unique_ids if item_id in owned]
+        self.not_found.extend(item_id for item_id in unique_ids if item_id not in owned)
+
+        # STEP 2: Insert missing links, existing ones are left alone
+        inserted = set()
+        if to_link:
+            now = datetime.utcnow()
+            link_column = getattr(self.link_model, self.link_column)
+            stmt = insert(self.link_model).values([
+                {
+                    "campaign_id": self.campaign_id,
+                    self.link_column: item_id,
+                    "added_at": now,
+                    **self.extra_values,
+                }
+                for item_id in to_link
+            ]).on_conflict_do_nothing(
+                index_elements=["campaign_id", self.link_column]
+            ).returning(link_column)
+
+            inserted = set(self.db.execute(stmt).scalars())
+
+        for item_id in to_link:
+            (self.added if item_id in inserted else self.skipped).append(item_id)
+
+        # Same id twice in the input: linked once, the repeats are skipped
+        if len(unique_ids) < len(ids):
+            seen = set()
+            for item_id in ids:
+                if item_id in seen and item_id in owned:
+                    self.skipped.append(item_id)
+                seen.add(item_id)
+
+    def summary(self, label: str) -> Dict[str, Any]:
+        return {
+            "message": f"Added {len(self.added)} {label}",
+            "added": self.added,
+            "skipped": self.skipped,
+            "not_found": self.not_found,
+        }
+
+
+# Longest NDJSON line accepted ({"prospect_id": 123} is ~20 bytes): a body
+# without newlines is rejected before it is held in memory
+MAX_NDJSON_LINE_LENGTH = 64
+
+
+async def iter_ndjson_ids(lines: AsyncIterator[bytes], key: str) -> AsyncIterator[int]:
+    """
+    Parse a streamed NDJSON body into ids, one line at a time.
+
+    Each line is either a bare id (123) or an object ({"prospect_id": 123}).
+    Blank lines are ignored.
+
+    Args:
+        lines: Body chunks as received (split on newlines here)
+        key: Id field of object lines ("prospect_id" / "product_id")
+
+    Raises:
+        ValueError: On a line that is not an id (or longer than
+                    MAX_NDJSON_LINE_LENGTH), with its line number
+    """
+    buffer = b""
+    line_number = 0
+
+    async for chunk in lines:
+        buffer += chunk
+        *complete, buffer = buffer.split(b"\n")
+
+        for line in complete:
+            line_number += 1
+            item_id = _parse_ndjson_id(line, key, line_number)
+            if item_id is not None:
+                yield item_id
+
+        if len(buffer) > MAX_NDJSON_LINE_LENGTH:
+            raise _line_too_long(line_number + 1)
+
+    item_id = _parse_ndjson_id(buffer, key, line_number + 1)
+    if item_id is not None:
+        yield item_id
+
+
+def _line_too_long(line_number: int) -> ValueError:
+    return ValueError(f"Line {line_number}: longer than {MAX_NDJSON_LINE_LENGTH} bytes")
+
+
+def _parse_ndjson_id(line: bytes, key: str, line_number: int):
+    if len(line) > MAX_NDJSON_LINE_LENGTH:
+        raise _line_too_long(line_number)
+
+    line = line.strip()
+    if not line:
+        return None
+
+    try:
+        value = json.loads(line)
+        if isinstance(value, dict):
+            value = value[key]
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise TypeError
+        return value
+    except (ValueError, KeyError, TypeError):
+        raise ValueError(f"Line {line_number}: expected an id or {{\"{key}\": id}}")
@@ -0,0 +1,237 @@
+"""
+Campaign contact statistics.
+
+On PostgreSQL the counters are kept by triggers on campaign_contacts, which
+append one delta row per (campaign, status) changed by a statement to
+campaign_stats_deltas. Appending never waits on another transaction:
+workers sending for the same campaign don't serialize on a shared counter
+row. compact_campaign_stats() folds the deltas into campaign_stats; readers
+add up both, so the stats cost a small read however big the campaign is.
+Compaction runs in every API process (compact_campaign_stats_periodically,
+started by the app lifespan) and in the follow-up scheduler, so the deltas
+never pile up when the scheduler is not deployed. Other databases (no trigger) get the same
+numbers from one GROUP BY aggregate over campaign_contacts.
+
+The last send of a campaign is MAX(last_email_sent_at) over its current
+contacts on every database, read from ix_campaign_contacts_campaign_last_sent.
+"""
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+import asyncio
+import logging
+
+from sqlalchemy import func, select, text, union_all
+from sqlalchemy.orm import Session
+
+from app.core.config import CAMPAIGN_STATS_COMPACT_INTERVAL
+from app.db import SessionLocal
+from app.models.campaign import Campaign, CampaignContact, CampaignProduct
+from app.models.campaign_stats import CampaignStat, CampaignStatDelta
+
+logger = logging.getLogger(__name__)
+
+# Fold every delta into its counter row, in one statement. Deltas appended
+# meanwhile are left for the next run; a concurrent run skips the rows
+# this one deletes.
+COMPACT_SQL = text("""
+    WITH moved AS (
+        DELETE FROM campaign_stats_deltas
+        RETURNING campaign_id, status, contact_count, emails_sent
+    )
+    INSERT INTO campaign_stats (campaign_id, status, contact_count, emails_sent)
+    SELECT campaign_id, status, SUM(contact_count), SUM(emails_sent)
+    FROM moved
+    GROUP BY campaign_id, status
+    ON CONFLICT (campaign_id, status) DO UPDATE SET
+        contact_count = campaign_stats.contact_count + EXCLUDED.contact_count,
+        emails_sent = campaign_stats.emails_sent + EXCLUDED.emails_sent
+""")
+
+
+def _uses_counter_table(db: Session) -> bool:
+    """True when campaign_stats is maintained by the database (PostgreSQL triggers)."""
+    return db.get_bind().dialect.name == "postgresql"
+
+
+def _counters():
+    """Compacted counters and pending deltas, to be summed per (campaign, status)."""
+    return union_all(
+        select(CampaignStat.campaign_id, CampaignStat.status, CampaignStat.contact_count, CampaignStat.emails_sent),
+        select(
+            CampaignStatDelta.campaign_id, CampaignStatDelta.status,
+            CampaignStatDelta.contact_count, CampaignStatDelta.emails_sent
+        ),
+    ).subquery("counters")
+
+
+def get_contact_stats(db: Session, campaign_id: int) -> Dict[str, Any]:
+    """
+    Contact counters of a campaign.
+
+    Returns:
+        Dictionary with:
+            - total: int
+            - by_status: {status: count}
+            - total_emails_sent: int (sum of sequence steps)
+            - last_email_sent_at: datetime or None (last send to a current contact)
+    """
+    if _uses_counter_table(db):
+        counters = _counters()
+        rows = db.query(
+            counters.c.status,
+            func.sum(counters.c.contact_count),
+            func.sum(counters.c.emails_sent)
+        ).filter(
+            counters.c.campaign_id == campaign_id
+        ).group_by(
+            counters.c.status
+        ).all()
+    else:
+        rows = aggregate_contact_stats(db, campaign_id)
+
+    by_status: Dict[str, int] = {}
+    total_emails_sent = 0
+
+    for contact_status, contact_count, emails_sent in rows:
+        if contact_count:
+            by_status[contact_status] = int(contact_count)
+        total_emails_sent += int(emails_sent or 0)
+
+    return {
+        "total": sum(by_status.values()),
+        "by_status": by_status,
+        "total_emails_sent": total_emails_sent,
+        "last_email_sent_at": last_email_sent_at(db, campaign_id),
+    }
+
+
+def aggregate_contact_stats(db: Session, campaign_id: int):
+    """
+    Compute the counters from campaign_contacts with one GROUP BY query.
+
+    Returns:
+        Rows of (status, contact_count, emails_sent)
+    """
+    return db.query(
+        CampaignContact.status,
+        func.count(CampaignContact.id),
+        func.coalesce(func.sum(CampaignContact.email_sequence_step), 0)
+    ).filter(
+        CampaignContact.campaign_id == campaign_id
+    ).group_by(
+        CampaignContact.status
+    ).all()
+
+
+def last_email_sent_at(db: Session, campaign_id: int) -> Optional[datetime]:
+    """Last send to one of the current contacts of a campaign (index lookup)."""
+    return db.query(func.max(CampaignContact.last_email_sent_at)).filter(
+        CampaignContact.campaign_id == campaign_id
+    ).scalar()
+
+
+def compact_campaign_stats(db: Session) -> int:
+    """
+    Fold the pending deltas into campaign_stats (committed here).
+
+    Returns:
+        Number of (campaign, status) counters updated
+    """
+    if not _uses_counter_table(db):
+        return 0
+
+    updated = db.execute(COMPACT_SQL).rowcount
+    db.commit()
+    return updated
+
+
+def _compact_in_new_session() -> int:
+    db = SessionLocal()
+    try:
+        return compact_campaign_stats(db)
+    finally:
+        db.close()
+
+
+async def compact_campaign_stats_periodically(interval: float = CAMPAIGN_STATS_COMPACT_INTERVAL) -> None:
+    """
+    Compact the campaign stats every `interval` seconds, until cancelled.
+
+    Started by the app lifespan: concurrent runs (several API processes,
+    the scheduler) are safe, each delta row is folded once.
+    """
+    while True:
+        await asyncio.sleep(interval)
+        try:
+            await asyncio.to_thread(_compact_in_new_session)
+        except Exception:
+            logger.exception("Campaign stats compaction failed")
+
+
+def campaign_count_columns(db: Session) -> Tuple[Any, Any]:
+    """
+    Correlated subqueries counting the contacts and products of each
+    Campaign row. Added to a Campaign query, the counts come back with the
+    campaigns in the same query.
+
+    Returns:
+        (contact_count, product_count) labeled columns
+    """
+    if _uses_counter_table(db):
+        counters = _counters()
+        contact_count = select(
+            func.coalesce(func.sum(counters.c.contact_count), 0)
+        ).where(counters.c.campaign_id == Campaign.id).scalar_subquery()
+    else:
+        contact_count = select(
+            func.count(CampaignContact.id)
+        ).where(CampaignContact.campaign_id == Campaign.id).scalar_subquery()
+
+    product_count = select(
+        func.count(CampaignProduct.id)
+    ).where(CampaignProduct.campaign_id == Campaign.id).scalar_subquery()
+
+    return contact_count.label("contact_count"), product_count.label("product_count")
+
+
+def contacts_by_status(db: Session, campaign_ids: List[int]) -> Dict[int, Dict[str, int]]:
+    """
+    Contact count per status for several campaigns, in one query.
+
+    Returns:
+        Mapping campaign_id -> {status: count} (every requested campaign is present)
+    """
+    breakdowns: Dict[int, Dict[str, int]] = {campaign_id: {} for campaign_id in campaign_ids}
+    if not campaign_ids:
+        return breakdowns
+
+    if _uses_counter_table(db):
+        counters = _counters()
+        rows = db.query(
+            counters.c.campaign_id,
+            counters.c.status,
+            func.sum(counters.c.contact_count)
+        ).filter(
+            counters.c.campaign_id.in_(campaign_ids)
+        ).group_by(
+            counters.c.campaign_id,
+            counters.c.status
+        ).having(
+            func.sum(counters.c.contact_count) > 0
+        ).all()
+    else:
+        rows = db.query(
+            CampaignContact.campaign_id,
+            CampaignContact.status,
+            func.count(CampaignContact.id)
+        ).filter(
+            CampaignContact.campaign_id.in_(campaign_ids)
+        ).group_by(
+            CampaignContact.campaign_id,
+            CampaignContact.status
+        ).all()
+
+    for campaign_id, contact_status, count in rows:
+        breakdowns[campaign_id][contact_status] = int(count)
+
+    return breakdowns
@@ -0,0 +1,33 @@
+"""
+Shared helper to store detected replies on campaign contacts.
+"""
+from typing import Dict
+from datetime import datetime
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.models.campaign import CampaignContact
+
+
+def save_contact_responses(db: Session, responses: Dict[int, Dict]) -> None:
+    """
+    Mark contacts as responded in one bulk UPDATE (by primary key). No commit.
+
+    Args:
+        db: Database session
+        responses: Mapping campaign_contact_id -> response data
+                   (has_response, response_content, response_date)
+    """
+    if not responses:
+        return
+
+    now = datetime.utcnow()
+    db.execute(update(CampaignContact), [
+        {
+            "id": contact_id,
+            "status": "responded",
+            "response_received_at": now,
+            "last_response_content": (response.get("response_content") or "")[:1000],
+        }
+        for contact_id, response in responses.items()
+    ])
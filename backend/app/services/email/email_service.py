@@ -2,16 +2,45 @@
 Email service orchestrator for campaigns.
 Coordinates template rendering, email sending, and database updates.
 """
-from typing import Optional, Dict, Any
+from typing import Optional, Dict, Any, Tuple
+from sqlalchemy import insert
 from sqlalchemy.orm import Session
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from collections import defaultdict
 from datetime import datetime
+import logging
+import threading
 
+from app.core.config import EMAIL_SEND_CONCURRENCY
+from app.db import SessionLocal
 from app.models.user import User
 from app.models.campaign import Campaign, CampaignContact
 from app.models.prospect import Prospect
+from app.models.staged_email import StagedEmail
 from app.services.email.template_renderer import email_renderer
-from app.services.email.gmail_sender import send_email_via_gmail
-from app.services.email.outlook_sender import send_email_via_outlook
+from app.services.email.gmail_sender import send_email_via_gmail, send_raw_via_gmail
+from app.services.email.outlook_sender import send_email_via_outlook, send_emails_batch_via_outlook
+from app.services.email.graph_batch import GRAPH_BATCH_SIZE
+from app.services.email.email_staging import load_staged_emails, render_staged_payloads, staged_version
+
+logger = logging.getLogger(__name__)
+
+# Contact updates committed together by parallel bulk sends
+SEND_COMMIT_CHUNK = GRAPH_BATCH_SIZE
+
+# Per-user send slots, shared by every bulk run / outbox worker of the process
+_user_send_slots: Dict[int, threading.BoundedSemaphore] = {}
+_user_send_slots_lock = threading.Lock()
+
+
+def _get_user_send_slots(user_id: int) -> threading.BoundedSemaphore:
+    """Return the semaphore limiting concurrent sends for this user."""
+    with _user_send_slots_lock:
+        slots = _user_send_slots.get(user_id)
+        if slots is None:
+            slots = threading.BoundedSemaphore(EMAIL_SEND_CONCURRENCY)
+            _user_send_slots[user_id] = slots
+        return slots
 
 
 class EmailService:
@@ -65,47 +94,16 @@ class EmailService:
         }
         return subjects.get(sequence_step, f"Following up from {campaign_name}")
     
-    def send_campaign_email(
-        self,
-        campaign: Campaign,
-        contact: CampaignContact,
-        prospect: Prospect,
-        user: User,
-        template_override: Optional[str] = None
-    ) -> Dict[str, Any]:
+    def _get_provider(self, user: User) -> str:
         """
-        Send email to a campaign contact.
-        
-        This is the MAIN method - it does everything:
-        1. Checks user has email configured
-        2. Renders the template
-        3. Sends via Gmail or Outlook
-        4. Updates database with thread info
-        
-        Args:
-            campaign: Campaign object
-            contact: CampaignContact link
-            prospect: Prospect to send to
-            user: User sending the email
-            template_override: Optional template name override
-        
-        Returns:
-            Dictionary with send result:
-                - success: bool
-                - message_id: str
-                - thread_id: str
-                - provider: str (gmail or outlook)
+        Determine which provider to send with.
         
         Raises:
             Exception: If user doesn't have email configured
-            Exception: If sending fails
         """
-        
-        # STEP 1: Verify user has email configured
         if not user.has_email_configured:
             raise Exception("User does not have any email provider connected")
         
-        # Determine which provider to use
         provider = user.default_email_provider
         
         if not provider:
@@ -117,63 +115,148 @@ class EmailService:
             else:
                 raise Exception("No email provider configured")
         
-        # STEP 2: Get the right template
+        return provider
+    
+    @staticmethod
+    def _campaign_template_vars(campaign: Campaign, user: User) -> Dict[str, Any]:
+        """
+        Template variables shared by every email of a campaign.
+        """
+        return {
+            "campaign_name": campaign.name,
+            "campaign_location": campaign.location,
+            "sender_name": f"{user.first_name} {user.last_name}" if user.first_name else "The Team",
+            # Add any extra variables here
+            "distributor_name": campaign.distributor_name,
+        }
+    
+    @staticmethod
+    def _prospect_template_vars(prospect: Prospect) -> Dict[str, Any]:
+        """
+        Personal template variables of one email.
+        """
+        return {
+            "first_name": prospect.first_name,
+            "last_name": prospect.last_name,
+            "company_name": prospect.company_name or "your company",
+        }
+    
+    def _staging_job(self, campaign: Campaign, contact: CampaignContact, prospect: Prospect) -> Dict[str, Any]:
+        """
+        Per-email inputs of a staged payload (plain data, see email_staging).
+        """
+        return {
+            "contact_id": contact.id,
+            "to_email": prospect.email,
+            "subject": self._get_email_subject(campaign.name, contact.email_sequence_step),
+            "prospect_vars": self._prospect_template_vars(prospect),
+            "reply_to_message_id": contact.email_message_id,
+        }
+    
+    @staticmethod
+    def _from_email(user: User, provider: str) -> Optional[str]:
+        """
+        From address baked into staged Gmail messages (Outlook sets its own).
+        """
+        return user.gmail_email if provider == "gmail" else None
+    
+    def _render_email(
+        self,
+        campaign: Campaign,
+        contact: CampaignContact,
+        prospect: Prospect,
+        user: User,
+        template_override: Optional[str] = None
+    ) -> Tuple[str, str]:
+        """
+        Render subject and HTML body for a contact's current sequence step.
+        
+        Returns:
+            (subject, html_body)
+        """
         if template_override:
             template_name = template_override
         else:
             template_name = self._get_template_name(contact.email_sequence_step)
         
-        # STEP 3: Render the template with campaign + prospect data
         try:
-            html_body = email_renderer.render_campaign_email(
-                template_name=template_name,
-                prospect_first_name=prospect.first_name,
-                prospect_last_name=prospect.last_name,
-                prospect_company=prospect.company_name or "your company",
-                campaign_name=campaign.name,
-                campaign_location=campaign.location,
-                sender_name=f"{user.first_name} {user.last_name}" if user.first_name else "The Team",
-                # Add any extra variables here
-                distributor_name=campaign.distributor_name,
-            )
+            html_body = email_renderer.render_campaign_batch(
+                template_name,
+                self._campaign_template_vars(campaign, user),
+                [self._prospect_template_vars(prospect)]
+            )[0]
         except Exception as e:
             raise Exception(f"Failed to render email template: {str(e)}")
         
-        # STEP 4: Generate subject
         subject = self._get_email_subject(campaign.name, contact.email_sequence_step)
         
-        # STEP 5: Send the email via the right provider
-        try:
-            if provider == "gmail":
-                result = send_email_via_gmail(
-                    user=user,
-                    db=self.db,
-                    to_email=prospect.email,
-                    subject=subject,
-                    html_body=html_body,
-                    reply_to_message_id=contact.email_message_id,  # For threading
-                    thread_id=contact.email_thread_id              # For threading
-                )
-            
-            elif provider == "outlook":
-                result = send_email_via_outlook(
-                    user=user,
-                    db=self.db,
-                    to_email=prospect.email,
-                    subject=subject,
-                    html_body=html_body,
-                    reply_to_message_id=contact.email_message_id,
-                    conversation_id=contact.email_thread_id
-                )
-            
-            else:
-                raise Exception(f"Unknown email provider: {provider}")
-            
-        except Exception as e:
-            # If token refresh fails or sending fails
-            raise Exception(f"Failed to send email: {str(e)}")
+        return subject, html_body
+    
+    @staticmethod
+    def _deliver(
+        provider: str,
+        user: User,
+        db: Session,
+        to_email: str,
+        subject: str,
+        html_body: str,
+        reply_to_message_id: Optional[str] = None,
+        thread_id: Optional[str] = None,
+        raw_message: Optional[str] = None,
+        message_id: Optional[str] = None
+    ) -> Dict[str, str]:
+        """
+        Send one rendered email via the right provider.
+        Waits for a free per-user send slot first (EMAIL_SEND_CONCURRENCY).
         
-        # STEP 6: Update database with send info
+        raw_message / message_id: staged Gmail message, sent as is
+        (subject and html_body are then ignored).
+        """
+        with _get_user_send_slots(user.id):
+            try:
+                if provider == "gmail" and raw_message:
+                    return send_raw_via_gmail(
+                        user=user,
+                        db=db,
+                        raw_message=raw_message,
+                        message_id=message_id,
+                        thread_id=thread_id
+                    )
+                
+                elif provider == "gmail":
+                    return send_email_via_gmail(
+                        user=user,
+                        db=db,
+                        to_email=to_email,
+                        subject=subject,
+                        html_body=html_body,
+                        reply_to_message_id=reply_to_message_id,  # For threading
+                        thread_id=thread_id                       # For threading
+                    )
+                
+                elif provider == "outlook":
+                    return send_email_via_outlook(
+                        user=user,
+                        db=db,
+                        to_email=to_email,
+                        subject=subject,
+                        html_body=html_body,
+                        reply_to_message_id=reply_to_message_id,
+                        conversation_id=thread_id
+                    )
+                
+                else:
+                    raise Exception(f"Unknown email provider: {provider}")
+                
+            except Exception as e:
+                # If token refresh fails or sending fails
+                raise Exception(f"Failed to send email: {str(e)}")
+    
+    @staticmethod
+    def _record_send(contact: CampaignContact, result: Dict[str, str]) -> None:
+        """
+        Update a contact after a successful send (no commit).
+        """
         contact.email_sequence_step += 1  # Increment step
         contact.last_email_sent_at = datetime.utcnow()  # Save timestamp
         
@@ -189,10 +272,93 @@ class EmailService:
         # Update status to 'contacted' if this was first email
         if contact.email_sequence_step == 1 and contact.status == "pending":
             contact.status = "contacted"
+    
+    def send_campaign_email(
+        self,
+        campaign: Campaign,
+        contact: CampaignContact,
+        prospect: Prospect,
+        user: User,
+        template_override: Optional[str] = None,
+        commit: bool = True
+    ) -> Dict[str, Any]:
+        """
+        Send email to a campaign contact.
         
-        self.db.commit()
+        This is the MAIN method - it does everything:
+        1. Checks user has email configured
+        2. Renders the template
+        3. Sends via Gmail or Outlook
+        4. Updates database with thread info
+        
+        Args:
+            campaign: Campaign object
+            contact: CampaignContact link
+            prospect: Prospect to send to
+            user: User sending the email
+            template_override: Optional template name override
+            commit: Commit the contact update (False lets the caller commit
+                    it together with its own changes, e.g. the outbox row)
+        
+        Returns:
+            Dictionary with send result:
+                - success: bool
+                - message_id: str
+                - thread_id: str
+                - provider: str (gmail or outlook)
+        
+        Raises:
+            Exception: If user doesn't have email configured
+            Exception: If sending fails
+        """
+        
+        # STEP 1: Verify user has email configured + pick provider
+        provider = self._get_provider(user)
+        
+        # STEP 2: Use the staged email if there is one, else render
+        # subject + body with campaign + prospect data
+        staged = None
+        if not template_override:
+            staged = load_staged_emails(
+                self.db,
+                provider,
+                self._campaign_template_vars(campaign, user),
+                self._from_email(user, provider),
+                {contact.id: (
+                    contact.email_sequence_step,
+                    self._get_template_name(contact.email_sequence_step),
+                    self._staging_job(campaign, contact, prospect)
+                )}
+            ).get(contact.id)
+        
+        if staged:
+            staged_row, payload = staged
+            email = {"subject": "", "html_body": "", **payload}
+        else:
+            staged_row = None
+            subject, html_body = self._render_email(campaign, contact, prospect, user, template_override)
+            email = {"subject": subject, "html_body": html_body}
+        
+        # STEP 3: Send the email via the right provider
+        result = self._deliver(
+            provider=provider,
+            user=user,
+            db=self.db,
+            to_email=prospect.email,
+            reply_to_message_id=contact.email_message_id,
+            thread_id=contact.email_thread_id,
+            **email
+        )
+        
+        # STEP 4: Update database with send info (a staged email is used once)
+        self._record_send(contact, result)
+        if staged_row is not None:
+            self.db.delete(staged_row)
         
-        # STEP 7: Return success result
+        if commit:
+            self.db.commit()
+        
+        # STEP 5: Return success result
         return {
             "success": True,
             "message_id": result.get("message_id", ""),
@@ -202,19 +368,158 @@ class EmailService:
             "sent_to": prospect.email
         }
     
-    def send_bulk_campaign_emails(
+    def _with_prospects(self, contacts: list, errors: list) -> list:
+        """
+        Pair contacts with their prospect (one query).
+        Contacts without prospect are reported in errors.
+        
+        Returns:
+            List of (contact, prospect)
+        """
+        prospect_ids = {contact.prospect_id for contact in contacts}
+        prospects = {
+            prospect.id: prospect
+            for prospect in self.db.query(Prospect).filter(Prospect.id.in_(prospect_ids)).all()
+        }
+        
+        pairs = []
+        for contact in contacts:
+            prospect = prospects.get(contact.prospect_id)
+            
+            if not prospect:
+                errors.append({
+                    "prospect_id": contact.prospect_id,
+                    "error": "Prospect not found"
+                })
+                continue
+            
+            pairs.append((contact, prospect))
+        
+        return pairs
+    
+    def stage_campaign_emails(
         self,
         campaign: Campaign,
         contacts: list[CampaignContact],
         user: User
+    ) -> Dict[str, Any]:
+        """
+        Render and encode the next email of each contact ahead of sending.
+        
+        Contacts that already have a staged email for their current step and
+        version (same template, same data) are skipped. Sending them later
+        only needs the provider call (see email_staging).
+        
+        Args:
+            campaign: Campaign object
+            contacts: List of CampaignContact objects
+            user: User who will send the emails
+        
+        Returns:
+            Dictionary with:
+                - total: int
+                - staged: int (newly staged)
+                - already_staged: int
+                - failed: int
+                - errors: list of error details
+        """
+        provider = self._get_provider(user)
+        errors = []
+        pairs = self._with_prospects(contacts, errors)
+        
+        campaign_ctx = self._campaign_template_vars(campaign, user)
+        from_email = self._from_email(user, provider)
+        
+        # Plain-data jobs: they may go to other processes
+        expected = {
+            contact.id: (
+                contact.email_sequence_step,
+                self._get_template_name(contact.email_sequence_step),
+                self._staging_job(campaign, contact, prospect)
+            )
+            for contact, prospect in pairs
+        }
+        already_staged = load_staged_emails(self.db, provider, campaign_ctx, from_email, expected)
+        
+        # One group of jobs per template
+        groups: Dict[str, list] = defaultdict(list)
+        prospects_by_contact = {}
+        for contact, prospect in pairs:
+            if contact.id in already_staged:
+                continue
+            
+            prospects_by_contact[contact.id] = prospect
+            _, template_name, job = expected[contact.id]
+            groups[template_name].append(job)
+        
+        versions = {
+            template_name: email_renderer.template_version(f"campaigns/{template_name}")
+            for template_name in groups
+        }
+        
+        results = render_staged_payloads(groups, campaign_ctx, provider, from_email)
+        
+        rows = []
+        for contact_id, payload, error in results:
+            if error:
+                prospect = prospects_by_contact[contact_id]
+                errors.append({
+                    "prospect_id": prospect.id,
+                    "prospect_email": prospect.email,
+                    "error": error
+                })
+                continue
+            
+            step, template_name, job = expected[contact_id]
+            rows.append({
+                "campaign_id": campaign.id,
+                "campaign_contact_id": contact_id,
+                "sequence_step": step,
+                "template_name": template_name,
+                "template_version": staged_version(versions[template_name], campaign_ctx, from_email, job),
+                "provider": provider,
+                "payload": payload,
+                "created_at": datetime.utcnow(),
+            })
+        
+        if rows:
+            # Replace outdated staged emails (older step / version / provider)
+            self.db.query(StagedEmail).filter(
+                StagedEmail.campaign_contact_id.in_([row["campaign_contact_id"] for row in rows])
+            ).delete(synchronize_session=False)
+            self.db.execute(insert(StagedEmail), rows)
+        
+        self.db.commit()
+        
+        return {
+            "total": len(contacts),
+            "staged": len(rows),
+            "already_staged": len(already_staged),
+            "failed": len(contacts) - len(rows) - len(already_staged),
+            "errors": errors
+        }
+    
+    def send_bulk_campaign_emails(
+        self,
+        campaign: Campaign,
+        contacts: list[CampaignContact],
+        user: User,
+        concurrency: Optional[int] = None
     ) -> Dict[str, Any]:
         """
         Send emails to multiple campaign contacts.
         
+        With concurrency > 1, provider calls run on a thread pool (one DB
+        session per worker, used for token refreshes) and contact updates
+        are committed SEND_COMMIT_CHUNK at a time as results come in.
+        Concurrent sends of a user are capped
+        by EMAIL_SEND_CONCURRENCY whatever the value passed here.
+        
         Args:
             campaign: Campaign object
             contacts: List of CampaignContact objects
             user: User sending the emails
+            concurrency: Parallel sends (default: EMAIL_SEND_CONCURRENCY, 1 = sequential)
         
         Returns:
             Dictionary with:
@@ -222,47 +527,266 @@ class EmailService:
                 - sent: int (successfully sent)
                 - failed: int (failed to send)
                 - errors: list of error details
+                - sent_contact_ids: list of CampaignContact IDs sent
         """
+        if concurrency is None:
+            concurrency = EMAIL_SEND_CONCURRENCY
+        
         total = len(contacts)
-        sent = 0
-        failed = 0
+        sent_contact_ids = []
         errors = []
         
-        for contact in contacts:
-            # Get prospect data
-            prospect = self.db.query(Prospect).filter(
-                Prospect.id == contact.prospect_id
-            ).first()
-            
-            if not prospect:
-                failed += 1
-                errors.append({
-                    "prospect_id": contact.prospect_id,
-                    "error": "Prospect not found"
-                })
-                continue
-            
+        to_send = self._with_prospects(contacts, errors)
+        
+        if concurrency <= 1:
+            # Sequential mode: one commit per email
+            for contact, prospect in to_send:
+                try:
+                    self.send_campaign_email(
+                        campaign=campaign,
+                        contact=contact,
+                        prospect=prospect,
+                        user=user
+                    )
+                    sent_contact_ids.append(contact.id)
+                    
+                except Exception as e:
+                    errors.append({
+                        "prospect_id": prospect.id,
+                        "prospect_email": prospect.email,
+                        "error": str(e)
+                    })
+        else:
+            self._send_parallel(campaign, to_send, user, concurrency, sent_contact_ids, errors)
+        
+        return {
+            "total": total,
+            "sent": len(sent_contact_ids),
+            "failed": total - len(sent_contact_ids),
+            "errors": errors,
+            "sent_contact_ids": sent_contact_ids
+        }
+    
+    def _send_parallel(
+        self,
+        campaign: Campaign,
+        to_send: list,
+        user: User,
+        concurrency: int,
+        sent_contact_ids: list,
+        errors: list
+    ) -> None:
+        """
+        Parallel mode of send_bulk_campaign_emails.
+        Renders in this thread, sends on a pool, commits updates in chunks
+        as results come in: if the run stops midway, the emails already
+        sent are recorded (at most one chunk of updates is lost).
+        Outlook emails go out GRAPH_BATCH_SIZE at a time through Graph $batch.
+        """
+        provider = self._get_provider(user)
+        user_id = user.id
+        
+        campaign_ctx = self._campaign_template_vars(campaign, user)
+        
+        # Staged emails are sent as they are
+        staged = load_staged_emails(self.db, provider, campaign_ctx, self._from_email(user, provider), {
+            contact.id: (
+                contact.email_sequence_step,
+                self._get_template_name(contact.email_sequence_step),
+                self._staging_job(campaign, contact, prospect)
+            )
+            for contact, prospect in to_send
+        })
+        
+        jobs = []
+        for contact, prospect in to_send:
+            if contact.id in staged:
+                jobs.append((contact, prospect, {
+                    "to_email": prospect.email,
+                    "subject": "",
+                    "html_body": "",
+                    "reply_to_message_id": contact.email_message_id,
+                    "thread_id": contact.email_thread_id,
+                    **staged[contact.id][1],
+                }))
+        
+        # Render the others up front (ORM objects stay in this thread),
+        # one batch per template: campaign variables are built only once
+        by_template: Dict[str, list] = defaultdict(list)
+        for contact, prospect in to_send:
+            if contact.id not in staged:
+                by_template[self._get_template_name(contact.email_sequence_step)].append((contact, prospect))
+        
+        for template_name, group in by_template.items():
             try:
-                # Send email to this contact
-                result = self.send_campaign_email(
-                    campaign=campaign,
-                    contact=contact,
-                    prospect=prospect,
-                    user=user
+                bodies = email_renderer.render_campaign_batch(
+                    template_name,
+                    campaign_ctx,
+                    [self._prospect_template_vars(prospect) for _, prospect in group]
                 )
-                sent += 1
-                
             except Exception as e:
-                failed += 1
-                errors.append({
-                    "prospect_id": prospect.id,
-                    "prospect_email": prospect.email,
-                    "error": str(e)
-                })
+                for _, prospect in group:
+                    errors.append({
+                        "prospect_id": prospect.id,
+                        "prospect_email": prospect.email,
+                        "error": f"Failed to render email template: {str(e)}"
+                    })
+                continue
+            
+            for (contact, prospect), html_body in zip(group, bodies):
+                jobs.append((contact, prospect, {
+                    "to_email": prospect.email,
+                    "subject": self._get_email_subject(campaign.name, contact.email_sequence_step),
+                    "html_body": html_body,
+                    "reply_to_message_id": contact.email_message_id,
+                    "thread_id": contact.email_thread_id,
+                }))
         
-        return {
-            "total": total,
-            "sent": sent,
-            "failed": failed,
-            "errors": errors
-        }
\ No newline at end of file
+        # Chunk commits must not expire (and reload one by one) every contact
+        expire_on_commit = self.db.expire_on_commit
+        self.db.expire_on_commit = False
+        
+        try:
+            with ThreadPoolExecutor(max_workers=concurrency, thread_name_prefix="email-send") as executor:
+                if provider == "outlook":
+                    # Graph $batch: one HTTP request per GRAPH_BATCH_SIZE emails
+                    chunks = [jobs[i:i + GRAPH_BATCH_SIZE] for i in range(0, len(jobs), GRAPH_BATCH_SIZE)]
+                    futures = {
+                        executor.submit(
+                            _send_outlook_batch_with_own_session,
+                            user_id,
+                            [email for _, _, email in chunk]
+                        ): chunk
+                        for chunk in chunks
+                    }
+                else:
+                    futures = {
+                        executor.submit(_send_with_own_session, provider, user_id, job[2]): [job]
+                        for job in jobs
+                    }
+                
+                uncommitted = 0
+                
+                for future in as_completed(futures):
+                    chunk = futures[future]
+                    try:
+                        results = future.result()
+                        if provider != "outlook":
+                            results = [results]
+                    except Exception as e:
+                        results = [{"error": str(e)}] * len(chunk)
+                    
+                    for (contact, prospect, _), result in zip(chunk, results):
+                        if "error" in result:
+                            errors.append({
+                                "prospect_id": prospect.id,
+                                "prospect_email": prospect.email,
+                                "error": result["error"]
+                            })
+                            continue
+                        
+                        self._record_send(contact, result)
+                        sent_contact_ids.append(contact.id)
+                        uncommitted += 1
+                        
+                        if contact.id in staged:
+                            self.db.delete(staged[contact.id][0])
+                    
+                    # Batched commit of the CampaignContact updates received so far
+                    if uncommitted >= SEND_COMMIT_CHUNK:
+                        self.db.commit()
+                        uncommitted = 0
+        
+        finally:
+            self.db.expire_on_commit = expire_on_commit
+        
+        self.db.commit()
+
+
+def _send_with_own_session(provider: str, user_id: int, email: Dict[str, Any]) -> Dict[str, str]:
+    """
+    Send one email from a pool thread, with its own DB session.
+    The session is only used to persist refreshed OAuth tokens.
+    """
+    db = SessionLocal()
+    try:
+        user = db.get(User, user_id)
+        return EmailService._deliver(provider=provider, user=user, db=db, **email)
+    finally:
+        db.close()
+
+
+def _send_outlook_batch_with_own_session(user_id: int, emails: list) -> list:
+    """
+    Send a chunk of emails with one Graph $batch call, from a pool thread.
+    A whole batch takes a single per-user send slot.
+    
+    Returns:
+        One result per email, {"error": str} for failed ones
+    """
+    db = SessionLocal()
+    try:
+        user = db.get(User, user_id)
+        batch = [
+            {
+                "to_email": email["to_email"],
+                "subject": email["subject"],
+                "html_body": email["html_body"],
+                "reply_to_message_id": email["reply_to_message_id"],
+                "conversation_id": email["thread_id"],
+            }
+            for email in emails
+        ]
+        with _get_user_send_slots(user_id):
+            return send_emails_batch_via_outlook(user=user, db=db, emails=batch)
+    finally:
+        db.close()
+
+
+def run_staging_job(
+    campaign_id: int,
+    user_id: int,
+    prospect_ids: Optional[list] = None,
+    status_filter: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Stage the emails of a campaign's contacts, from a background worker
+    (queue EMAIL_STAGING_QUEUE_NAME).
+    
+    Args:
+        campaign_id: Campaign to stage
+        user_id: Owner of the campaign (sender)
+        prospect_ids: Only these prospects (None = every contact)
+        status_filter: Only contacts with this status
+    
+    Returns:
+        The stage_campaign_emails result (also logged)
+    """
+    db = SessionLocal()
+    
+    try:
+        campaign = db.query(Campaign).filter(
+            Campaign.id == campaign_id,
+            Campaign.user_id == user_id
+        ).first()
+        user = db.get(User, user_id)
+        
+        if not campaign or not user:
+            logger.warning("Staging job: campaign %s of user %s no longer exists", campaign_id, user_id)
+            return {"total": 0, "staged": 0, "already_staged": 0, "failed": 0, "errors": []}
+        
+        query = db.query(CampaignContact).filter(CampaignContact.campaign_id == campaign_id)
+        if prospect_ids:
+            query = query.filter(CampaignContact.prospect_id.in_(prospect_ids))
+        if status_filter:
+            query = query.filter(CampaignContact.status == status_filter)
+        
+        result = EmailService(db).stage_campaign_emails(campaign=campaign, contacts=query.all(), user=user)
+        
+        logger.info(
+            "Campaign %s: %s emails staged, %s already staged, %s failed",
+            campaign_id, result["staged"], result["already_staged"], result["failed"]
+        )
+        return result
+    finally:
+        db.close()
@@ -0,0 +1,212 @@
+"""
+Email staging - render and encode campaign emails ahead of the send window.
+
+Staged payloads are stored compressed in staged_emails, one per contact and
+sequence step, with a version hashing the template source AND every value
+rendered into the payload (campaign, sender, prospect, recipient, From
+address, reply-to): editing any of them makes the staged email stale.
+At send time a matching payload turns the send into pure I/O: no template
+rendering, no MIME building / base64 encoding.
+
+Staging runs on the background queue (EMAIL_STAGING_QUEUE_NAME, see
+email_service.run_staging_job).
+
+Payload (zlib-compressed JSON):
+- gmail:   {"raw_message": base64url MIME message, "message_id": RFC 2822 Message-ID}
+- outlook: {"subject": str, "html_body": str}
+"""
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+import hashlib
+import json
+import multiprocessing
+import zlib
+
+from sqlalchemy.orm import Session
+
+from app.core.config import (
+    EMAIL_STAGING_CHUNK_SIZE,
+    EMAIL_STAGING_PROCESSES,
+    EMAIL_STAGING_PROCESS_THRESHOLD,
+)
+from app.models.staged_email import StagedEmail
+from app.services.email.gmail_sender import build_gmail_raw_message
+from app.services.email.template_renderer import email_renderer
+
+
+def encode_payload(data: Dict[str, Any]) -> bytes:
+    return zlib.compress(json.dumps(data).encode('utf-8'))
+
+
+def decode_payload(payload: bytes) -> Dict[str, Any]:
+    return json.loads(zlib.decompress(payload).decode('utf-8'))
+
+
+def staged_version(
+    template_version: str,
+    campaign_ctx: Dict[str, Any],
+    from_email: Optional[str],
+    job: Dict[str, Any]
+) -> str:
+    """
+    Version of a staged payload: template source + every render input.
+
+    Args:
+        template_version: email_renderer.template_version() of the template
+        campaign_ctx, from_email, job: Inputs of build_payloads for this email
+    """
+    inputs = {key: value for key, value in job.items() if key != "contact_id"}
+    data = json.dumps([template_version, campaign_ctx, from_email, inputs], sort_keys=True, default=str)
+    return hashlib.sha256(data.encode('utf-8')).hexdigest()
+
+
+def build_payloads(
+    template_name: str,
+    campaign_ctx: Dict[str, Any],
+    provider: str,
+    from_email: Optional[str],
+    jobs: List[Dict[str, Any]]
+) -> List[Tuple[int, Optional[bytes], Optional[str]]]:
+    """
+    Render + encode one chunk of emails sharing a template.
+    Runs in the API process or in a pool process (plain data in and out).
+
+    Args:
+        template_name: Sequence template ("initial.html"...)
+        campaign_ctx: Template variables shared by the campaign
+        provider: "gmail" or "outlook"
+        from_email: Sender address (Gmail MIME From header)
+        jobs: Dicts with contact_id, to_email, subject, prospect_vars,
+              reply_to_message_id
+
+    Returns:
+        One (contact_id, payload, error) per job
+    """
+    try:
+        bodies = email_renderer.render_campaign_batch(
+            template_name,
+            campaign_ctx,
+            [job["prospect_vars"] for job in jobs]
+        )
+    except Exception as e:
+        return [(job["contact_id"], None, f"Failed to render email template: {str(e)}") for job in jobs]
+
+    results = []
+    for job, html_body in zip(jobs, bodies):
+        if provider == "gmail":
+            raw_message, message_id = build_gmail_raw_message(
+                from_email,
+                job["to_email"],
+                job["subject"],
+                html_body,
+                job["reply_to_message_id"]
+            )
+            data = {"raw_message": raw_message, "message_id": message_id}
+        else:
+            data = {"subject": job["subject"], "html_body": html_body}
+
+        results.append((job["contact_id"], encode_payload(data), None))
+
+    return results
+
+
+def render_staged_payloads(
+    groups: Dict[str, List[Dict[str, Any]]],
+    campaign_ctx: Dict[str, Any],
+    provider: str,
+    from_email: Optional[str]
+) -> List[Tuple[int, Optional[bytes], Optional[str]]]:
+    """
+    Build payloads for every template group, in chunks of
+    EMAIL_STAGING_CHUNK_SIZE. From EMAIL_STAGING_PROCESS_THRESHOLD emails,
+    chunks are spread over a process pool (rendering + MIME encoding are
+    CPU bound, threads would only share one core).
+
+    Pool processes are spawned, not forked: the API / worker process has
+    threads (task pool, DB pool, HTTP sessions) whose held locks and open
+    sockets a fork would copy. They only receive plain data (no session,
+    engine or ORM object) and import this module afresh.
+
+    Args:
+        groups: Mapping template_name -> jobs (see build_payloads)
+
+    Returns:
+        One (contact_id, payload, error) per job
+    """
+    chunks = [
+        (template_name, jobs[start:start + EMAIL_STAGING_CHUNK_SIZE])
+        for template_name, jobs in groups.items()
+        for start in range(0, len(jobs), EMAIL_STAGING_CHUNK_SIZE)
+    ]
+    total = sum(len(jobs) for jobs in groups.values())
+
+    results = []
+
+    if total < EMAIL_STAGING_PROCESS_THRESHOLD or len(chunks) == 1:
+        for template_name, jobs in chunks:
+            results.extend(build_payloads(template_name, campaign_ctx, provider, from_email, jobs))
+        return results
+
+    with ProcessPoolExecutor(
+        max_workers=EMAIL_STAGING_PROCESSES,
+        mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        futures = [
+            executor.submit(build_payloads, template_name, campaign_ctx, provider, from_email, jobs)
+            for template_name, jobs in chunks
+        ]
+        for future in futures:
+            results.extend(future.result())
+
+    return results
+
+
+def load_staged_emails(
+    db: Session,
+    provider: str,
+    campaign_ctx: Dict[str, Any],
+    from_email: Optional[str],
+    expected: Dict[int, Tuple[int, str, Dict[str, Any]]]
+) -> Dict[int, Tuple[StagedEmail, Dict[str, Any]]]:
+    """
+    Find usable staged emails for contacts about to be sent.
+
+    A staged email is used only if it was built for the same provider, the
+    contact's current step, and the same version (see staged_version): the
+    current template, rendered with the current data.
+
+    Args:
+        db: Database session
+        provider: Provider the emails will be sent with
+        campaign_ctx: Campaign template variables the emails would be rendered with
+        from_email: Sender address (Gmail), None for Outlook
+        expected: Mapping campaign_contact_id -> (sequence_step, template_name, job),
+                  job as given to build_payloads
+
+    Returns:
+        Mapping campaign_contact_id -> (StagedEmail row, decoded payload)
+    """
+    if not expected:
+        return {}
+
+    rows = db.query(StagedEmail).filter(
+        StagedEmail.campaign_contact_id.in_(list(expected)),
+        StagedEmail.provider == provider
+    ).all()
+
+    versions: Dict[str, str] = {}
+    staged = {}
+
+    for row in rows:
+        step, template_name, job = expected[row.campaign_contact_id]
+        if row.sequence_step != step or row.template_name != template_name:
+            continue
+
+        if template_name not in versions:
+            versions[template_name] = email_renderer.template_version(f"campaigns/{template_name}")
+        if row.template_version != staged_version(versions[template_name], campaign_ctx, from_email, job):
+            continue
+
+        staged[row.campaign_contact_id] = (row, decode_payload(row.payload))
+
+    return staged
@@ -0,0 +1,187 @@
+"""
+Cache of built Gmail API service objects.
+
+build('gmail', 'v1') parses the discovery document and creates the whole
+resource tree, so we build once per user and reuse the service for the
+next sends / thread checks.
+
+Services are keyed by user and shared by every thread: the httplib2
+connection is not thread-safe, so each request goes out on an authorized
+http of the calling thread (built on its first request, then kept alive).
+Short-lived send pools reuse the service, only their connections are new.
+"""
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Tuple
+import threading
+import time
+
+from google.oauth2.credentials import Credentials
+from google_auth_httplib2 import AuthorizedHttp
+from googleapiclient.discovery import build, Resource
+from googleapiclient.errors import HttpError
+from googleapiclient.http import HttpRequest, build_http
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+from app.core.config import GMAIL_SERVICE_CACHE_SIZE, GMAIL_SERVICE_CACHE_TTL, RATE_LIMIT_MAX_RETRIES
+from app.services.oauth.token_manager import get_gmail_credentials
+from app.services.email.rate_limiter import (
+    get_rate_limiter,
+    gmail_retry_after,
+    is_gmail_rate_limit_error,
+)
+
+# Max sub-requests in one Gmail batch HTTP request
+GMAIL_BATCH_SIZE = 100
+
+# user_id -> (access_token, built_at, service)
+_services: "OrderedDict[int, Tuple[str, float, Resource]]" = OrderedDict()
+_lock = threading.Lock()
+
+
+def _build_service(credentials: Credentials) -> Resource:
+    """Build a Gmail service whose requests use an http of the calling thread."""
+    local = threading.local()
+
+    def build_request(http, *args, **kwargs) -> HttpRequest:
+        thread_http = getattr(local, "http", None)
+        if thread_http is None:
+            thread_http = local.http = AuthorizedHttp(credentials, http=build_http())
+        return HttpRequest(thread_http, *args, **kwargs)
+
+    return build('gmail', 'v1', credentials=credentials, requestBuilder=build_request, cache_discovery=False)
+
+
+def get_gmail_service(user_id: int, credentials: Credentials) -> Resource:
+    """
+    Return a Gmail service for this user, building it only if needed.
+
+    A cached service is reused while it is younger than GMAIL_SERVICE_CACHE_TTL
+    and was built with the same access token. Least recently used entries are
+    evicted past GMAIL_SERVICE_CACHE_SIZE.
+
+    Args:
+        user_id: Owner of the credentials
+        credentials: Valid (already refreshed) Gmail credentials
+
+    Returns:
+        Gmail API service
+    """
+    now = time.monotonic()
+
+    with _lock:
+        entry = _services.get(user_id)
+        if entry is not None:
+            token, built_at, service = entry
+            if token == credentials.token and now - built_at < GMAIL_SERVICE_CACHE_TTL:
+                _services.move_to_end(user_id)
+                return service
+            # Token changed or entry expired
+            del _services[user_id]
+
+    # Build outside the lock, it's the slow part
+    service = _build_service(credentials)
+
+    with _lock:
+        _services[user_id] = (credentials.token, now, service)
+        _services.move_to_end(user_id)
+        while len(_services) > GMAIL_SERVICE_CACHE_SIZE:
+            _services.popitem(last=False)
+
+    return service
+
+
+def invalidate_gmail_service(user_id: int) -> None:
+    """Drop every cached service of a user (token refreshed, Gmail disconnected...)."""
+    with _lock:
+        _services.pop(user_id, None)
+
+
+def get_user_gmail_service(user: User, db: Session) -> Resource:
+    """
+    Get a Gmail service for the user, refreshing the token if needed.
+    
+    Args:
+        user: User with Gmail connected
+        db: Database session (to save a refreshed token)
+    """
+    # Refreshed shortly before expiry, see token_manager
+    credentials = get_gmail_credentials(user, db)
+    
+    # Get Gmail service (built once per user, then cached)
+    return get_gmail_service(user.id, credentials)
+
+
+def is_gmail_not_found(error: Optional[Exception]) -> bool:
+    """True for a 404: the message / thread was deleted since."""
+    return isinstance(error, HttpError) and error.resp.status == 404
+
+
+def execute_gmail_batch(
+    service: Resource,
+    user_id: int,
+    request_ids: List[str],
+    make_request: Callable[[str], object],
+    units_per_request: int
+) -> Dict[str, Tuple[Optional[Dict], Optional[Exception]]]:
+    """
+    Run Gmail API calls with batch HTTP requests, within the user's quota.
+
+    Each batch waits for its quota units on the user's rate limiter.
+    Sub-requests rejected for rate limiting are retried (after Retry-After)
+    up to RATE_LIMIT_MAX_RETRIES times.
+
+    Args:
+        service: Gmail API service
+        user_id: Owner of the service (selects the rate limiter)
+        request_ids: One ID per call (e.g. thread IDs)
+        make_request: Builds the API call for an ID
+        units_per_request: Quota cost of one call (see GMAIL_QUOTA_UNITS)
+
+    Returns:
+        Mapping request_id -> (response, exception). A failed batch HTTP
+        request sets the exception on each of its calls.
+    """
+    limiter = get_rate_limiter("gmail", user_id)
+    results: Dict[str, Tuple[Optional[Dict], Optional[Exception]]] = {}
+    pending = list(request_ids)
+    attempt = 0
+
+    while pending:
+        throttled: List[str] = []
+        retry_after: List[float] = []
+        can_retry = attempt < RATE_LIMIT_MAX_RETRIES
+
+        def _on_response(request_id: str, response: Optional[Dict], exception: Optional[Exception]) -> None:
+            if exception is not None and can_retry and is_gmail_rate_limit_error(exception):
+                throttled.append(request_id)
+                delay = gmail_retry_after(exception)
+                if delay is not None:
+                    retry_after.append(delay)
+            else:
+                results[request_id] = (response, exception)
+
+        for start in range(0, len(pending), GMAIL_BATCH_SIZE):
+            chunk = pending[start:start + GMAIL_BATCH_SIZE]
+            limiter.acquire(units_per_request * len(chunk))
+
+            batch = service.new_batch_http_request(callback=_on_response)
+            for request_id in chunk:
+                batch.add(make_request(request_id), request_id=request_id)
+
+            try:
+                batch.execute()
+            except Exception as e:
+                # Whole batch failed (network, auth...): report it on each call
+                for request_id in chunk:
+                    results.setdefault(request_id, (None, e))
+
+        if throttled:
+            limiter.on_throttle(max(retry_after) if retry_after else None)
+        else:
+            limiter.on_success()
+
+        pending = throttled
+        attempt += 1
+
+    return results
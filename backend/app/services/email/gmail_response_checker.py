@@ -2,13 +2,69 @@
 Gmail response checker - detects replies from prospects.
 """
 from typing import Dict, Optional
-from googleapiclient.discovery import build
-from google.oauth2.credentials import Credentials
-from google.auth.transport.requests import Request
 from sqlalchemy.orm import Session
 
 from app.models.user import User
-from app.core.config import GOOGLE_CLIENT_ID, GOOGLE_CLIENT_SECRET
+from app.services.email.gmail_client import execute_gmail_batch, get_user_gmail_service, is_gmail_not_found
+from app.services.email.rate_limiter import GMAIL_QUOTA_UNITS, get_rate_limiter
+
+NO_RESPONSE = {
+    "has_response": False,
+    "response_content": None,
+    "response_date": None
+}
+
+
+def _find_prospect_reply(thread: Dict, prospect_email: str) -> Dict:
+    """
+    Look for a message from the prospect in a thread (format='full').
+    
+    Returns:
+        Dict with has_response, response_content, response_date
+    """
+    # Check each message in thread
+    messages = thread.get('messages', [])
+    
+    # Skip first message (our sent email)
+    if len(messages) <= 1:
+        return dict(NO_RESPONSE)
+    
+    # Check messages after our initial email
+    for message in messages[1:]:  # Skip first message
+        reply = match_prospect_reply(message, prospect_email)
+        if reply:
+            return reply
+    
+    # No response found
+    return dict(NO_RESPONSE)
+
+
+def match_prospect_reply(message: Dict, prospect_email: str) -> Optional[Dict]:
+    """
+    Check if a Gmail message (format='full') was sent by the prospect.
+    
+    Returns:
+        Dict with has_response, response_content, response_date,
+        or None if the message isn't from the prospect
+    """
+    headers = message.get('payload', {}).get('headers', [])
+    
+    # Get sender (From header)
+    from_header = next((h['value'] for h in headers if h['name'].lower() == 'from'), '')
+    
+    # Check if sender is the prospect
+    if prospect_email.lower() not in from_header.lower():
+        return None
+    
+    # Found a response!
+    body = _extract_message_body(message)
+    date_header = next((h['value'] for h in headers if h['name'].lower() == 'date'), None)
+    
+    return {
+        "has_response": True,
+        "response_content": body,
+        "response_date": date_header
+    }
 
 
 def check_gmail_thread_for_response(
@@ -32,27 +88,8 @@ def check_gmail_thread_for_response(
             - response_content: str (first 1000 chars)
             - response_date: datetime
     """
-    # Build credentials
-    credentials = Credentials(
-        token=user.gmail_access_token,
-        refresh_token=user.gmail_refresh_token,
-        token_uri="https://oauth2.googleapis.com/token",
-        client_id=GOOGLE_CLIENT_ID,
-        client_secret=GOOGLE_CLIENT_SECRET,
-        scopes=[
-            'https://www.googleapis.com/auth/gmail.readonly',
-            'https://www.googleapis.com/auth/gmail.send',
-        ]
-    )
-    
-    # Refresh token if expired
-    if credentials.expired and credentials.refresh_token:
-        credentials.refresh(Request())
-        user.gmail_access_token = credentials.token
-        db.commit()
-    
-    # Build Gmail service
-    service = build('gmail', 'v1', credentials=credentials)
+    service = get_user_gmail_service(user, db)
+    get_rate_limiter("gmail", user.id).acquire(GMAIL_QUOTA_UNITS["threads.get"])
     
     try:
         # Get the thread
@@ -62,51 +99,56 @@ def check_gmail_thread_for_response(
             format='full'
         ).execute()
         
-        # Check each message in thread
-        messages = thread.get('messages', [])
-        
-        # Skip first message (our sent email)
-        if len(messages) <= 1:
-            return {
-                "has_response": False,
-                "response_content": None,
-                "response_date": None
-            }
-        
-        # Check messages after our initial email
-        for message in messages[1:]:  # Skip first message
-            headers = message.get('payload', {}).get('headers', [])
-            
-            # Get sender (From header)
-            from_header = next((h['value'] for h in headers if h['name'].lower() == 'from'), '')
-            
-            # Check if sender is the prospect
-            if prospect_email.lower() in from_header.lower():
-                # Found a response!
-                
-                # Extract message body
-                body = _extract_message_body(message)
-                
-                # Get date
-                date_header = next((h['value'] for h in headers if h['name'].lower() == 'date'), None)
-                
-                return {
-                    "has_response": True,
-                    "response_content": body,
-                    "response_date": date_header
-                }
-        
-        # No response found
-        return {
-            "has_response": False,
-            "response_content": None,
-            "response_date": None
-        }
+        return _find_prospect_reply(thread, prospect_email)
         
     except Exception as e:
         raise Exception(f"Failed to check Gmail thread: {str(e)}")
 
 
+def check_gmail_threads_for_responses(
+    user: User,
+    db: Session,
+    threads: Dict[str, str]
+) -> Dict[str, Dict]:
+    """
+    Check many Gmail threads for replies using batch HTTP requests.
+    Up to GMAIL_BATCH_SIZE threads.get calls go out in one HTTP request,
+    paced by the user's Gmail quota.
+    
+    Args:
+        user: User with Gmail connected
+        db: Database session
+        threads: Mapping thread_id -> prospect email
+    
+    Returns:
+        Mapping thread_id -> result. Result has the same keys as
+        check_gmail_thread_for_response, or "error" (and "not_found":
+        True if the thread was deleted) if that lookup failed.
+    """
+    service = get_user_gmail_service(user, db)
+    
+    responses = execute_gmail_batch(
+        service=service,
+        user_id=user.id,
+        request_ids=list(threads),
+        make_request=lambda thread_id: service.users().threads().get(userId='me', id=thread_id, format='full'),
+        units_per_request=GMAIL_QUOTA_UNITS["threads.get"]
+    )
+    
+    results: Dict[str, Dict] = {}
+    
+    for thread_id, (response, exception) in responses.items():
+        if exception is not None:
+            results[thread_id] = {
+                "error": f"Failed to check Gmail thread: {str(exception)}",
+                "not_found": is_gmail_not_found(exception)
+            }
+        else:
+            results[thread_id] = _find_prospect_reply(response, threads[thread_id])
+    
+    return results
+
+
 def _extract_message_body(message: Dict) -> str:
     """
     Extract text body from Gmail message.
@@ -3,17 +3,71 @@ Gmail email sender using OAuth tokens.
 Sends emails via Gmail API and handles token refresh.
 """
 from google.oauth2.credentials import Credentials
-from googleapiclient.discovery import build
 from googleapiclient.errors import HttpError
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
+from email.utils import make_msgid
 import base64
-from typing import Optional, Dict
+from typing import Optional, Dict, Tuple
 from sqlalchemy.orm import Session
 
 from app.models.user import User
-from app.services.oauth.gmail_oauth import refresh_gmail_token
-from app.core.config import GOOGLE_CLIENT_ID, GOOGLE_CLIENT_SECRET
+from app.services.oauth.token_manager import get_gmail_credentials
+from app.services.email.gmail_client import get_gmail_service
+from app.services.email.rate_limiter import (
+    GMAIL_QUOTA_UNITS,
+    get_rate_limiter,
+    gmail_retry_after,
+    is_gmail_rate_limit_error,
+)
+from app.core.config import RATE_LIMIT_MAX_RETRIES
+
+
+def build_gmail_raw_message(
+    from_email: str,
+    to_email: str,
+    subject: str,
+    html_body: str,
+    reply_to_message_id: Optional[str] = None
+) -> Tuple[str, str]:
+    """
+    Build the MIME email and encode it for the Gmail API.
+    
+    Args:
+        from_email: Sender's Gmail address
+        to_email: Recipient email address
+        subject: Email subject line
+        html_body: HTML content of the email
+        reply_to_message_id: Message ID to reply to (for threading)
+    
+    Returns:
+        (raw message, base64url encoded, RFC 2822 Message-ID)
+    """
+    # Create email message
+    message = MIMEMultipart('alternative')
+    message['To'] = to_email
+    message['From'] = from_email
+    message['Subject'] = subject
+    
+    # Set our own RFC 2822 Message-ID (Gmail keeps it), so we don't
+    # need a second API call to read it back for threading
+    domain = from_email.rsplit("@", 1)[1] if from_email and "@" in from_email else "gmail.com"
+    rfc_message_id = make_msgid(domain=domain)
+    message['Message-ID'] = rfc_message_id
+    
+    # Add reply-to headers for threading
+    if reply_to_message_id:
+        message['In-Reply-To'] = reply_to_message_id
+        message['References'] = reply_to_message_id
+    
+    # Attach HTML body
+    html_part = MIMEText(html_body, 'html')
+    message.attach(html_part)
+    
+    # Encode message for Gmail API
+    raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
+    
+    return raw_message, rfc_message_id
 
 
 class GmailSender:
@@ -46,29 +100,34 @@ class GmailSender:
         Returns:
             Valid Gmail OAuth credentials
         """
-        # Create credentials object
-        credentials = Credentials(
-            token=self.user.gmail_access_token,
-            refresh_token=self.user.gmail_refresh_token,
-            token_uri="https://oauth2.googleapis.com/token",
-            client_id=GOOGLE_CLIENT_ID,
-            client_secret=GOOGLE_CLIENT_SECRET,
-            scopes=[
-                'https://www.googleapis.com/auth/gmail.send',
-                'https://www.googleapis.com/auth/gmail.readonly'
-            ]
-        )
+        # Refreshed shortly before expiry, see token_manager
+        return get_gmail_credentials(self.user, self.db)
+    
+    def _send_with_rate_limit(self, service, send_request: Dict) -> Dict:
+        """
+        Call messages.send once the quota units are available.
+        Rate limit errors slow the user's limiter down and are retried
+        (after Retry-After) up to RATE_LIMIT_MAX_RETRIES times.
+        """
+        limiter = get_rate_limiter("gmail", self.user.id)
+        attempt = 0
         
-        # Check if token is expired and refresh if needed
-        if credentials.expired and credentials.refresh_token:
-            from google.auth.transport.requests import Request
-            credentials.refresh(Request())
+        while True:
+            limiter.acquire(GMAIL_QUOTA_UNITS["messages.send"])
+            try:
+                sent_message = service.users().messages().send(
+                    userId='me',
+                    body=send_request
+                ).execute()
+            except HttpError as error:
+                if not is_gmail_rate_limit_error(error) or attempt >= RATE_LIMIT_MAX_RETRIES:
+                    raise
+                limiter.on_throttle(gmail_retry_after(error))
+                attempt += 1
+                continue
             
-            # Save new access token to database
-            self.user.gmail_access_token = credentials.token
-            self.db.commit()
-        
-        return credentials
+            limiter.on_success()
+            return sent_message
     
     def send_email(
         self,
@@ -90,9 +149,39 @@ class GmailSender:
         
         Returns:
             Dictionary with:
-                - message_id: Gmail message ID
+                - message_id: RFC 2822 Message-ID (set by us before sending)
                 - thread_id: Gmail thread ID
         
+        Raises:
+            Exception: If sending fails
+        """
+        raw_message, rfc_message_id = build_gmail_raw_message(
+            self.user.gmail_email,
+            to_email,
+            subject,
+            html_body,
+            reply_to_message_id
+        )
+        
+        return self.send_raw(raw_message, rfc_message_id, thread_id)
+    
+    def send_raw(
+        self,
+        raw_message: str,
+        message_id: str,
+        thread_id: Optional[str] = None
+    ) -> Dict[str, str]:
+        """
+        Send an already built message (see build_gmail_raw_message).
+        
+        Args:
+            raw_message: base64url encoded MIME message
+            message_id: Its RFC 2822 Message-ID
+            thread_id: Gmail thread ID (for threading)
+        
+        Returns:
+            Dictionary with message_id and thread_id (same as send_email)
+        
         Raises:
             Exception: If sending fails
         """
@@ -100,26 +189,8 @@ class GmailSender:
             # Get valid credentials
             credentials = self._get_credentials()
             
-            # Build Gmail service
-            service = build('gmail', 'v1', credentials=credentials)
-            
-            # Create email message
-            message = MIMEMultipart('alternative')
-            message['To'] = to_email
-            message['From'] = self.user.gmail_email
-            message['Subject'] = subject
-            
-            # Add reply-to headers for threading
-            if reply_to_message_id:
-                message['In-Reply-To'] = reply_to_message_id
-                message['References'] = reply_to_message_id
-            
-            # Attach HTML body
-            html_part = MIMEText(html_body, 'html')
-            message.attach(html_part)
-            
-            # Encode message for Gmail API
-            raw_message = base64.urlsafe_b64encode(message.as_bytes()).decode('utf-8')
+            # Get Gmail service (built once per user, then cached)
+            service = get_gmail_service(self.user.id, credentials)
             
             # Prepare send request
             send_request = {
@@ -130,31 +201,12 @@ class GmailSender:
             if thread_id:
                 send_request['threadId'] = thread_id
             
-            # Send the email
-            sent_message = service.users().messages().send(
-                userId='me',
-                body=send_request
-            ).execute()
+            # Send the email (within the user's Gmail quota)
+            sent_message = self._send_with_rate_limit(service, send_request)
             
-            # Return message ID and thread ID for database storage
-            # Get the sent message to retrieve RFC 2822 Message-ID
-            sent_msg_full = service.users().messages().get(
-                userId='me',
-                id=sent_message['id'],
-                format='metadata',
-                metadataHeaders=['Message-ID']
-            ).execute()
-
-            # Extract RFC 2822 Message-ID from headers
-            rfc_message_id = None
-            for header in sent_msg_full.get('payload', {}).get('headers', []):
-                if header['name'].lower() == 'message-id':
-                    rfc_message_id = header['value']
-                    break
-
-            # Return both Gmail ID (for API) and RFC Message-ID (for threading)
+            # Return both RFC Message-ID (for threading) and Gmail thread ID
             return {
-                "message_id": rfc_message_id or sent_message['id'],  # Prefer RFC ID
+                "message_id": message_id,
                 "thread_id": sent_message['threadId']
             }
             
@@ -189,4 +241,21 @@ def send_email_via_gmail(
         Dict with message_id and thread_id
     """
     sender = GmailSender(user, db)
-    return sender.send_email(to_email, subject, html_body, reply_to_message_id, thread_id)
\ No newline at end of file
+    return sender.send_email(to_email, subject, html_body, reply_to_message_id, thread_id)
+
+
+def send_raw_via_gmail(
+    user: User,
+    db: Session,
+    raw_message: str,
+    message_id: str,
+    thread_id: Optional[str] = None
+) -> Dict[str, str]:
+    """
+    Convenience function to send a pre-built (staged) message via Gmail.
+    
+    Returns:
+        Dict with message_id and thread_id
+    """
+    sender = GmailSender(user, db)
+    return sender.send_raw(raw_message, message_id, thread_id)
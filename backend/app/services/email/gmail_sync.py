@@ -0,0 +1,215 @@
+"""
+Incremental Gmail reply sync using the History API.
+
+Instead of downloading every contacted thread, we keep a per-user
+historyId checkpoint (User.gmail_history_id) and only look at messages
+added to the mailbox since the last sync.
+
+The checkpoint only moves forward when every lookup succeeded (or found
+the message / thread deleted): after a failed one (quota, 5xx, network),
+the next sync looks at the same messages again.
+"""
+from typing import Dict, List, Tuple
+from googleapiclient.errors import HttpError
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+from app.models.campaign import Campaign, CampaignContact
+from app.models.prospect import Prospect
+from app.services.email.gmail_client import execute_gmail_batch, get_user_gmail_service, is_gmail_not_found
+from app.services.email.contact_responses import save_contact_responses
+from app.services.email.gmail_response_checker import (
+    check_gmail_threads_for_responses,
+    match_prospect_reply,
+)
+from app.services.email.rate_limiter import GMAIL_QUOTA_UNITS, get_rate_limiter
+
+
+def _get_open_threads(db: Session, user_id: int) -> Dict[str, Tuple[int, str]]:
+    """
+    Threads still waiting for a reply, across all campaigns of the user.
+
+    Returns:
+        Mapping thread_id -> (campaign_contact_id, prospect_email)
+    """
+    rows = db.query(
+        CampaignContact.id,
+        CampaignContact.email_thread_id,
+        Prospect.email
+    ).join(
+        Campaign, Campaign.id == CampaignContact.campaign_id
+    ).join(
+        Prospect, Prospect.id == CampaignContact.prospect_id
+    ).filter(
+        Campaign.user_id == user_id,
+        CampaignContact.email_thread_id.isnot(None),
+        CampaignContact.status == "contacted"
+    ).all()
+
+    return {thread_id: (contact_id, email) for contact_id, thread_id, email in rows}
+
+
+def _list_new_messages(service, user_id: int, start_history_id: str, thread_ids) -> Tuple[Dict[str, str], str]:
+    """
+    Page through users.history.list since the checkpoint.
+
+    Returns:
+        (message_id -> thread_id for new messages in open threads, latest historyId)
+    """
+    new_messages: Dict[str, str] = {}
+    latest_history_id = start_history_id
+    page_token = None
+
+    limiter = get_rate_limiter("gmail", user_id)
+
+    while True:
+        limiter.acquire(GMAIL_QUOTA_UNITS["history.list"])
+        response = service.users().history().list(
+            userId='me',
+            startHistoryId=start_history_id,
+            historyTypes=['messageAdded'],
+            pageToken=page_token,
+            maxResults=500
+        ).execute()
+
+        for history in response.get('history', []):
+            for added in history.get('messagesAdded', []):
+                message = added.get('message', {})
+
+                # Skip our own sends
+                if 'SENT' in message.get('labelIds', []):
+                    continue
+
+                if message.get('threadId') in thread_ids:
+                    new_messages[message['id']] = message['threadId']
+
+        latest_history_id = response.get('historyId', latest_history_id)
+        page_token = response.get('nextPageToken')
+
+        if not page_token:
+            break
+
+    return new_messages, latest_history_id
+
+
+def _get_messages(service, user_id: int, message_ids: List[str]) -> Tuple[Dict[str, Dict], Dict[str, str]]:
+    """
+    Fetch messages (format='full') with batch HTTP requests.
+    Messages deleted since (404) are left out.
+
+    Returns:
+        (message_id -> message, message_id -> error for the other failed fetches)
+    """
+    responses = execute_gmail_batch(
+        service=service,
+        user_id=user_id,
+        request_ids=message_ids,
+        make_request=lambda message_id: service.users().messages().get(userId='me', id=message_id, format='full'),
+        units_per_request=GMAIL_QUOTA_UNITS["messages.get"]
+    )
+
+    messages: Dict[str, Dict] = {}
+    failed: Dict[str, str] = {}
+
+    for message_id, (message, exception) in responses.items():
+        if exception is None:
+            messages[message_id] = message
+        elif not is_gmail_not_found(exception):
+            failed[message_id] = f"Failed to fetch Gmail message: {str(exception)}"
+
+    return messages, failed
+
+
+def sync_gmail_replies(user: User, db: Session) -> Dict:
+    """
+    Detect prospect replies received since the last sync, for all campaigns.
+
+    First run (no checkpoint): records the current historyId and does one
+    full batched thread check, so replies received before are not missed.
+    Next runs only read the mailbox history since the checkpoint.
+
+    Args:
+        user: User with Gmail connected
+        db: Database session
+
+    Returns:
+        Dict with:
+            - mode: "full" (first run / expired checkpoint) or "incremental"
+            - new_messages: int (messages looked at)
+            - responses_found: int
+            - errors: list (the checkpoint is kept if a lookup failed)
+    """
+    service = get_user_gmail_service(user, db)
+    open_threads = _get_open_threads(db, user.id)
+    responses: Dict[int, Dict] = {}
+    errors = []
+
+    if user.gmail_history_id:
+        try:
+            new_messages, latest_history_id = _list_new_messages(
+                service, user.id, user.gmail_history_id, open_threads
+            )
+        except HttpError as e:
+            if e.resp.status != 404:
+                raise
+            # Checkpoint too old (Gmail keeps ~1 week of history): start over
+            user.gmail_history_id = None
+            db.commit()
+            return sync_gmail_replies(user, db)
+
+        messages, failed = _get_messages(service, user.id, list(new_messages))
+
+        for message_id, error in failed.items():
+            errors.append({"campaign_contact_id": open_threads[new_messages[message_id]][0], "error": error})
+
+        for message_id, message in messages.items():
+            contact_id, prospect_email = open_threads[new_messages[message_id]]
+            if contact_id in responses:
+                continue
+
+            reply = match_prospect_reply(message, prospect_email)
+            if reply:
+                responses[contact_id] = reply
+
+        mode = "incremental"
+        looked_at = len(new_messages)
+        retry = bool(failed)
+
+    else:
+        # Take the checkpoint BEFORE the full check so nothing falls in between
+        get_rate_limiter("gmail", user.id).acquire(GMAIL_QUOTA_UNITS["getProfile"])
+        latest_history_id = service.users().getProfile(userId='me').execute()['historyId']
+
+        results = check_gmail_threads_for_responses(
+            user=user,
+            db=db,
+            threads={thread_id: email for thread_id, (_, email) in open_threads.items()}
+        )
+
+        retry = False
+
+        for thread_id, result in results.items():
+            contact_id = open_threads[thread_id][0]
+            if "error" in result:
+                errors.append({"campaign_contact_id": contact_id, "error": result["error"]})
+                retry = retry or not result["not_found"]
+            elif result["has_response"]:
+                responses[contact_id] = result
+
+        mode = "full"
+        looked_at = len(open_threads)
+
+    save_contact_responses(db, responses)
+
+    # Replies found are saved either way; after a failed lookup the previous
+    # checkpoint stays (none after a full check: the next sync is full again)
+    if not retry:
+        user.gmail_history_id = str(latest_history_id)
+    db.commit()
+
+    return {
+        "mode": mode,
+        "new_messages": looked_at,
+        "responses_found": len(responses),
+        "errors": errors
+    }
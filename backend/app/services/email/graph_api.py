@@ -0,0 +1,67 @@
+"""
+Authenticated, rate-limited calls to Microsoft Graph.
+
+Every Outlook call goes through call_graph(), which:
+- waits for the user's Graph rate limiter,
+- sends the (proactively refreshed) access token, refreshing once on 401,
+- on 429, slows the limiter down, waits Retry-After and retries.
+"""
+import requests
+from sqlalchemy.orm import Session
+
+from app.core.config import RATE_LIMIT_MAX_RETRIES
+from app.models.user import User
+from app.services.oauth.token_manager import get_outlook_access_token, refresh_outlook_access_token
+from app.services.email.graph_client import graph_session
+from app.services.email.rate_limiter import get_rate_limiter, parse_retry_after
+
+
+def call_graph(
+    user: User,
+    db: Session,
+    method: str,
+    url: str,
+    units: int = 1,
+    **kwargs
+) -> requests.Response:
+    """
+    Send one Graph request for a user.
+
+    Args:
+        user: User with Outlook connected
+        db: Database session (to save a refreshed token)
+        method: HTTP method
+        url: Absolute Graph URL
+        units: Rate limiter cost (number of Graph requests, e.g. $batch size)
+        **kwargs: Passed to requests (json, params, headers...)
+
+    Returns:
+        The final response (callers check the status). Still 429 if the
+        call was throttled more than RATE_LIMIT_MAX_RETRIES times.
+    """
+    limiter = get_rate_limiter("outlook", user.id)
+    headers = dict(kwargs.pop("headers", None) or {})
+    refreshed = False
+    throttled = 0
+
+    while True:
+        limiter.acquire(units)
+        headers["Authorization"] = f"Bearer {get_outlook_access_token(user, db)}"
+        response = graph_session.request(method, url, headers=headers, **kwargs)
+
+        # Handle token expiration: refresh and retry once
+        if response.status_code == 401 and not refreshed:
+            refresh_outlook_access_token(user, db)
+            refreshed = True
+            continue
+
+        # Throttled: slow down, wait, retry (the request was not processed)
+        if response.status_code == 429 and throttled < RATE_LIMIT_MAX_RETRIES:
+            limiter.on_throttle(parse_retry_after(response.headers.get("Retry-After")))
+            throttled += 1
+            continue
+
+        if response.status_code != 429:
+            limiter.on_success()
+
+        return response
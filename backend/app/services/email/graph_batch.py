@@ -0,0 +1,148 @@
+"""
+Microsoft Graph JSON batching ($batch).
+
+Graph accepts up to 20 sub-requests per POST /$batch, so Outlook bulk
+operations (sends, replies, conversation lookups) take one HTTP round trip
+per 20 contacts instead of one per contact.
+"""
+from typing import Any, Dict, List, Optional
+import requests
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+from app.core.config import RATE_LIMIT_MAX_RETRIES
+from app.services.oauth.token_manager import refresh_outlook_access_token
+from app.services.email.graph_client import GRAPH_API_URL
+from app.services.email.graph_api import call_graph
+from app.services.email.rate_limiter import get_rate_limiter, parse_retry_after
+
+GRAPH_BATCH_URL = f"{GRAPH_API_URL}/$batch"
+
+# Hard limit of the Graph API
+GRAPH_BATCH_SIZE = 20
+
+
+def graph_request(
+    request_id: str,
+    method: str,
+    url: str,
+    body: Any = None,
+    headers: Optional[Dict[str, str]] = None
+) -> Dict[str, Any]:
+    """
+    Build one $batch sub-request.
+
+    Args:
+        request_id: Unique ID in the batch, used to map the response back
+        method: HTTP method (GET, POST...)
+        url: URL relative to /v1.0 (e.g. "/me/sendMail")
+        body: Optional JSON body
+        headers: Optional extra headers (e.g. Prefer)
+    """
+    request = {"id": request_id, "method": method, "url": url}
+
+    if body is not None:
+        request["body"] = body
+        request["headers"] = {"Content-Type": "application/json"}
+
+    if headers:
+        request["headers"] = {**request.get("headers", {}), **headers}
+
+    return request
+
+
+def _post_batch(user: User, db: Session, requests_: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    """
+    POST one $batch envelope (rate limited, token refreshed once on 401).
+
+    Returns:
+        The "responses" list of the envelope
+    """
+    payload = {"requests": requests_}
+
+    # Each sub-request counts against the mailbox limits
+    response = call_graph(user, db, "POST", GRAPH_BATCH_URL, units=len(requests_), json=payload)
+
+    # Sub-requests are also rejected when the token expired: refresh once
+    if _all_unauthorized(response):
+        refresh_outlook_access_token(user, db)
+        response = call_graph(user, db, "POST", GRAPH_BATCH_URL, units=len(requests_), json=payload)
+
+    response.raise_for_status()
+    return response.json().get("responses", [])
+
+
+def _all_unauthorized(response: requests.Response) -> bool:
+    """True when the envelope went through but every sub-request got a 401."""
+    if response.status_code != 200:
+        return False
+
+    responses = response.json().get("responses", [])
+    return bool(responses) and all(item.get("status") == 401 for item in responses)
+
+
+def execute_graph_batch(user: User, db: Session, requests_: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+    """
+    Run sub-requests through $batch, GRAPH_BATCH_SIZE at a time.
+
+    Throttled sub-requests (429) are retried after their Retry-After, up
+    to RATE_LIMIT_MAX_RETRIES times.
+
+    Args:
+        user: User with Outlook connected
+        db: Database session (to save a refreshed token)
+        requests_: Sub-requests built with graph_request()
+
+    Returns:
+        Mapping request_id -> {"status": int, "body": dict or None}.
+        Sub-requests missing from the response get status 0 (not run).
+
+    Raises:
+        requests.exceptions.HTTPError: If a whole envelope is rejected
+    """
+    limiter = get_rate_limiter("outlook", user.id)
+    results: Dict[str, Dict[str, Any]] = {}
+    pending = list(requests_)
+    attempt = 0
+
+    while pending:
+        throttled: Dict[str, Dict[str, Any]] = {}
+        retry_after: Optional[float] = None
+        can_retry = attempt < RATE_LIMIT_MAX_RETRIES
+
+        for start in range(0, len(pending), GRAPH_BATCH_SIZE):
+            chunk = pending[start:start + GRAPH_BATCH_SIZE]
+            by_id = {request["id"]: request for request in chunk}
+
+            for item in _post_batch(user, db, chunk):
+                if item.get("status") == 429 and can_retry:
+                    throttled[item["id"]] = by_id[item["id"]]
+                    delay = parse_retry_after((item.get("headers") or {}).get("Retry-After"))
+                    if delay is not None:
+                        retry_after = max(retry_after or 0.0, delay)
+                    continue
+
+                results[item["id"]] = {
+                    "status": item.get("status", 0),
+                    "body": item.get("body")
+                }
+
+            for request_id in by_id:
+                if request_id not in throttled:
+                    results.setdefault(request_id, {"status": 0, "body": None})
+
+        if throttled:
+            limiter.on_throttle(retry_after)
+
+        pending = list(throttled.values())
+        attempt += 1
+
+    return results
+
+
+def graph_error_message(result: Dict[str, Any]) -> str:
+    """Readable error of a failed sub-request."""
+    body = result.get("body") or {}
+    error = body.get("error", {}) if isinstance(body, dict) else {}
+    message = error.get("message") or "no details"
+    return f"Outlook API error {result.get('status')}: {message}"
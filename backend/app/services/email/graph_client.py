@@ -0,0 +1,71 @@
+"""
+Shared HTTP client for Microsoft Graph.
+
+One process-wide requests.Session, so Outlook calls reuse pooled keep-alive
+connections instead of doing a TCP + TLS handshake each time. Every call
+gets connect/read timeouts, so a hung Graph call can't block a worker
+thread forever.
+
+Transient 5xx responses are retried with
+backoff for GET only. POST calls (sendMail, reply, $batch sends) are only
+retried when the connection could not be opened: after a 5xx Graph may
+already have sent the email, and the outbox retries those anyway.
+
+Throttling (429) is never retried here: call_graph handles it, so the
+per-user rate limiter slows down (see graph_api / rate_limiter).
+"""
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from app.core.config import (
+    GRAPH_POOL_SIZE,
+    GRAPH_CONNECT_TIMEOUT,
+    GRAPH_READ_TIMEOUT,
+    GRAPH_MAX_RETRIES,
+)
+
+GRAPH_API_URL = "https://graph.microsoft.com/v1.0"
+
+
+class _GraphSession(requests.Session):
+    """Session applying the default Graph timeouts to every request."""
+
+    def request(self, method, url, **kwargs):
+        kwargs.setdefault("timeout", (GRAPH_CONNECT_TIMEOUT, GRAPH_READ_TIMEOUT))
+        return super().request(method, url, **kwargs)
+
+
+class _GraphRetry(Retry):
+    """Retry policy leaving 429 to call_graph."""
+
+    def is_retry(self, method, status_code, has_retry_after=False):
+        # Retry() also retries 429 responses carrying Retry-After
+        if status_code == 429:
+            return False
+        return super().is_retry(method, status_code, has_retry_after)
+
+
+def _build_session() -> requests.Session:
+    retry = _GraphRetry(
+        total=GRAPH_MAX_RETRIES,
+        connect=GRAPH_MAX_RETRIES,
+        backoff_factor=0.5,
+        status_forcelist=(500, 502, 503, 504),
+        allowed_methods=frozenset({"GET"}),
+        respect_retry_after_header=True,
+        raise_on_status=False,  # let callers see the final response
+    )
+    adapter = HTTPAdapter(
+        pool_connections=1,  # a single host
+        pool_maxsize=GRAPH_POOL_SIZE,
+        max_retries=retry,
+    )
+
+    session = _GraphSession()
+    session.mount("https://", adapter)
+    return session
+
+
+# Thread-safe for our use (no cookies, per-call headers)
+graph_session = _build_session()
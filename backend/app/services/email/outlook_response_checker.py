@@ -2,10 +2,53 @@
 Outlook response checker - detects replies from prospects.
 """
 from typing import Dict
-import requests
+from urllib.parse import quote
 from sqlalchemy.orm import Session
 
 from app.models.user import User
+from app.services.email.graph_client import GRAPH_API_URL
+from app.services.email.graph_api import call_graph
+from app.services.email.graph_batch import (
+    execute_graph_batch,
+    graph_error_message,
+    graph_request,
+)
+
+NO_RESPONSE = {
+    "has_response": False,
+    "response_content": None,
+    "response_date": None
+}
+
+
+def _find_prospect_reply(messages: list, prospect_email: str) -> Dict:
+    """
+    Look for a message from the prospect in a conversation.
+    
+    Args:
+        messages: Conversation messages, newest first
+        prospect_email: Prospect's email
+    
+    Returns:
+        Dict with has_response, response_content, response_date
+    """
+    # Check for responses from prospect
+    for message in messages[1:]:  # Skip first (our email)
+        sender = message.get('from', {}).get('emailAddress', {}).get('address', '')
+        
+        if sender.lower() == prospect_email.lower():
+            # Found response!
+            body = message.get('body', {}).get('content', '')
+            received_date = message.get('receivedDateTime')
+            
+            return {
+                "has_response": True,
+                "response_content": body,
+                "response_date": received_date
+            }
+    
+    # No response found
+    return dict(NO_RESPONSE)
 
 
 def check_outlook_conversation_for_response(
@@ -26,49 +69,66 @@ def check_outlook_conversation_for_response(
     Returns:
         Dict with has_response, response_content, response_date
     """
-    # Get access token (refresh if needed)
-    access_token = user.outlook_access_token
-    
-    headers = {
-        "Authorization": f"Bearer {access_token}",
-        "Content-Type": "application/json"
-    }
-    
     try:
-        # Get messages in conversation
-        url = f"https://graph.microsoft.com/v1.0/me/messages?$filter=conversationId eq '{conversation_id}'&$orderby=receivedDateTime desc"
-        response = requests.get(url, headers=headers)
-        
-        # Handle token expiration
-        if response.status_code == 401:
-            # Refresh token logic here
-            pass
+        # Get messages in conversation (rate limited, token refreshed if needed)
+        url = f"{GRAPH_API_URL}/me/messages?$filter=conversationId eq '{conversation_id}'&$orderby=receivedDateTime desc"
+        response = call_graph(user, db, "GET", url)
         
         response.raise_for_status()
         messages = response.json().get('value', [])
         
-        # Check for responses from prospect
-        for message in messages[1:]:  # Skip first (our email)
-            sender = message.get('from', {}).get('emailAddress', {}).get('address', '')
-            
-            if sender.lower() == prospect_email.lower():
-                # Found response!
-                body = message.get('body', {}).get('content', '')
-                received_date = message.get('receivedDateTime')
-                
-                return {
-                    "has_response": True,
-                    "response_content": body,
-                    "response_date": received_date
-                }
-        
-        # No response found
-        return {
-            "has_response": False,
-            "response_content": None,
-            "response_date": None
-        }
+        return _find_prospect_reply(messages, prospect_email)
         
     except Exception as e:
         raise Exception(f"Failed to check Outlook conversation: {str(e)}")
 
+
+def check_outlook_conversations_for_responses(
+    user: User,
+    db: Session,
+    conversations: Dict[str, str]
+) -> Dict[str, Dict]:
+    """
+    Check many Outlook conversations at once with Graph $batch
+    (20 conversation lookups per HTTP request).
+    
+    Args:
+        user: User with Outlook connected
+        db: Database session
+        conversations: Mapping conversation_id -> prospect email
+    
+    Returns:
+        Mapping conversation_id -> same dict as
+        check_outlook_conversation_for_response, or {"error": str} for
+        conversations that couldn't be fetched
+    
+    Raises:
+        Exception: If Graph rejects a whole batch
+    """
+    conversation_ids = list(conversations)
+    requests_ = []
+    
+    for index, conversation_id in enumerate(conversation_ids):
+        # Sub-request URLs must be URL-encoded
+        filter_ = quote(f"conversationId eq '{conversation_id}'")
+        url = f"/me/messages?$filter={filter_}&$orderby=receivedDateTime%20desc"
+        requests_.append(graph_request(str(index), "GET", url))
+    
+    try:
+        batch_results = execute_graph_batch(user, db, requests_)
+    except Exception as e:
+        raise Exception(f"Failed to check Outlook conversations: {str(e)}")
+    
+    results: Dict[str, Dict] = {}
+    
+    for index, conversation_id in enumerate(conversation_ids):
+        result = batch_results[str(index)]
+        
+        if result["status"] != 200:
+            results[conversation_id] = {"error": graph_error_message(result)}
+            continue
+        
+        messages = (result["body"] or {}).get('value', [])
+        results[conversation_id] = _find_prospect_reply(messages, conversations[conversation_id])
+    
+    return results
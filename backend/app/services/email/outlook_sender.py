@@ -3,17 +3,21 @@ Outlook email sender using OAuth tokens.
 Sends emails via Microsoft Graph API and handles token refresh.
 """
 import requests
-import msal
-from typing import Optional, Dict
+from typing import Optional, Dict, List, Tuple
 from sqlalchemy.orm import Session
 
 from app.models.user import User
-from app.core.config import (
-    MICROSOFT_CLIENT_ID,
-    MICROSOFT_CLIENT_SECRET,
-    MICROSOFT_TENANT_ID,
+from app.services.email.graph_client import GRAPH_API_URL
+from app.services.email.graph_api import call_graph
+from app.services.email.graph_batch import (
+    execute_graph_batch,
+    graph_error_message,
+    graph_request,
 )
 
+# Return IDs that don't change when a message moves (draft -> Sent Items)
+IMMUTABLE_ID_HEADERS = {"Prefer": 'IdType="ImmutableId"'}
+
 
 class OutlookSender:
     """
@@ -38,52 +42,67 @@ class OutlookSender:
         if not user.outlook_access_token:
             raise ValueError("User does not have Outlook access token")
     
-    def _refresh_token_if_needed(self) -> str:
+    @staticmethod
+    def _build_draft_request(
+        to_email: str,
+        subject: str,
+        html_body: str,
+        reply_to_message_id: Optional[str] = None
+    ) -> Tuple[str, Dict]:
         """
-        Refresh Outlook access token if needed.
+        Build the Graph call creating the draft of one email (new message or reply).
+        
+        Emails are sent as draft + send: unlike sendMail / reply, creating
+        the draft returns the message ID and conversationId that threading
+        and reply tracking (outlook_sync) need.
         
         Returns:
-            Valid access token
+            (path relative to /v1.0, JSON payload)
         """
-        # Try to use current token first
-        # If it fails, we'll catch and refresh
+        if reply_to_message_id:
+            # Reply draft: Graph fills recipient, subject and conversation
+            return f"/me/messages/{reply_to_message_id}/createReply", {
+                "message": {
+                    "body": {
+                        "contentType": "HTML",
+                        "content": html_body
+                    }
+                }
+            }
         
-        # For now, we'll just return current token
-        # Microsoft tokens last 1 hour, we refresh on error
-        return self.user.outlook_access_token
+        # Build email payload (Microsoft Graph format)
+        return "/me/messages", {
+            "subject": subject,
+            "body": {
+                "contentType": "HTML",
+                "content": html_body
+            },
+            "toRecipients": [
+                {
+                    "emailAddress": {
+                        "address": to_email
+                    }
+                }
+            ]
+        }
     
-    def _refresh_access_token(self) -> str:
+    @staticmethod
+    def _send_result(draft: Dict, conversation_id: Optional[str] = None) -> Dict[str, str]:
         """
-        Force refresh the Outlook access token.
-        
-        Returns:
-            New access token
+        Threading info to save after a successful send, from the sent draft.
         """
-        authority = f"https://login.microsoftonline.com/{MICROSOFT_TENANT_ID}"
-        
-        app = msal.ConfidentialClientApplication(
-            MICROSOFT_CLIENT_ID,
-            authority=authority,
-            client_credential=MICROSOFT_CLIENT_SECRET,
-        )
-        
-        result = app.acquire_token_by_refresh_token(
-            self.user.outlook_refresh_token,
-            scopes=[
-                "https://graph.microsoft.com/Mail.Send",
-                "https://graph.microsoft.com/Mail.Read",
-            ]
-        )
-        
-        if "error" in result:
-            raise Exception(f"Token refresh failed: {result.get('error_description')}")
-        
-        # Save new token to database
-        new_token = result["access_token"]
-        self.user.outlook_access_token = new_token
-        self.db.commit()
-        
-        return new_token
+        return {
+            # Immutable ID: still valid once the message moved to Sent Items
+            "message_id": draft["id"],
+            "conversation_id": draft.get("conversationId") or conversation_id or ""
+        }
+    
+    def _delete_draft(self, draft_id: str) -> None:
+        """Best effort: remove a draft that could not be sent."""
+        try:
+            call_graph(self.user, self.db, "DELETE", f"{GRAPH_API_URL}/me/messages/{draft_id}")
+        except Exception:
+            pass
     
     def send_email(
         self,
@@ -101,96 +120,132 @@ class OutlookSender:
             subject: Email subject line
             html_body: HTML content of the email
             reply_to_message_id: Message ID to reply to (for threading)
-            conversation_id: Conversation ID (for threading)
+            conversation_id: Current conversation ID (kept if Graph doesn't return one)
         
         Returns:
             Dictionary with:
-                - message_id: Outlook message ID
+                - message_id: Outlook message ID (immutable)
                 - conversation_id: Outlook conversation ID (thread)
         
         Raises:
             Exception: If sending fails
         """
         try:
-            # Get access token
-            access_token = self._refresh_token_if_needed()
-            
             # Prepare Graph API request
-            url = "https://graph.microsoft.com/v1.0/me/sendMail"
-            headers = {
-                "Authorization": f"Bearer {access_token}",
-                "Content-Type": "application/json"
-            }
-            
-            # Build email payload (Microsoft Graph format)
-            email_payload = {
-                "message": {
-                    "subject": subject,
-                    "body": {
-                        "contentType": "HTML",
-                        "content": html_body
-                    },
-                    "toRecipients": [
-                        {
-                            "emailAddress": {
-                                "address": to_email
-                            }
-                        }
-                    ]
-                },
-                "saveToSentItems": True
-            }
-            
-            # Add threading headers if this is a reply
-            if reply_to_message_id:
-                # Microsoft uses different approach for threading
-                # We need to reply to the original message
-                url = f"https://graph.microsoft.com/v1.0/me/messages/{reply_to_message_id}/reply"
-                # Simplified payload for reply
-                email_payload = {
-                    "message": {
-                        "body": {
-                            "contentType": "HTML",
-                            "content": html_body
-                        }
-                    }
-                }
+            path, draft_payload = self._build_draft_request(
+                to_email, subject, html_body, reply_to_message_id
+            )
             
-            # Send the email
-            response = requests.post(url, headers=headers, json=email_payload)
+            # STEP 1: Create the draft (rate limited, token refreshed if needed)
+            response = call_graph(
+                self.user,
+                self.db,
+                "POST",
+                f"{GRAPH_API_URL}{path}",
+                json=draft_payload,
+                headers=IMMUTABLE_ID_HEADERS
+            )
+            response.raise_for_status()
+            draft = response.json()
             
-            # Handle token expiration
-            if response.status_code == 401:
-                # Token expired, refresh and retry
-                access_token = self._refresh_access_token()
-                headers["Authorization"] = f"Bearer {access_token}"
-                response = requests.post(url, headers=headers, json=email_payload)
+            # STEP 2: Send it
+            response = call_graph(
+                self.user,
+                self.db,
+                "POST",
+                f"{GRAPH_API_URL}/me/messages/{draft['id']}/send"
+            )
             
-            # Check for errors
+            # Check for errors (the unsent draft is not left behind)
+            if not response.ok:
+                self._delete_draft(draft["id"])
             response.raise_for_status()
             
-            # For replies, Microsoft doesn't return message details
-            # For new messages, we get the sent message
-            if reply_to_message_id:
-                return {
-                    "message_id": reply_to_message_id,  # Use original message ID
-                    "conversation_id": conversation_id or reply_to_message_id
-                }
-            else:
-                # Get the sent message details
-                # Microsoft Graph sendMail doesn't return message ID directly
-                # We need to query sent items to get it
-                # For now, return empty - will be filled by next email
-                return {
-                    "message_id": "",  # Will be updated on next send
-                    "conversation_id": ""
-                }
+            return self._send_result(draft, conversation_id)
             
         except requests.exceptions.HTTPError as e:
             error_detail = e.response.json() if e.response else str(e)
             raise Exception(f"Outlook API error: {error_detail}")
         except Exception as e:
             raise Exception(f"Failed to send email via Outlook: {str(e)}")
+    
+    def send_emails_batch(self, emails: List[Dict]) -> List[Dict[str, str]]:
+        """
+        Send several emails with Graph $batch (20 sub-requests per HTTP request).
+        
+        Two rounds, like send_email: one $batch creating the drafts, one
+        sending the drafts that were created. Drafts whose send was
+        rejected are deleted (a retry creates a new one).
+        
+        Args:
+            emails: Dicts with to_email, subject, html_body and optional
+                    reply_to_message_id / conversation_id (same as send_email)
+        
+        Returns:
+            One dict per email, in the same order: the send_email result on
+            success, {"error": str} on failure
+        """
+        sent: List[Optional[Dict[str, str]]] = [None] * len(emails)
+        
+        # STEP 1: Create the drafts
+        creates = []
+        for index, email in enumerate(emails):
+            path, payload = self._build_draft_request(
+                email["to_email"],
+                email["subject"],
+                email["html_body"],
+                email.get("reply_to_message_id")
+            )
+            creates.append(graph_request(str(index), "POST", path, payload, headers=IMMUTABLE_ID_HEADERS))
+        
+        try:
+            created = execute_graph_batch(self.user, self.db, creates)
+        except Exception as e:
+            return [{"error": f"Failed to send email via Outlook: {str(e)}"} for _ in emails]
+        
+        drafts: Dict[int, Dict] = {}
+        for index in range(len(emails)):
+            result = created[str(index)]
+            if 200 <= result["status"] < 300 and (result["body"] or {}).get("id"):
+                drafts[index] = result["body"]
+            else:
+                sent[index] = {"error": graph_error_message(result)}
+        
+        # STEP 2: Send them
+        sends = [
+            graph_request(str(index), "POST", f"/me/messages/{draft['id']}/send")
+            for index, draft in drafts.items()
+        ]
+        
+        try:
+            results = execute_graph_batch(self.user, self.db, sends) if sends else {}
+        except Exception as e:
+            for index in drafts:
+                sent[index] = {"error": f"Failed to send email via Outlook: {str(e)}"}
+            return sent
+        
+        unsent = []
+        for index, draft in drafts.items():
+            result = results[str(index)]
+            
+            # send answers 202 Accepted
+            if 200 <= result["status"] < 300:
+                sent[index] = self._send_result(draft, emails[index].get("conversation_id"))
+            else:
+                sent[index] = {"error": graph_error_message(result)}
+                unsent.append(draft["id"])
+        
+        # STEP 3: Don't leave unsent drafts in the mailbox (best effort)
+        if unsent:
+            try:
+                execute_graph_batch(self.user, self.db, [
+                    graph_request(str(index), "DELETE", f"/me/messages/{draft_id}")
+                    for index, draft_id in enumerate(unsent)
+                ])
+            except Exception:
+                pass
+        
+        return sent
 
 
 def send_email_via_outlook(
@@ -218,4 +273,14 @@ def send_email_via_outlook(
         Dict with message_id and conversation_id
     """
     sender = OutlookSender(user, db)
-    return sender.send_email(to_email, subject, html_body, reply_to_message_id, conversation_id)
\ No newline at end of file
+    return sender.send_email(to_email, subject, html_body, reply_to_message_id, conversation_id)
+
+def send_emails_batch_via_outlook(user: User, db: Session, emails: List[Dict]) -> List[Dict[str, str]]:
+    """
+    Convenience function to send several emails via Outlook $batch.
+    
+    Returns:
+        One result per email, {"error": str} for failed ones
+    """
+    sender = OutlookSender(user, db)
+    return sender.send_emails_batch(emails)
@@ -0,0 +1,148 @@
+"""
+Incremental Outlook reply sync using Microsoft Graph delta queries.
+
+We keep the deltaLink returned by mailFolders/inbox/messages/delta on the
+user (User.outlook_delta_link). Each sync only returns messages that
+arrived in the Inbox since the previous one.
+"""
+from typing import Dict, Optional, Tuple
+from datetime import datetime
+import requests
+from sqlalchemy import func
+from sqlalchemy.orm import Session
+
+from app.models.user import User
+from app.models.campaign import Campaign, CampaignContact
+from app.models.prospect import Prospect
+from app.services.email.graph_client import GRAPH_API_URL
+from app.services.email.graph_api import call_graph
+from app.services.email.contact_responses import save_contact_responses
+
+GRAPH_INBOX_DELTA_URL = f"{GRAPH_API_URL}/me/mailFolders/inbox/messages/delta"
+
+# Only what we need to match a reply to a contact
+DELTA_SELECT = "from,conversationId,receivedDateTime,bodyPreview"
+
+
+def _get_open_conversations(db: Session, user_id: int) -> Dict[str, Tuple[int, str]]:
+    """
+    Conversations still waiting for a reply, across all campaigns of the user.
+
+    Returns:
+        Mapping conversation_id -> (campaign_contact_id, prospect_email lowercased)
+    """
+    rows = db.query(
+        CampaignContact.id,
+        CampaignContact.email_thread_id,
+        Prospect.email
+    ).join(
+        Campaign, Campaign.id == CampaignContact.campaign_id
+    ).join(
+        Prospect, Prospect.id == CampaignContact.prospect_id
+    ).filter(
+        Campaign.user_id == user_id,
+        CampaignContact.email_thread_id.isnot(None),
+        CampaignContact.status == "contacted"
+    ).all()
+
+    return {conversation_id: (contact_id, email.lower()) for contact_id, conversation_id, email in rows}
+
+
+def _get_first_send_date(db: Session, user_id: int) -> Optional[datetime]:
+    """Oldest send still waiting for a reply (start point of the first sync)."""
+    return db.query(func.min(CampaignContact.last_email_sent_at)).join(
+        Campaign, Campaign.id == CampaignContact.campaign_id
+    ).filter(
+        Campaign.user_id == user_id,
+        CampaignContact.email_thread_id.isnot(None),
+        CampaignContact.status == "contacted"
+    ).scalar()
+
+
+def _graph_get(user: User, db: Session, url: str, params: Optional[Dict] = None) -> Dict:
+    """
+    GET a Graph URL (rate limited, token refreshed if needed).
+    """
+    response = call_graph(user, db, "GET", url, params=params)
+    response.raise_for_status()
+    return response.json()
+
+
+def sync_outlook_replies(user: User, db: Session) -> Dict:
+    """
+    Detect prospect replies received in the Inbox since the last sync.
+
+    First run (no delta link): starts the delta from the oldest send still
+    waiting for a reply. Next runs follow the stored delta link.
+
+    Args:
+        user: User with Outlook connected
+        db: Database session
+
+    Returns:
+        Dict with:
+            - mode: "full" (first run / expired delta link) or "incremental"
+            - new_messages: int (Inbox messages looked at)
+            - responses_found: int
+    """
+    open_conversations = _get_open_conversations(db, user.id)
+    responses: Dict[int, Dict] = {}
+    looked_at = 0
+
+    if user.outlook_delta_link:
+        mode = "incremental"
+        url, params = user.outlook_delta_link, None
+    else:
+        mode = "full"
+        url, params = GRAPH_INBOX_DELTA_URL, {"$select": DELTA_SELECT}
+        since = _get_first_send_date(db, user.id) or datetime.utcnow()
+        params["$filter"] = f"receivedDateTime ge {since.strftime('%Y-%m-%dT%H:%M:%SZ')}"
+
+    delta_link = None
+
+    while url:
+        try:
+            page = _graph_get(user, db, url, params)
+        except requests.exceptions.HTTPError as e:
+            if mode == "incremental" and e.response is not None and e.response.status_code == 410:
+                # Delta token expired: start over from scratch
+                user.outlook_delta_link = None
+                db.commit()
+                return sync_outlook_replies(user, db)
+            raise
+
+        for message in page.get('value', []):
+            looked_at += 1
+
+            # Deleted messages come back as {"id": ..., "@removed": {...}}
+            if '@removed' in message:
+                continue
+
+            match = open_conversations.get(message.get('conversationId'))
+            if not match:
+                continue
+
+            contact_id, prospect_email = match
+            sender = message.get('from', {}).get('emailAddress', {}).get('address', '')
+
+            if sender.lower() == prospect_email and contact_id not in responses:
+                responses[contact_id] = {
+                    "has_response": True,
+                    "response_content": message.get('bodyPreview', ''),
+                    "response_date": message.get('receivedDateTime')
+                }
+
+        # nextLink / deltaLink already carry the query params
+        url, params = page.get('@odata.nextLink'), None
+        delta_link = page.get('@odata.deltaLink', delta_link)
+
+    save_contact_responses(db, responses)
+    if delta_link:
+        user.outlook_delta_link = delta_link
+    db.commit()
+
+    return {
+        "mode": mode,
+        "new_messages": looked_at,
+        "responses_found": len(responses)
+    }
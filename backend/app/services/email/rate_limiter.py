@@ -0,0 +1,172 @@
+"""
+Adaptive rate limiter for provider API calls.
+
+One token bucket per (provider, user), counted in provider quota units:
+- Gmail: quota units (messages.send = 100, threads.get = 10...), refilled
+  at GMAIL_QUOTA_UNITS_PER_SECOND.
+- Outlook: Graph requests (each $batch sub-request counts), refilled at
+  GRAPH_REQUESTS_PER_SECOND.
+
+The refill rate adapts (AIMD): halved each time the provider throttles us
+(429 / rate limit errors), then increased a little on each successful call
+until it is back at the configured maximum. Retry-After is honored: the
+bucket blocks every caller of that user until the delay is over.
+
+Buckets are per process: each RQ worker process has its own.
+"""
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from typing import Dict, Optional, Tuple
+import threading
+import time
+
+from googleapiclient.errors import HttpError
+
+from app.core.config import GMAIL_QUOTA_UNITS_PER_SECOND, GRAPH_REQUESTS_PER_SECOND
+
+# Gmail API cost of each call we make, in quota units
+GMAIL_QUOTA_UNITS = {
+    "messages.send": 100,
+    "messages.get": 5,
+    "threads.get": 10,
+    "history.list": 2,
+    "getProfile": 1,
+}
+
+# Wait used when the provider throttles without a Retry-After
+DEFAULT_THROTTLE_DELAY = 2.0  # seconds
+
+# Slowest rate we fall to, as a fraction of the maximum
+MIN_RATE_RATIO = 0.05
+
+# Rate recovered on each successful call, as a fraction of the maximum
+RATE_INCREASE_RATIO = 0.05
+
+
+class ProviderRateLimiter:
+    """
+    Token bucket with an adaptive refill rate (units per second).
+    Thread-safe: shared by every send / check of a user in the process.
+    """
+
+    def __init__(self, max_rate: float):
+        """
+        Args:
+            max_rate: Highest refill rate allowed by the provider (units/second).
+                      It is also the bucket size (1 second of burst).
+        """
+        self.max_rate = float(max_rate)
+        self.min_rate = self.max_rate * MIN_RATE_RATIO
+        self.rate = self.max_rate
+        self.capacity = self.max_rate
+        self.tokens = self.capacity
+        self.updated_at = time.monotonic()
+        self.blocked_until = 0.0
+        self._lock = threading.Lock()
+
+    def _refill(self, now: float) -> None:
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def acquire(self, units: float = 1) -> None:
+        """
+        Block until `units` can be spent.
+
+        Calls costing more than the bucket size (e.g. a Gmail batch of 100
+        threads.get) go through once the bucket is full and leave it in
+        debt, so the next calls wait for it to be paid back.
+        """
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._refill(now)
+
+                wait = self.blocked_until - now
+                if wait <= 0:
+                    needed = min(units, self.capacity)
+                    if self.tokens >= needed:
+                        self.tokens -= units
+                        return
+                    wait = (needed - self.tokens) / self.rate
+
+            time.sleep(wait)
+
+    def on_success(self) -> None:
+        """Additive increase: get back towards the maximum rate."""
+        with self._lock:
+            self.rate = min(self.max_rate, self.rate + self.max_rate * RATE_INCREASE_RATIO)
+
+    def on_throttle(self, retry_after: Optional[float] = None) -> None:
+        """
+        Multiplicative decrease + pause after the provider throttled us.
+
+        Args:
+            retry_after: Delay asked by the provider (seconds), if any
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.rate = max(self.min_rate, self.rate / 2)
+            self.tokens = min(self.tokens, 0)
+            delay = retry_after if retry_after is not None else DEFAULT_THROTTLE_DELAY
+            self.blocked_until = max(self.blocked_until, now + delay)
+
+
+_limiters: Dict[Tuple[str, int], ProviderRateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(provider: str, user_id: int) -> ProviderRateLimiter:
+    """
+    Return the rate limiter of a user for a provider ("gmail" or "outlook").
+    """
+    with _limiters_lock:
+        limiter = _limiters.get((provider, user_id))
+        if limiter is None:
+            max_rate = GMAIL_QUOTA_UNITS_PER_SECOND if provider == "gmail" else GRAPH_REQUESTS_PER_SECOND
+            limiter = ProviderRateLimiter(max_rate)
+            _limiters[(provider, user_id)] = limiter
+        return limiter
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """
+    Parse a Retry-After header (seconds or HTTP date) into seconds.
+    """
+    if not value:
+        return None
+
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        pass
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max((retry_at - datetime.now(timezone.utc)).total_seconds(), 0.0)
+
+
+def is_gmail_rate_limit_error(error: Exception) -> bool:
+    """
+    True for Gmail "slow down" errors: 429, or 403 rateLimitExceeded /
+    userRateLimitExceeded.
+    """
+    if not isinstance(error, HttpError):
+        return False
+
+    status = error.resp.status
+    if status == 429:
+        return True
+
+    content = error.content.decode('utf-8', 'ignore') if isinstance(error.content, bytes) else str(error.content)
+    return status == 403 and "ratelimitexceeded" in content.lower()
+
+
+def gmail_retry_after(error: HttpError) -> Optional[float]:
+    """Retry-After of a Gmail error response, in seconds."""
+    return parse_retry_after(error.resp.get('retry-after'))
@@ -2,9 +2,20 @@
 Email template renderer using Jinja2.
 Loads HTML templates and renders them with provided data.
 """
-from jinja2 import Environment, FileSystemLoader, select_autoescape, TemplateNotFound
+from jinja2 import (
+    Environment,
+    FileSystemBytecodeCache,
+    FileSystemLoader,
+    Template,
+    select_autoescape,
+    TemplateNotFound,
+)
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, Iterable, List, Optional
+import hashlib
+import os
+
+from app.core.config import EMAIL_TEMPLATES_AUTO_RELOAD, EMAIL_TEMPLATES_BYTECODE_DIR
 
 # Get the templates directory path
 # This finds: backend/app/templates/emails/
@@ -26,15 +37,62 @@ class EmailTemplateRenderer:
         )
     """
     
-    def __init__(self):
-        """Initialize Jinja2 environment with templates folder."""
+    def __init__(self, production: Optional[bool] = None):
+        """
+        Initialize Jinja2 environment with templates folder.
+        
+        Args:
+            production: Production mode (default: unless EMAIL_TEMPLATES_AUTO_RELOAD).
+                        Templates are compiled once and never re-checked on disk,
+                        and compiled bytecode is cached on disk for other
+                        processes / restarts.
+        """
+        if production is None:
+            production = not EMAIL_TEMPLATES_AUTO_RELOAD
+        
+        options: Dict[str, Any] = {}
+        if production:
+            if EMAIL_TEMPLATES_BYTECODE_DIR:
+                os.makedirs(EMAIL_TEMPLATES_BYTECODE_DIR, exist_ok=True)
+            options = {
+                "auto_reload": False,  # no stat() of the file on each lookup
+                "bytecode_cache": FileSystemBytecodeCache(EMAIL_TEMPLATES_BYTECODE_DIR),
+            }
+        
         # Create Jinja2 environment
         # FileSystemLoader = load templates from disk
         # autoescape = prevent XSS attacks in HTML
         self.env = Environment(
             loader=FileSystemLoader(TEMPLATES_DIR),
-            autoescape=select_autoescape(['html', 'xml'])
+            autoescape=select_autoescape(['html', 'xml']),
+            **options
         )
+        self.production = production
+        self._versions: Dict[str, str] = {}
+    
+    def template_version(self, template_name: str) -> str:
+        """
+        Short hash of a template's source, used to know if a pre-rendered
+        (staged) email still matches the template.
+        In production mode it is computed once, like the compiled template.
+        """
+        version = self._versions.get(template_name)
+        if version is None:
+            try:
+                source, _, _ = self.env.loader.get_source(self.env, template_name)
+            except TemplateNotFound:
+                raise FileNotFoundError(f"Email template not found: {template_name}")
+            version = hashlib.sha256(source.encode('utf-8')).hexdigest()[:16]
+            if self.production:
+                self._versions[template_name] = version
+        return version
+    
+    def _get_template(self, template_name: str) -> Template:
+        """Load a template (compiled once, then served from the env cache)."""
+        try:
+            return self.env.get_template(template_name)
+        except TemplateNotFound:
+            raise FileNotFoundError(f"Email template not found: {template_name}")
     
     def render(self, template_name: str, data: Dict[str, Any]) -> str:
         """
@@ -52,20 +110,60 @@ class EmailTemplateRenderer:
             TemplateNotFound: If template file doesn't exist
             Exception: If rendering fails
         """
+        # Load the template file
+        template = self._get_template(template_name)
+        
         try:
-            # Load the template file
-            template = self.env.get_template(template_name)
-            
             # Render with data (replaces {{variables}})
             html = template.render(**data)
             
             return html
             
-        except TemplateNotFound:
-            raise FileNotFoundError(f"Email template not found: {template_name}")
         except Exception as e:
             raise Exception(f"Error rendering template {template_name}: {str(e)}")
     
+    def render_batch(
+        self,
+        template_name: str,
+        campaign_ctx: Dict[str, Any],
+        contacts: Iterable[Dict[str, Any]]
+    ) -> List[str]:
+        """
+        Render one template for many contacts.
+        
+        The template is looked up once and the shared (campaign-level)
+        context is built once; each contact only adds its own variables
+        on top of it.
+        
+        Args:
+            template_name: Path to template (e.g., "campaigns/initial.html")
+            campaign_ctx: Variables shared by every email (campaign, sender...)
+            contacts: One dict of personal variables per email
+        
+        Returns:
+            Rendered HTML strings, in the same order as contacts
+        
+        Raises:
+            FileNotFoundError: If template file doesn't exist
+            Exception: If rendering fails for a contact
+        """
+        template = self._get_template(template_name)
+        
+        # Template globals + campaign variables, merged once for the batch
+        shared = {**template.globals, **campaign_ctx}
+        render_func = template.root_render_func
+        concat = self.env.concat
+        
+        bodies = []
+        for index, contact_vars in enumerate(contacts):
+            try:
+                context = template.new_context(shared, shared=True, locals=contact_vars)
+                bodies.append(concat(render_func(context)))
+            except Exception as e:
+                raise Exception(f"Error rendering template {template_name} (contact #{index}): {str(e)}")
+        
+        return bodies
+    
     def render_campaign_email(
         self,
         template_name: str,
@@ -109,6 +207,25 @@ class EmailTemplateRenderer:
         }
         
         return self.render(full_template_path, data)
+    
+    def render_campaign_batch(
+        self,
+        template_name: str,
+        campaign_ctx: Dict[str, Any],
+        contacts: Iterable[Dict[str, Any]]
+    ) -> List[str]:
+        """
+        Batch version of render_campaign_email.
+        
+        Args:
+            template_name: Which template to use ("initial.html", "followup_1.html", etc.)
+            campaign_ctx: campaign_name, campaign_location, sender_name + extra variables
+            contacts: One dict per email with first_name, last_name, company_name
+        
+        Returns:
+            Rendered HTML emails, in the same order as contacts
+        """
+        return self.render_batch(f"campaigns/{template_name}", campaign_ctx, contacts)
 
 
 # Create singleton instance (reuse across app)
@@ -0,0 +1,15 @@
+"""
+Import services for Spine CRM.
+Set-based Excel imports: vectorized validation, chunked INSERT ... ON CONFLICT.
+"""
+from .prospect_import import import_prospect_frames, prepare_prospect_rows
+from .product_import import import_product_frames, prepare_product_rows
+from .reader import SheetReader
+
+__all__ = [
+    "import_prospect_frames",
+    "prepare_prospect_rows",
+    "import_product_frames",
+    "prepare_product_rows",
+    "SheetReader",
+]
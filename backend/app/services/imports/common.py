@@ -0,0 +1,218 @@
+"""
+Shared helpers of the Excel import engines.
+
+Validation and normalization work on whole columns (vectorized pandas
+operations), never row by row. Row errors are collected as
+(excel_row, message) pairs so imports report them instead of failing.
+"""
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Set, Tuple
+
+import pandas as pd
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.orm import Session
+
+from app.core.config import IMPORT_CHUNK_SIZE
+
+# First data row of a sheet is Excel row 2 (row 1 = headers)
+EXCEL_ROW_OFFSET = 2
+
+RowError = Tuple[int, str]
+
+# (excel_row, key value of the row, message)
+KeyedRowError = Tuple[int, Optional[str], str]
+
+
+def missing_columns(columns: Iterable[str], required: List[str]) -> List[str]:
+    """Required columns absent from the file header."""
+    columns = set(columns)
+    return [col for col in required if col not in columns]
+
+
+def normalize_text(series: pd.Series) -> pd.Series:
+    """
+    Strip a text column; blanks and "nan" / "None" placeholders become NA.
+    """
+    values = series.astype("string").str.strip()
+    return values.mask(values.isin(["", "nan", "NaN", "None"]))
+
+
+def normalize_frame(df: pd.DataFrame, columns: List[str]) -> pd.DataFrame:
+    """
+    Keep the import columns present in the file, normalized as text.
+    Columns missing from the file are left out (not reset on updates).
+    """
+    return pd.DataFrame(
+        {col: normalize_text(df[col]) for col in columns if col in df.columns},
+        index=df.index
+    )
+
+
+def flag_rows(mask: pd.Series, message: str, errors: List[RowError]) -> pd.Series:
+    """
+    Record `message` for every row where mask is True.
+
+    Returns:
+        The mask, to drop the flagged rows
+    """
+    mask = mask.fillna(False).astype(bool)
+    errors.extend((int(index) + EXCEL_ROW_OFFSET, message) for index in mask.index[mask])
+    return mask
+
+
+def flag_too_long(df: pd.DataFrame, max_lengths: Dict[str, int], errors: List[RowError]) -> pd.Series:
+    """
+    Flag values longer than their database column.
+
+    Returns:
+        Mask of the rows with at least one value too long
+    """
+    invalid = pd.Series(False, index=df.index)
+    for col, max_length in max_lengths.items():
+        if col in df.columns:
+            invalid |= flag_rows(df[col].str.len() > max_length, f"{col} is longer than {max_length} characters.", errors)
+    return invalid
+
+
+def flag_duplicates(
+    values: pd.Series,
+    label: str,
+    errors: List[RowError],
+    seen: Optional[Set[str]] = None
+) -> pd.Series:
+    """
+    Flag repeated values of a key column: the first occurrence is imported,
+    the others are reported.
+
+    Args:
+        seen: Values of the previous chunks of the same file (updated here)
+
+    Returns:
+        Mask of the repeated rows
+    """
+    repeated = values.notna() & values.duplicated(keep="first")
+    if seen is not None:
+        repeated |= values.isin(seen)
+        seen.update(values[values.notna() & ~repeated])
+    return flag_rows(repeated, f"Duplicate {label} in file.", errors)
+
+
+def iter_chunks(df: pd.DataFrame, size: int = IMPORT_CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """Split a frame in chunks of `size` rows."""
+    for start in range(0, len(df), size):
+        yield df.iloc[start:start + size]
+
+
+def to_records(df: pd.DataFrame) -> List[Dict[str, Optional[str]]]:
+    """Rows as dicts, with NA as None (ready for an INSERT)."""
+    return df.astype(object).where(df.notna(), None).to_dict("records")
+
+
+def write_chunk(
+    db: Session,
+    rows: List[Dict[str, Any]],
+    row_numbers: List[int],
+    write: Callable[[List[Dict[str, Any]]], List[Any]],
+    errors: List[RowError]
+) -> List[Any]:
+    """
+    Run one set-based write for a chunk, in a savepoint.
+
+    If the chunk fails, its rows are written again one by one (one savepoint
+    each): only the bad rows are reported, the others go through.
+
+    Args:
+        write: Writes rows, returns one result per written row (RETURNING)
+
+    Returns:
+        Results of the rows written
+    """
+    try:
+        with db.begin_nested():
+            return write(rows)
+    except SQLAlchemyError:
+        pass
+
+    results = []
+    for row_number, row in zip(row_numbers, rows):
+        try:
+            with db.begin_nested():
+                results.extend(write([row]))
+        except SQLAlchemyError as e:
+            errors.append((row_number, f"Database error: {getattr(e, 'orig', e)}"))
+
+    return results
+
+
+def cell_text(value: Any) -> Optional[str]:
+    """A cell as text (stripped), None if empty."""
+    return None if value is None or pd.isna(value) else str(value).strip()
+
+
+class FrameImporter:
+    """
+    Imports a sheet for one user, frame by frame (see reader.SheetReader).
+
+    Subclasses set KEY_COLUMN (the column unique in a file) and
+    REQUIRED_COLUMNS, and implement prepare() (vectorized validation) and
+    import_chunk() (set-based write). Nothing is committed: the caller
+    commits, after each frame or once at the end.
+    """
+
+    KEY_COLUMN: str
+    REQUIRED_COLUMNS: List[str]
+
+    def __init__(self, db: Session, user_id: int, update_existing: bool = False):
+        """
+        Args:
+            db: Database session (not committed)
+            user_id: Owner of the imported rows
+            update_existing: Update the user's rows already in the database
+        """
+        self.db = db
+        self.user_id = user_id
+        self.update_existing = update_existing
+
+        self.seen: Set[str] = set()  # Keys of the previous frames
+        self.total_rows = 0
+        self.error_count = 0
+        self.stats = {"created": 0, "updated": 0, "skipped": 0}
+
+    def prepare(self, df: pd.DataFrame, seen: Set[str]) -> Tuple[pd.DataFrame, List[RowError]]:
+        """Validate and normalize a frame: (valid rows, row errors)."""
+        raise NotImplementedError
+
+    def import_chunk(self, chunk: pd.DataFrame, errors: List[RowError]) -> None:
+        """Write up to IMPORT_CHUNK_SIZE valid rows, recording stats and errors."""
+        raise NotImplementedError
+
+    def add(self, frame: pd.DataFrame) -> List[KeyedRowError]:
+        """
+        Import one frame.
+
+        Returns:
+            Errors of its rows, sorted by row, with the key value of each row
+        """
+        self.total_rows += len(frame)
+        valid, errors = self.prepare(frame, self.seen)
+
+        for chunk in iter_chunks(valid):
+            self.import_chunk(chunk, errors)
+
+        self.error_count += len(errors)
+        keys = frame[self.KEY_COLUMN]
+        return [
+            (row, cell_text(keys.get(row - EXCEL_ROW_OFFSET)), message)
+            for row, message in sorted(errors)
+        ]
+
+    def replay(self, frame: pd.DataFrame) -> None:
+        """
+        Go over rows imported by a previous run without writing them, so
+        duplicates of those rows are still reported (resumed imports).
+        """
+        self.prepare(frame, self.seen)
+
+
+def format_errors(errors: List[RowError], limit: int) -> List[str]:
+    """Errors sorted by row, as "Row N: message" (first `limit` only)."""
+    return [f"Row {row}: {message}" for row, message in sorted(errors)[:limit]]
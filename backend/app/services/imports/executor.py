@@ -0,0 +1,37 @@
+"""
+Dedicated, bounded pool for import work.
+
+Parsing spreadsheets and writing thousands of rows are long, blocking
+calls. They run on their own IMPORT_WORKERS threads instead of the event
+loop, or of the shared threadpool that serves every sync route and
+dependency: a large upload never holds back the rest of the API.
+
+At most IMPORT_WORKERS + IMPORT_MAX_QUEUED imports/previews are admitted
+at a time; past that, try_acquire_slot() fails and the route answers 503
+instead of queueing without bound.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+import asyncio
+import functools
+import threading
+
+from app.core.config import IMPORT_MAX_QUEUED, IMPORT_WORKERS
+
+_executor = ThreadPoolExecutor(max_workers=IMPORT_WORKERS, thread_name_prefix="import-worker")
+_slots = threading.BoundedSemaphore(IMPORT_WORKERS + IMPORT_MAX_QUEUED)
+
+
+def try_acquire_slot() -> bool:
+    """Admit one more import, without waiting. False when the pool is full."""
+    return _slots.acquire(blocking=False)
+
+
+def release_slot() -> None:
+    _slots.release()
+
+
+async def run_import(func: Callable, *args: Any) -> Any:
+    """Run a blocking call on the import pool and wait for it without blocking the loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(func, *args))
@@ -0,0 +1,401 @@
+"""
+Background import jobs - large prospect / product files imported by workers.
+
+1. The API copies the upload to IMPORT_UPLOAD_DIR, checks its header,
+   creates an ImportJob and enqueues run_import_job (queue IMPORT_QUEUE_NAME).
+2. The worker claims the job, reads the file frame by frame and commits
+   each frame together with the job counters and its row errors
+   (import_job_errors): the client polls GET /api/imports/{job_id}.
+3. A run that fails is retried IMPORT_MAX_ATTEMPTS times in all, after
+   IMPORT_RETRY_DELAY (doubled at each attempt), then the job is "failed".
+   The file is kept until the job is completed or failed.
+4. A worker that dies (or is killed by RQ after IMPORT_JOB_TIMEOUT) leaves
+   the job "running" without heartbeat (updated_at). After
+   IMPORT_JOB_STALE_AFTER, requeue_stale_import_jobs puts it back in the
+   queue, to resume at rows_processed - run by the follow-up scheduler at
+   each reload, on API startup (resume_import_jobs) or with:
+       python -m app.services.imports.jobs
+"""
+from datetime import datetime, timedelta
+from typing import IO, Any, Dict, Iterator, List, Optional
+import csv
+import io
+import logging
+import os
+import shutil
+import uuid
+
+from sqlalchemy import func, insert, update
+from sqlalchemy.orm import Session
+
+from app.core.config import (
+    IMPORT_JOB_STALE_AFTER,
+    IMPORT_JOB_TIMEOUT,
+    IMPORT_MAX_ATTEMPTS,
+    IMPORT_QUEUE_NAME,
+    IMPORT_RETRY_DELAY,
+    IMPORT_UPLOAD_DIR,
+)
+from app.db import SessionLocal
+from app.models.import_job import ImportJob, ImportJobError, ImportJobStatus
+from app.services.imports.common import KeyedRowError, missing_columns
+from app.services.imports.product_import import ProductImporter
+from app.services.imports.prospect_import import ProspectImporter
+from app.services.imports.reader import SheetReader
+from app.services.task_queue import enqueue, uses_redis, wait_for_local_tasks
+
+logger = logging.getLogger(__name__)
+
+# kind -> importer
+IMPORTERS = {
+    "prospects": ProspectImporter,
+    "products": ProductImporter,
+}
+
+
+def create_import_job(
+    db: Session,
+    user_id: int,
+    kind: str,
+    fileobj: IO[bytes],
+    filename: str,
+    update_existing: bool = False
+) -> ImportJob:
+    """
+    Save an upload and queue its import.
+
+    Args:
+        db: Database session (committed here)
+        user_id: Owner of the imported rows
+        kind: "prospects" or "products"
+        fileobj: Uploaded file (UploadFile.file), copied chunk by chunk
+        filename: Original name, gives the format
+
+    Returns:
+        The queued job
+
+    Raises:
+        ValueError: File can't be read or misses required columns (nothing is queued)
+    """
+    job_id = str(uuid.uuid4())
+    os.makedirs(IMPORT_UPLOAD_DIR, exist_ok=True)
+    file_path = os.path.join(IMPORT_UPLOAD_DIR, job_id + os.path.splitext(filename)[1].lower())
+
+    fileobj.seek(0)
+    with open(file_path, "wb") as out:
+        shutil.copyfileobj(fileobj, out)
+
+    # STEP 1: Check the header now, the client gets the error right away
+    try:
+        with open(file_path, "rb") as f, SheetReader(f, filename) as reader:
+            missing = missing_columns(reader.columns, IMPORTERS[kind].REQUIRED_COLUMNS)
+    except Exception as e:
+        _remove_file(file_path)
+        raise ValueError(f"Error reading file: {e}")
+
+    if missing:
+        _remove_file(file_path)
+        raise ValueError(f"Missing required columns: {', '.join(missing)}")
+
+    # STEP 2: Create the job, dispatch once it is committed
+    job = ImportJob(
+        id=job_id,
+        user_id=user_id,
+        kind=kind,
+        filename=filename,
+        file_path=file_path,
+        update_existing=update_existing,
+        status=ImportJobStatus.QUEUED,
+        attempts=0,
+        rows_processed=0,
+        created=0,
+        updated=0,
+        skipped=0,
+        error_count=0,
+    )
+    db.add(job)
+    db.commit()
+
+    _enqueue_job(job_id)
+    return job
+
+
+def run_import_job(job_id: str) -> None:
+    """
+    Run (or resume) an import job.
+
+    The job is claimed with a conditional UPDATE (queued only, stale jobs
+    are queued again by requeue_stale_import_jobs): two workers never run
+    the same job.
+
+    Args:
+        job_id: ID of the ImportJob
+    """
+    db = SessionLocal()
+
+    try:
+        # STEP 1: Claim the job
+        now = datetime.utcnow()
+        claimed = db.query(ImportJob).filter(
+            ImportJob.id == job_id,
+            ImportJob.status == ImportJobStatus.QUEUED
+        ).update(
+            {
+                ImportJob.status: ImportJobStatus.RUNNING,
+                ImportJob.attempts: ImportJob.attempts + 1,
+                ImportJob.started_at: func.coalesce(ImportJob.started_at, now),
+                ImportJob.updated_at: now,
+            },
+            synchronize_session=False
+        )
+        db.commit()
+
+        if not claimed:
+            # Already running elsewhere (or finished)
+            return
+
+        job = db.get(ImportJob, job_id)
+
+        # STEP 2: Import, one commit per frame
+        try:
+            _run(db, job)
+        except Exception as e:
+            db.rollback()
+            logger.exception("Import job %s failed (attempt %s)", job_id, job.attempts)
+            _record_failure(db, job_id, str(e))
+
+    finally:
+        db.close()
+
+
+def _record_failure(db: Session, job_id: str, error: str) -> None:
+    """Retry the job later (it resumes at rows_processed), or mark it failed after the last attempt."""
+    job = db.get(ImportJob, job_id)
+    job.last_error = error
+
+    if job.attempts < IMPORT_MAX_ATTEMPTS:
+        job.status = ImportJobStatus.QUEUED
+        db.commit()
+        _enqueue_job(job_id, delay=retry_delay(job.attempts))
+    else:
+        job.status = ImportJobStatus.FAILED
+        job.finished_at = datetime.utcnow()
+        db.commit()
+        _remove_file(job.file_path)
+        logger.warning("Import job %s failed after %s attempts: %s", job_id, job.attempts, error)
+
+
+def retry_delay(attempts: int) -> int:
+    """Seconds before the next attempt: IMPORT_RETRY_DELAY, doubled at each failed attempt."""
+    return IMPORT_RETRY_DELAY * 2 ** max(attempts - 1, 0)
+
+
+def _enqueue_job(job_id: str, delay: Optional[float] = None) -> None:
+    enqueue(IMPORT_QUEUE_NAME, run_import_job, job_id, delay=delay, job_timeout=IMPORT_JOB_TIMEOUT)
+
+
+def _run(db: Session, job: ImportJob) -> None:
+    importer = IMPORTERS[job.kind](db, job.user_id, job.update_existing)
+
+    # Counters of a previous run (resumed job)
+    base = {
+        "created": job.created,
+        "updated": job.updated,
+        "skipped": job.skipped,
+        "error_count": job.error_count,
+    }
+
+    if job.rows_processed:
+        logger.info("Resuming import job %s at row %s", job.id, job.rows_processed)
+
+    with open(job.file_path, "rb") as f, SheetReader(f, job.filename) as reader:
+        for frame in reader.frames():
+            done = frame.index < job.rows_processed
+
+            # Already committed by a previous run
+            if done.any():
+                importer.replay(frame[done])
+                frame = frame[~done]
+                if frame.empty:
+                    continue
+
+            errors = importer.add(frame)
+            _save_errors(db, job.id, errors)
+
+            job.rows_processed = int(frame.index[-1]) + 1
+            job.created = base["created"] + importer.stats["created"]
+            job.updated = base["updated"] + importer.stats["updated"]
+            job.skipped = base["skipped"] + importer.stats["skipped"]
+            job.error_count = base["error_count"] + importer.error_count
+
+            # Rows, counters and errors of the frame together
+            db.commit()
+
+    job.total_rows = job.rows_processed
+    job.status = ImportJobStatus.COMPLETED
+    job.finished_at = datetime.utcnow()
+    db.commit()
+
+    _remove_file(job.file_path)
+    logger.info(
+        "Import job %s done: %s rows, %s created, %s updated, %s errors",
+        job.id, job.total_rows, job.created, job.updated, job.error_count
+    )
+
+
+def _save_errors(db: Session, job_id: str, errors: List[KeyedRowError]) -> None:
+    if errors:
+        db.execute(insert(ImportJobError), [
+            {"job_id": job_id, "row": row, "value": value[:255] if value else None, "message": message}
+            for row, value, message in errors
+        ])
+
+
+def _remove_file(file_path: str) -> None:
+    try:
+        os.remove(file_path)
+    except FileNotFoundError:
+        pass
+
+
+def requeue_stale_import_jobs(db: Session, stale_after: int = IMPORT_JOB_STALE_AFTER) -> Dict[str, int]:
+    """
+    Recover jobs no worker is taking care of any more.
+
+    - 'running' without heartbeat for stale_after: the worker died (or RQ
+      killed it after IMPORT_JOB_TIMEOUT). Queued again to resume at
+      rows_processed, or 'failed' if it was the last attempt.
+    - 'queued' untouched for stale_after: its queue entry was lost.
+      Enqueued again; a duplicate is harmless, the claim lets only one through.
+
+    Each job is taken with a conditional UPDATE: concurrent sweeps and
+    workers don't step on each other.
+
+    Args:
+        db: Database session (committed here)
+        stale_after: Seconds without update (0: every queued / running job)
+
+    Returns:
+        Dictionary with requeued and failed counts
+    """
+    now = datetime.utcnow()
+    stale = now - timedelta(seconds=stale_after)
+    error = f"Worker stopped (no heartbeat for {stale_after}s)"
+
+    # STEP 1: Dead worker, last attempt
+    failed = db.execute(
+        update(ImportJob).where(
+            ImportJob.status == ImportJobStatus.RUNNING,
+            ImportJob.updated_at < stale,
+            ImportJob.attempts >= IMPORT_MAX_ATTEMPTS
+        ).values(
+            status=ImportJobStatus.FAILED,
+            last_error=error,
+            finished_at=now,
+            updated_at=now
+        ).returning(ImportJob.file_path)
+    ).scalars().all()
+
+    # STEP 2: Dead worker, attempts left
+    retried = db.execute(
+        update(ImportJob).where(
+            ImportJob.status == ImportJobStatus.RUNNING,
+            ImportJob.updated_at < stale
+        ).values(
+            status=ImportJobStatus.QUEUED,
+            last_error=error,
+            updated_at=now
+        ).returning(ImportJob.id)
+    ).scalars().all()
+
+    # STEP 3: Queued without queue entry (touched, so they are not enqueued again next sweep)
+    lost = db.execute(
+        update(ImportJob).where(
+            ImportJob.status == ImportJobStatus.QUEUED,
+            ImportJob.updated_at < stale
+        ).values(
+            updated_at=now
+        ).returning(ImportJob.id)
+    ).scalars().all()
+
+    db.commit()
+
+    for file_path in failed:
+        _remove_file(file_path)
+
+    for job_id in [*retried, *lost]:
+        _enqueue_job(job_id)
+
+    if failed or retried or lost:
+        logger.warning(
+            "Stale import jobs: %s requeued after a dead worker, %s failed, %s lost jobs requeued",
+            len(retried), len(failed), len(lost)
+        )
+
+    return {"requeued": len(retried) + len(lost), "failed": len(failed)}
+
+
+def resume_import_jobs() -> int:
+    """
+    Enqueue the jobs a worker should be running (API startup, cron).
+
+    With RQ, the jobs left stale by a dead worker. In-process (no
+    REDIS_URL), the pool died with the previous process: every queued or
+    running job is an orphan, resumed right away (one API process only).
+
+    Returns:
+        Number of jobs enqueued
+    """
+    db = SessionLocal()
+
+    try:
+        stale_after = IMPORT_JOB_STALE_AFTER if uses_redis() else 0
+        return requeue_stale_import_jobs(db, stale_after)["requeued"]
+    finally:
+        db.close()
+
+
+def get_import_job(db: Session, user_id: int, job_id: str) -> Optional[ImportJob]:
+    """Job of this user, or None."""
+    return db.query(ImportJob).filter(
+        ImportJob.id == job_id,
+        ImportJob.user_id == user_id
+    ).first()
+
+
+def iter_error_report(job_id: str, key_label: str) -> Iterator[str]:
+    """
+    Full error report of a job as CSV, streamed (sorted by row).
+
+    Opens its own session: it runs while the response is being sent.
+    """
+    db = SessionLocal()
+
+    try:
+        yield _csv_line(["row", key_label, "error"])
+
+        rows = db.query(ImportJobError.row, ImportJobError.value, ImportJobError.message).filter(
+            ImportJobError.job_id == job_id
+        ).order_by(ImportJobError.row, ImportJobError.id).yield_per(1000)
+
+        for row, value, message in rows:
+            yield _csv_line([row, value or "", message])
+    finally:
+        db.close()
+
+
+def _csv_line(values: List[Any]) -> str:
+    buffer = io.StringIO()
+    csv.writer(buffer).writerow(values)
+    return buffer.getvalue()
+
+
+def main() -> None:
+    """Resume stale import jobs once (cron), then wait for in-process workers."""
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+    resume_import_jobs()
+    wait_for_local_tasks()
+
+
+if __name__ == "__main__":
+    main()
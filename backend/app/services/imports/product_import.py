@@ -0,0 +1,218 @@
+"""
+Product import engine - catalog rows (CSV/Excel) to products, set-based.
+
+1. The catalog comes in frames (see reader.SheetReader), each validated and
+   normalized with vectorized pandas operations (no iterrows). Values must
+   be read as text so item numbers like 00123 are kept as written.
+2. Valid rows are written IMPORT_CHUNK_SIZE at a time, with two statements
+   per chunk:
+   - one lookup of the chunk's item numbers for the user (unnest of one
+     array parameter, joined on the unique index)
+   - one INSERT ... ON CONFLICT (user_id, item_number) DO UPDATE / DO NOTHING
+     ... RETURNING, on the unique index ix_products_user_item
+3. Each chunk runs in a savepoint (see write_chunk): a failing chunk is
+   retried row by row, only the bad rows are reported.
+
+Nothing is committed here: the caller commits.
+"""
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import pandas as pd
+from sqlalchemy import String, bindparam, func
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.orm import Session
+
+from app.core.config import IMPORT_MAX_REPORTED_ERRORS
+from app.models.product import Product
+from app.services.imports.common import (
+    EXCEL_ROW_OFFSET,
+    FrameImporter,
+    KeyedRowError,
+    RowError,
+    flag_duplicates,
+    flag_rows,
+    flag_too_long,
+    normalize_frame,
+    to_records,
+    write_chunk,
+)
+
+PRODUCT_COLUMNS = ["item_number", "name", "short_description"]
+
+REQUIRED_COLUMNS = ["item_number", "name"]
+
+# Column -> size of its database column
+MAX_LENGTHS = {
+    "item_number": 100,
+    "name": 255,
+}
+
+EXISTS_MESSAGE = "Product with this item_number already exists (set update_existing=True to update)"
+
+
+def prepare_product_rows(df: pd.DataFrame, seen: Optional[Set[str]] = None) -> Tuple[pd.DataFrame, List[RowError]]:
+    """
+    Validate and normalize a product catalog (or one frame of it).
+
+    Rows without item_number AND name (blank lines) are dropped silently.
+
+    Args:
+        df: Rows as read from the file (required columns already checked)
+        seen: Item numbers of the previous frames, to report duplicates across frames
+
+    Returns:
+        (valid rows, indexed like df; row errors)
+    """
+    errors: List[RowError] = []
+    data = normalize_frame(df, PRODUCT_COLUMNS)
+
+    blank = data["item_number"].isna() & data["name"].isna()
+
+    invalid = blank.copy()
+    invalid |= flag_rows(~blank & data["item_number"].isna(), "Empty item_number.", errors)
+    invalid |= flag_rows(~blank & data["name"].isna(), "Empty name.", errors)
+    invalid |= flag_too_long(data, MAX_LENGTHS, errors)
+    invalid |= flag_duplicates(data["item_number"].where(~invalid), "item_number", errors, seen)
+
+    return data[~invalid], errors
+
+
+class ProductImporter(FrameImporter):
+    """Imports product catalogs (see FrameImporter). Every row not written counts as skipped."""
+
+    KEY_COLUMN = "item_number"
+    REQUIRED_COLUMNS = REQUIRED_COLUMNS
+
+    def prepare(self, df: pd.DataFrame, seen: Set[str]) -> Tuple[pd.DataFrame, List[RowError]]:
+        return prepare_product_rows(df, seen)
+
+    def add(self, frame: pd.DataFrame) -> List[KeyedRowError]:
+        written = self.stats["created"] + self.stats["updated"]
+        errors = super().add(frame)
+        self.stats["skipped"] += len(frame) - (self.stats["created"] + self.stats["updated"] - written)
+        return errors
+
+    def import_chunk(self, chunk: pd.DataFrame, errors: List[RowError]) -> None:
+        rows = to_records(chunk)
+        row_numbers = [int(index) + EXCEL_ROW_OFFSET for index in chunk.index]
+
+        # STEP 1: One lookup for the chunk's item numbers, one probe of
+        # ix_products_user_item each (an IN list becomes a filter over all
+        # the user's products once the statement is prepared)
+        wanted = func.unnest(
+            bindparam("item_numbers", [row["item_number"] for row in rows], type_=ARRAY(String))
+        ).table_valued("item_number").render_derived()
+
+        existing = {
+            item_number for (item_number,) in self.db.query(Product.item_number).join(
+                wanted, Product.item_number == wanted.c.item_number
+            ).filter(
+                Product.user_id == self.user_id
+            )
+        }
+
+        to_write: List[Tuple[int, Dict[str, Any], bool]] = []  # (row number, row, already exists)
+
+        for row_number, row in zip(row_numbers, rows):
+            if row["item_number"] not in existing:
+                to_write.append((row_number, row, False))
+            elif self.update_existing:
+                to_write.append((row_number, row, True))
+            else:
+                errors.append((row_number, EXISTS_MESSAGE))
+
+        if not to_write:
+            return
+
+        # STEP 2: One upsert for the chunk, in a savepoint
+        update_columns = [col for col in chunk.columns if col != "item_number"]
+
+        written = set(write_chunk(
+            self.db,
+            [row for _, row, _ in to_write],
+            [row_number for row_number, _, _ in to_write],
+            lambda batch: _upsert(self.db, self.user_id, batch, self.update_existing, update_columns),
+            errors
+        ))
+
+        for row_number, row, exists in to_write:
+            if row["item_number"] in written:
+                self.stats["updated" if exists else "created"] += 1
+            elif not exists:
+                # Created by another import since the lookup
+                errors.append((row_number, EXISTS_MESSAGE))
+
+
+def import_product_frames(
+    db: Session,
+    user_id: int,
+    frames: Iterable[pd.DataFrame],
+    update_existing: bool = False
+) -> Dict[str, Any]:
+    """
+    Import a product catalog for a user, frame by frame.
+
+    Args:
+        db: Database session (not committed)
+        user_id: Owner of the imported products
+        frames: Catalog rows, indexed by row position (required columns already checked)
+        update_existing: Update the user's products with the same item_number
+                         (otherwise they are reported and skipped)
+
+    Returns:
+        Dictionary with total_rows, created, updated, skipped (every row not
+        written), error_count and errors (first IMPORT_MAX_REPORTED_ERRORS,
+        as {"row", "item_number", "error"})
+    """
+    importer = ProductImporter(db, user_id, update_existing)
+    errors: List[KeyedRowError] = []
+
+    for frame in frames:
+        errors.extend(importer.add(frame))
+
+    return {
+        "total_rows": importer.total_rows,
+        **importer.stats,
+        "error_count": importer.error_count,
+        "errors": [
+            {"row": row, "item_number": item_number or "N/A", "error": message}
+            for row, item_number, message in sorted(errors)[:IMPORT_MAX_REPORTED_ERRORS]
+        ],
+    }
+
+
+def _upsert(
+    db: Session,
+    user_id: int,
+    rows: List[Dict[str, Any]],
+    update_existing: bool,
+    update_columns: List[str]
+) -> List[str]:
+    """
+    INSERT ... ON CONFLICT (user_id, item_number) for rows of one user.
+    An empty short_description keeps the current one.
+
+    Returns:
+        Item numbers inserted or updated
+    """
+    now = datetime.utcnow()
+    stmt = insert(Product).values([
+        {**row, "user_id": user_id, "created_at": now, "updated_at": now}
+        for row in rows
+    ])
+
+    if update_existing:
+        set_ = {col: stmt.excluded[col] for col in update_columns}
+        if "short_description" in set_:
+            set_["short_description"] = func.coalesce(stmt.excluded.short_description, Product.short_description)
+
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["user_id", "item_number"],
+            set_={**set_, "updated_at": stmt.excluded.updated_at}
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=["user_id", "item_number"])
+
+    return list(db.execute(stmt.returning(Product.item_number)).scalars())
+
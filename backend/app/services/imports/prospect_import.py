@@ -0,0 +1,222 @@
+"""
+Prospect import engine - Excel rows to prospects, set-based.
+
+1. The sheet comes in frames (see reader.SheetReader), each validated and
+   normalized with vectorized pandas operations (no iterrows).
+2. Valid rows are written IMPORT_CHUNK_SIZE at a time, with two statements
+   per chunk:
+   - one lookup of the chunk's emails (emails are unique across ALL users)
+   - one INSERT ... ON CONFLICT (email) DO UPDATE / DO NOTHING ... RETURNING
+3. Each chunk runs in a savepoint (see write_chunk): a failing chunk is
+   retried row by row, only the bad rows are reported.
+
+Nothing is committed here: the caller commits.
+"""
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+
+import pandas as pd
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.orm import Session
+
+from app.core.config import IMPORT_MAX_REPORTED_ERRORS
+from app.models.prospect import Prospect, ProspectSource, ProspectStatus
+from app.services.imports.common import (
+    EXCEL_ROW_OFFSET,
+    FrameImporter,
+    RowError,
+    flag_duplicates,
+    flag_rows,
+    flag_too_long,
+    format_errors,
+    normalize_frame,
+    to_records,
+    write_chunk,
+)
+
+# Excel column -> Prospect column
+PROSPECT_COLUMNS = {
+    "email": "email",
+    "first_name": "first_name",
+    "last_name": "last_name",
+    "company": "company_name",
+    "job_title": "position",
+    "phone": "phone_number",
+    "notes": "source_notes",
+}
+
+REQUIRED_COLUMNS = ["email", "first_name", "last_name"]
+
+# Excel column -> size of its database column
+MAX_LENGTHS = {
+    "email": 255,
+    "first_name": 100,
+    "last_name": 100,
+    "company": 255,
+    "job_title": 100,
+    "phone": 20,
+}
+
+EMAIL_PATTERN = r"^[^@\s]+@[^@\s]+\.[^@\s]+$"
+
+# Imported prospects come from trade show exports
+DEFAULT_SOURCE = ProspectSource.trade_show
+
+
+def prepare_prospect_rows(df: pd.DataFrame, seen: Optional[Set[str]] = None) -> Tuple[pd.DataFrame, List[RowError]]:
+    """
+    Validate and normalize a prospect sheet (or one frame of it).
+
+    Args:
+        df: Rows as read from Excel (required columns already checked)
+        seen: Emails of the previous frames, to report duplicates across frames
+
+    Returns:
+        (valid rows with Prospect column names, indexed like df; row errors)
+    """
+    errors: List[RowError] = []
+    data = normalize_frame(df, list(PROSPECT_COLUMNS))
+    data["email"] = data["email"].str.lower()
+
+    invalid = flag_rows(data["email"].isna(), "Invalid or empty email.", errors)
+    invalid |= flag_rows(
+        ~invalid & ~data["email"].str.match(EMAIL_PATTERN, na=False),
+        "Invalid or empty email.",
+        errors
+    )
+    invalid |= flag_rows(data["first_name"].isna(), "Empty first_name.", errors)
+    invalid |= flag_rows(data["last_name"].isna(), "Empty last_name.", errors)
+    invalid |= flag_too_long(data, MAX_LENGTHS, errors)
+    invalid |= flag_duplicates(data["email"].where(~invalid), "email", errors, seen)
+
+    return data[~invalid].rename(columns=PROSPECT_COLUMNS), errors
+
+
+class ProspectImporter(FrameImporter):
+    """Imports prospect sheets (see FrameImporter)."""
+
+    KEY_COLUMN = "email"
+    REQUIRED_COLUMNS = REQUIRED_COLUMNS
+
+    def prepare(self, df: pd.DataFrame, seen: Set[str]) -> Tuple[pd.DataFrame, List[RowError]]:
+        return prepare_prospect_rows(df, seen)
+
+    def import_chunk(self, chunk: pd.DataFrame, errors: List[RowError]) -> None:
+        rows = to_records(chunk)
+        row_numbers = [int(index) + EXCEL_ROW_OFFSET for index in chunk.index]
+
+        # STEP 1: One lookup for the chunk's emails
+        owners = dict(
+            self.db.query(Prospect.email, Prospect.user_id).filter(
+                Prospect.email.in_([row["email"] for row in rows])
+            ).all()
+        )
+
+        to_write: List[Tuple[int, Dict[str, Any], bool]] = []  # (row number, row, already exists)
+
+        for row_number, row in zip(row_numbers, rows):
+            if row["email"] not in owners:
+                to_write.append((row_number, row, False))
+            elif owners[row["email"]] != self.user_id:
+                errors.append((row_number, "Email already used by another account."))
+            elif self.update_existing:
+                to_write.append((row_number, row, True))
+            else:
+                self.stats["skipped"] += 1
+
+        if not to_write:
+            return
+
+        # STEP 2: One upsert for the chunk, in a savepoint
+        update_columns = [col for col in chunk.columns if col != "email"]
+
+        written = set(write_chunk(
+            self.db,
+            [row for _, row, _ in to_write],
+            [row_number for row_number, _, _ in to_write],
+            lambda batch: _upsert(self.db, self.user_id, batch, self.update_existing, update_columns),
+            errors
+        ))
+
+        for row_number, row, exists in to_write:
+            if row["email"] in written:
+                self.stats["updated" if exists else "created"] += 1
+            elif not exists:
+                # Created by someone else since the lookup
+                errors.append((row_number, "Email already exists."))
+
+
+def import_prospect_frames(
+    db: Session,
+    user_id: int,
+    frames: Iterable[pd.DataFrame],
+    update_existing: bool = False
+) -> Dict[str, Any]:
+    """
+    Import a prospect sheet for a user, frame by frame.
+
+    Args:
+        db: Database session (not committed)
+        user_id: Owner of the imported prospects
+        frames: Sheet rows, indexed by row position (required columns already checked)
+        update_existing: Update the user's prospects already in the database
+                         (otherwise they are skipped)
+
+    Returns:
+        Dictionary with total_rows, created, updated, skipped, error_count
+        and errors (first IMPORT_MAX_REPORTED_ERRORS, "Row N: message")
+    """
+    importer = ProspectImporter(db, user_id, update_existing)
+    errors: List[RowError] = []
+
+    for frame in frames:
+        errors.extend((row, message) for row, _, message in importer.add(frame))
+
+    return {
+        "total_rows": importer.total_rows,
+        **importer.stats,
+        "error_count": importer.error_count,
+        "errors": format_errors(errors, IMPORT_MAX_REPORTED_ERRORS),
+    }
+
+
+def _upsert(
+    db: Session,
+    user_id: int,
+    rows: List[Dict[str, Any]],
+    update_existing: bool,
+    update_columns: List[str]
+) -> List[str]:
+    """
+    INSERT ... ON CONFLICT (email) for rows of one user.
+    Conflicting prospects are updated only if they belong to that user.
+
+    Returns:
+        Emails inserted or updated
+    """
+    now = datetime.utcnow()
+    stmt = insert(Prospect).values([
+        {
+            **row,
+            "user_id": user_id,
+            "source": DEFAULT_SOURCE,
+            "status": ProspectStatus.new,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for row in rows
+    ])
+
+    if update_existing:
+        stmt = stmt.on_conflict_do_update(
+            index_elements=["email"],
+            set_={
+                **{col: stmt.excluded[col] for col in update_columns},
+                "updated_at": stmt.excluded.updated_at,
+            },
+            where=Prospect.user_id == user_id
+        )
+    else:
+        stmt = stmt.on_conflict_do_nothing(index_elements=["email"])
+
+    return list(db.execute(stmt.returning(Prospect.email)).scalars())
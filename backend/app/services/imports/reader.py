@@ -0,0 +1,150 @@
+"""
+Chunked reading of uploaded CSV / Excel sheets.
+
+Uploads are never loaded in memory as a whole: FastAPI already spools
+UploadFile bodies to a temporary file on disk past 1 MB, and SheetReader
+parses that file IMPORT_CHUNK_SIZE rows at a time:
+- CSV with pandas read_csv(chunksize=...)
+- xlsx with openpyxl in read_only mode (rows streamed from the zip)
+
+Every value is read as text (like dtype=str): item numbers, phone numbers
+and zip codes keep their leading zeros. Frames are indexed by their row
+position in the sheet, so EXCEL_ROW_OFFSET gives back the Excel row.
+"""
+from typing import IO, Iterator, List, Optional, Sequence
+
+import openpyxl
+import pandas as pd
+
+from app.core.config import IMPORT_CHUNK_SIZE
+
+
+class SheetReader:
+    """
+    First sheet of an uploaded file, read chunk by chunk.
+
+    Usage:
+        with SheetReader(file.file, file.filename) as reader:
+            missing = missing_columns(reader.columns, REQUIRED_COLUMNS)
+            for frame in reader.frames():
+                ...
+    """
+
+    def __init__(self, fileobj: IO[bytes], filename: str, chunk_size: int = IMPORT_CHUNK_SIZE):
+        """
+        Args:
+            fileobj: Seekable binary file (UploadFile.file)
+            filename: Original name, gives the format (.csv, .xlsx, .xls)
+
+        Raises:
+            ValueError: Unsupported format
+            Exception: Whatever the parser raises on a corrupt file
+        """
+        self.fileobj = fileobj
+        self.chunk_size = chunk_size
+        self.format = filename.lower().rsplit(".", 1)[-1]
+        self.workbook = None
+        self._xls_frame: Optional[pd.DataFrame] = None
+
+        if self.format == "csv":
+            self.fileobj.seek(0)
+            self.columns = list(pd.read_csv(self.fileobj, dtype=str, nrows=0).columns)
+        elif self.format == "xlsx":
+            self.fileobj.seek(0)
+            self.workbook = openpyxl.load_workbook(self.fileobj, read_only=True, data_only=True)
+            self.sheet = self.workbook.worksheets[0]
+            # Some writers store wrong dimensions: read every row there is
+            self.sheet.reset_dimensions()
+            header = next(self.sheet.iter_rows(max_row=1, values_only=True), ())
+            self.columns = [
+                f"Unnamed: {i}" if value is None else str(value)
+                for i, value in enumerate(header)
+            ]
+        elif self.format == "xls":
+            # Legacy format: no streaming reader, parsed once
+            self.fileobj.seek(0)
+            self._xls_frame = pd.read_excel(self.fileobj, dtype=str)
+            self.columns = list(self._xls_frame.columns)
+        else:
+            raise ValueError(f"Unsupported file format: .{self.format}")
+
+    def __enter__(self) -> "SheetReader":
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.close()
+
+    def close(self) -> None:
+        if self.workbook is not None:
+            self.workbook.close()
+            self.workbook = None
+
+    def frames(self, usecols: Optional[Sequence[str]] = None, chunk_size: Optional[int] = None) -> Iterator[pd.DataFrame]:
+        """
+        Data rows, chunk_size rows per frame (from the first row on each call).
+
+        Args:
+            usecols: Columns to keep (all by default, missing ones are ignored)
+            chunk_size: Rows per frame (IMPORT_CHUNK_SIZE by default)
+        """
+        chunk_size = chunk_size or self.chunk_size
+        columns = [col for col in self.columns if usecols is None or col in usecols]
+
+        if self.format == "csv":
+            self.fileobj.seek(0)
+            with pd.read_csv(self.fileobj, dtype=str, usecols=columns, chunksize=chunk_size) as chunks:
+                yield from chunks
+        elif self.format == "xlsx":
+            yield from self._xlsx_frames(columns, chunk_size)
+        else:
+            for start in range(0, len(self._xls_frame), chunk_size):
+                yield self._xls_frame.iloc[start:start + chunk_size][columns]
+
+    def head(self, rows: int) -> pd.DataFrame:
+        """First `rows` data rows only."""
+        return next(self.frames(chunk_size=rows), pd.DataFrame(columns=self.columns))
+
+    def _xlsx_frames(self, columns: List[str], chunk_size: int) -> Iterator[pd.DataFrame]:
+        positions = [self.columns.index(col) for col in columns]
+        width = len(self.columns)
+
+        rows: List[list] = []
+        start = 0
+        blank_rows = 0  # Blank rows are kept only if data follows (like read_excel)
+
+        for values in self.sheet.iter_rows(min_row=2, values_only=True):
+            if all(value is None for value in values):
+                blank_rows += 1
+                continue
+
+            for _ in range(blank_rows):
+                rows.append([None] * len(positions))
+                if len(rows) == chunk_size:
+                    yield _frame(rows, columns, start)
+                    start += len(rows)
+                    rows = []
+            blank_rows = 0
+
+            values = (tuple(values) + (None,) * width)[:width]
+            rows.append([_text(values[i]) for i in positions])
+
+            if len(rows) == chunk_size:
+                yield _frame(rows, columns, start)
+                start += len(rows)
+                rows = []
+
+        if rows:
+            yield _frame(rows, columns, start)
+
+
+def _frame(rows: List[list], columns: List[str], start: int) -> pd.DataFrame:
+    return pd.DataFrame(rows, columns=columns, index=range(start, start + len(rows)), dtype=object)
+
+
+def _text(value) -> Optional[str]:
+    """Cell value as read_excel(dtype=str) gives it."""
+    if value is None:
+        return None
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value)
@@ -68,6 +68,7 @@ def exchange_code_for_tokens(code: str) -> dict:
     "client_id": credentials.client_id,
     "client_secret": credentials.client_secret,
     "scopes": credentials.scopes,
+    "expires_at": credentials.expiry,
   }
 
 def get_gmail_user_info(access_token: str) -> dict:
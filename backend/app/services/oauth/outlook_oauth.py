@@ -1,6 +1,7 @@
 """
 Outlook OAuth helper.
 """
+from datetime import datetime, timedelta
 import msal
 import requests
 from app.core.config import (
@@ -9,6 +10,7 @@ from app.core.config import (
     MICROSOFT_TENANT_ID,
     MICROSOFT_REDIRECT_URI,
 )
+from app.services.email.graph_client import GRAPH_API_URL, graph_session
 
 SCOPES = [
     "https://graph.microsoft.com/Mail.Send",
@@ -19,14 +21,37 @@ SCOPES = [
 
 AUTHORITY = f"https://login.microsoftonline.com/{MICROSOFT_TENANT_ID}"
 
+# Shared by every MSAL app: authority metadata (cached 24h by MSAL) and connections
+_msal_http_cache: dict = {}
+_msal_http_client = requests.Session()
 
-def get_outlook_auth_url(state: str) -> str:
-    """Generate Outlook OAuth authorization URL."""
-    app = msal.ConfidentialClientApplication(
+
+def get_msal_app() -> msal.ConfidentialClientApplication:
+    """
+    Build the MSAL app for one OAuth operation.
+
+    Tokens are stored on the user, so each app gets its own throwaway token
+    cache (a shared one would keep every user's tokens in memory, unread).
+    Authority metadata comes from the shared http cache: building an app
+    only costs a network call the first time.
+    """
+    return msal.ConfidentialClientApplication(
         MICROSOFT_CLIENT_ID,
         authority=AUTHORITY,
         client_credential=MICROSOFT_CLIENT_SECRET,
+        http_client=_msal_http_client,
+        http_cache=_msal_http_cache,
     )
+
+
+def token_expires_at(result: dict) -> datetime:
+    """Expiry (naive UTC) of a token returned by MSAL."""
+    return datetime.utcnow() + timedelta(seconds=int(result.get("expires_in", 3600)))
+
+
+def get_outlook_auth_url(state: str) -> str:
+    """Generate Outlook OAuth authorization URL."""
+    app = get_msal_app()
     
     auth_url = app.get_authorization_request_url(
         scopes=SCOPES,
@@ -39,11 +64,7 @@ def get_outlook_auth_url(state: str) -> str:
 
 def exchange_code_for_tokens(code: str) -> dict:
     """Exchange authorization code for access and refresh tokens."""
-    app = msal.ConfidentialClientApplication(
-        MICROSOFT_CLIENT_ID,
-        authority=AUTHORITY,
-        client_credential=MICROSOFT_CLIENT_SECRET,
-    )
+    app = get_msal_app()
     
     result = app.acquire_token_by_authorization_code(
         code,
@@ -57,14 +78,15 @@ def exchange_code_for_tokens(code: str) -> dict:
     return {
         "access_token": result.get("access_token"),
         "refresh_token": result.get("refresh_token"),
+        "expires_at": token_expires_at(result),
     }
 
 
 def get_outlook_user_info(access_token: str) -> dict:
     """Get Outlook user info (email address)."""
     headers = {"Authorization": f"Bearer {access_token}"}
-    response = requests.get(
-        "https://graph.microsoft.com/v1.0/me",
+    response = graph_session.get(
+        f"{GRAPH_API_URL}/me",
         headers=headers,
     )
     response.raise_for_status()
@@ -83,11 +105,7 @@ def get_outlook_user_info(access_token: str) -> dict:
 
 def refresh_outlook_token(refresh_token: str) -> str:
     """Refresh Outlook access token."""
-    app = msal.ConfidentialClientApplication(
-        MICROSOFT_CLIENT_ID,
-        authority=AUTHORITY,
-        client_credential=MICROSOFT_CLIENT_SECRET,
-    )
+    app = get_msal_app()
     
     result = app.acquire_token_by_refresh_token(
         refresh_token,
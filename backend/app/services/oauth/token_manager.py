@@ -0,0 +1,184 @@
+"""
+OAuth token manager for Gmail and Outlook.
+
+Tokens are refreshed shortly BEFORE they expire (OAUTH_REFRESH_MARGIN),
+using the expiry stored on the user, instead of waiting for a failed call.
+
+Refreshes are single-flight per (provider, user): when 50 concurrent sends
+find an expiring token, one thread refreshes it and the others wait, then
+reload the new token from the database.
+
+New tokens are saved with a session of their own: refreshing never commits
+(or loses, on rollback) the caller's pending changes.
+"""
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Tuple
+import threading
+
+from google.oauth2.credentials import Credentials
+from google.auth.transport.requests import Request
+from sqlalchemy.orm import Session
+from sqlalchemy.orm.attributes import set_committed_value
+
+from app.db import SessionLocal
+from app.models.user import User
+from app.core.config import GOOGLE_CLIENT_ID, GOOGLE_CLIENT_SECRET, OAUTH_REFRESH_MARGIN
+from app.services.oauth.outlook_oauth import (
+    SCOPES as OUTLOOK_SCOPES,
+    get_msal_app,
+    token_expires_at,
+)
+
+GMAIL_SCOPES = [
+    'https://www.googleapis.com/auth/gmail.send',
+    'https://www.googleapis.com/auth/gmail.readonly',
+]
+
+_refresh_locks: Dict[Tuple[str, int], threading.Lock] = {}
+_refresh_locks_lock = threading.Lock()
+
+
+def _get_refresh_lock(provider: str, user_id: int) -> threading.Lock:
+    """Return the lock serializing token refreshes of a user."""
+    with _refresh_locks_lock:
+        lock = _refresh_locks.get((provider, user_id))
+        if lock is None:
+            lock = threading.Lock()
+            _refresh_locks[(provider, user_id)] = lock
+        return lock
+
+
+def _save_tokens(user: User, values: Dict[str, object]) -> None:
+    """
+    Persist refreshed tokens in their own transaction, and update the
+    caller's user object without marking it dirty.
+    """
+    with SessionLocal() as session:
+        session.query(User).filter(User.id == user.id).update(values, synchronize_session=False)
+        session.commit()
+
+    for name, value in values.items():
+        set_committed_value(user, name, value)
+
+
+def _expires_soon(token: Optional[str], expires_at: Optional[datetime]) -> bool:
+    """
+    True if the token must be refreshed now.
+    Tokens saved before expiry tracking (no expires_at) are refreshed once.
+    """
+    if not token or expires_at is None:
+        return True
+    return expires_at - datetime.utcnow() < timedelta(seconds=OAUTH_REFRESH_MARGIN)
+
+
+def _build_gmail_credentials(user: User) -> Credentials:
+    return Credentials(
+        token=user.gmail_access_token,
+        refresh_token=user.gmail_refresh_token,
+        token_uri="https://oauth2.googleapis.com/token",
+        client_id=GOOGLE_CLIENT_ID,
+        client_secret=GOOGLE_CLIENT_SECRET,
+        scopes=GMAIL_SCOPES,
+        expiry=user.gmail_token_expires_at,
+    )
+
+
+def get_gmail_credentials(user: User, db: Session) -> Credentials:
+    """
+    Get Gmail credentials, refreshed if they expire within the margin.
+
+    Args:
+        user: User with Gmail connected
+        db: Database session of the caller (reloads the token, never committed)
+
+    Returns:
+        Valid Gmail OAuth credentials (with expiry set)
+    """
+    if not _expires_soon(user.gmail_access_token, user.gmail_token_expires_at):
+        return _build_gmail_credentials(user)
+
+    with _get_refresh_lock("gmail", user.id):
+        # Another thread / worker may have refreshed while we waited
+        db.refresh(user, attribute_names=["gmail_access_token", "gmail_token_expires_at"])
+        credentials = _build_gmail_credentials(user)
+
+        if _expires_soon(user.gmail_access_token, user.gmail_token_expires_at) and credentials.refresh_token:
+            credentials.refresh(Request())
+
+            # Save new access token + expiry to database
+            _save_tokens(user, {
+                "gmail_access_token": credentials.token,
+                "gmail_token_expires_at": credentials.expiry,
+            })
+
+        return credentials
+
+
+def get_outlook_access_token(user: User, db: Session) -> str:
+    """
+    Get an Outlook access token, refreshed if it expires within the margin.
+
+    Args:
+        user: User with Outlook connected
+        db: Database session of the caller (reloads the token, never committed)
+
+    Returns:
+        Valid access token
+    """
+    if not _expires_soon(user.outlook_access_token, user.outlook_token_expires_at):
+        return user.outlook_access_token
+
+    return _refresh_outlook(user, db, rejected_token=None)
+
+
+def refresh_outlook_access_token(user: User, db: Session) -> str:
+    """
+    Force a refresh after Graph rejected the user's current token (401).
+
+    Concurrent callers rejected with the same token share one refresh.
+
+    Returns:
+        New access token
+    """
+    return _refresh_outlook(user, db, rejected_token=user.outlook_access_token)
+
+
+def _refresh_outlook(user: User, db: Session, rejected_token: Optional[str]) -> str:
+    """
+    Refresh the Outlook token under the user's lock, unless another thread
+    already did it.
+
+    Raises:
+        Exception: If MSAL refuses the refresh token
+    """
+    with _get_refresh_lock("outlook", user.id):
+        db.refresh(user, attribute_names=[
+            "outlook_access_token",
+            "outlook_refresh_token",
+            "outlook_token_expires_at",
+        ])
+
+        if rejected_token is not None:
+            if user.outlook_access_token != rejected_token:
+                return user.outlook_access_token
+        elif not _expires_soon(user.outlook_access_token, user.outlook_token_expires_at):
+            return user.outlook_access_token
+
+        result = get_msal_app().acquire_token_by_refresh_token(
+            user.outlook_refresh_token,
+            scopes=OUTLOOK_SCOPES
+        )
+
+        if "error" in result:
+            raise Exception(f"Token refresh failed: {result.get('error_description')}")
+
+        # Save new token to database (Microsoft may rotate the refresh token)
+        tokens = {
+            "outlook_access_token": result["access_token"],
+            "outlook_token_expires_at": token_expires_at(result),
+        }
+        if result.get("refresh_token"):
+            tokens["outlook_refresh_token"] = result["refresh_token"]
+        _save_tokens(user, tokens)
+
+        return user.outlook_access_token
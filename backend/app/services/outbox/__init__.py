@@ -0,0 +1,13 @@
+"""
+Outbox services for Spine CRM.
+Queues campaign emails in the database and sends them from background workers.
+"""
+from .outbox_service import enqueue_campaign_emails, get_job_progress
+from .worker import process_outbox_email, requeue_stale_outbox_emails
+
+__all__ = [
+    "enqueue_campaign_emails",
+    "get_job_progress",
+    "process_outbox_email",
+    "requeue_stale_outbox_emails",
+]
@@ -0,0 +1,167 @@
+"""
+Outbox service - turns a bulk send request into outbox rows + worker jobs.
+
+The rows of a request are written as drafts and committed, then published
+(draft -> ready) with one UPDATE and handed to the workers. Drafts left by
+a request that died in between are published by the stale sweep (see
+worker.requeue_stale_outbox_emails), or taken over by the next request.
+"""
+from datetime import datetime
+from typing import Optional, Dict, Any, List
+from sqlalchemy import func, update
+from sqlalchemy.orm import Session
+import uuid
+
+from app.core.config import OUTBOX_QUEUE_NAME
+from app.models.campaign import Campaign, CampaignContact
+from app.models.outbox import OutboxEmail, OutboxStatus
+from app.models.user import User
+from app.services.task_queue import enqueue
+from app.services.outbox.worker import process_outbox_email
+
+
+def _idempotency_key(contact: CampaignContact) -> str:
+    """One outbox email per contact and per sequence step."""
+    return f"{contact.id}:{contact.email_sequence_step}"
+
+
+def enqueue_campaign_emails(
+    db: Session,
+    campaign: Campaign,
+    contacts: List[CampaignContact],
+    user: User,
+    template_override: Optional[str] = None
+) -> Dict[str, Any]:
+    """
+    Create outbox emails for the given contacts and hand them to the workers.
+
+    Contacts that already have an outbox email for their current step
+    (ready, sending or sent) are skipped. Failed ones are retried, drafts
+    left by an interrupted request are taken over.
+
+    Args:
+        db: Database session
+        campaign: Campaign the contacts belong to
+        contacts: CampaignContact rows to email
+        user: User sending the emails
+        template_override: Optional template name override
+
+    Returns:
+        Dictionary with:
+            - job_id: str (use it to poll progress), None if nothing was queued
+            - queued: int
+            - skipped: int
+    """
+    job_id = str(uuid.uuid4())
+    contacts_by_key = {_idempotency_key(contact): contact for contact in contacts}
+
+    # One query for all existing outbox rows of these contacts
+    existing = {
+        row.idempotency_key: row
+        for row in db.query(OutboxEmail).filter(
+            OutboxEmail.idempotency_key.in_(list(contacts_by_key))
+        ).all()
+    }
+
+    to_dispatch = []
+    skipped = 0
+
+    for key, contact in contacts_by_key.items():
+        outbox = existing.get(key)
+
+        if outbox is not None:
+            if outbox.status not in (OutboxStatus.FAILED, OutboxStatus.DRAFT):
+                # Already queued or sent for this step
+                skipped += 1
+                continue
+
+            # Retry a failed email (or finish a draft) under the new job
+            outbox.job_id = job_id
+            outbox.status = OutboxStatus.DRAFT
+            outbox.attempts = 0
+            outbox.last_error = None
+            outbox.template_override = template_override
+        else:
+            outbox = OutboxEmail(
+                user_id=user.id,
+                campaign_id=campaign.id,
+                campaign_contact_id=contact.id,
+                job_id=job_id,
+                status=OutboxStatus.DRAFT,
+                sequence_step=contact.email_sequence_step,
+                template_override=template_override,
+                idempotency_key=key,
+                attempts=0
+            )
+            db.add(outbox)
+
+        to_dispatch.append(outbox)
+
+    # STEP 1: Every row of the request written, as drafts
+    db.commit()
+
+    # STEP 2: Publish them (workers only claim ready emails), then dispatch
+    ready_ids = db.execute(
+        update(OutboxEmail).where(
+            OutboxEmail.job_id == job_id,
+            OutboxEmail.status == OutboxStatus.DRAFT
+        ).values(
+            status=OutboxStatus.READY,
+            updated_at=datetime.utcnow()
+        ).returning(OutboxEmail.id)
+    ).scalars().all()
+    db.commit()
+
+    for outbox_id in ready_ids:
+        enqueue(OUTBOX_QUEUE_NAME, process_outbox_email, outbox_id)
+
+    return {
+        # No outbox row carries the id of an empty job
+        "job_id": job_id if to_dispatch else None,
+        "queued": len(to_dispatch),
+        "skipped": skipped
+    }
+
+
+def get_job_progress(
+    db: Session,
+    user_id: int,
+    job_id: str,
+    campaign_id: Optional[int] = None
+) -> Optional[Dict[str, Any]]:
+    """
+    Count outbox emails of a job by status.
+
+    Returns:
+        Dictionary with total + one counter per status, or None if the job
+        doesn't exist for this user
+    """
+    query = db.query(
+        OutboxEmail.status,
+        func.count(OutboxEmail.id)
+    ).filter(
+        OutboxEmail.job_id == job_id,
+        OutboxEmail.user_id == user_id
+    )
+
+    if campaign_id is not None:
+        query = query.filter(OutboxEmail.campaign_id == campaign_id)
+
+    rows = query.group_by(OutboxEmail.status).all()
+
+    if not rows:
+        return None
+
+    counts = {status.value: 0 for status in OutboxStatus}
+    for outbox_status, count in rows:
+        counts[outbox_status.value] = count
+
+    total = sum(counts.values())
+    finished = counts[OutboxStatus.SENT.value] + counts[OutboxStatus.FAILED.value]
+
+    return {
+        "job_id": job_id,
+        "total": total,
+        **counts,
+        "done": finished == total
+    }
@@ -0,0 +1,282 @@
+"""
+Follow-up scheduler - queues scheduled follow-ups in the outbox when they are due.
+
+Follow-ups due within SCHEDULER_LOOKAHEAD are kept in a heap ordered by
+next_follow_up_scheduled_at. The scheduler sleeps until the first one is
+due, then hands every due contact to the outbox workers (one outbox job per
+campaign), which send them in parallel.
+
+The heap is loaded with ONE query over all users and campaigns, served by
+the partial index ix_campaign_contacts_followup_due, and reloaded every
+SCHEDULER_REFRESH_INTERVAL so follow-ups scheduled, moved or cancelled from
+the API are picked up. Each reload also requeues the outbox emails left
+behind by dead workers or lost jobs (see worker.requeue_stale_outbox_emails),
+does the same for the import jobs (see imports/jobs.requeue_stale_import_jobs)
+and compacts the campaign stats deltas (see services/campaign_stats.py).
+
+The scheduled date is cleared by the outbox worker once the follow-up is
+sent: a follow-up whose email ends 'failed' stays scheduled (and overdue).
+It is not queued again until it is rescheduled, the outbox already
+retried it.
+
+Run the daemon:
+    python -m app.services.outbox.scheduler
+Or a single pass (cron):
+    python -m app.services.outbox.scheduler --once
+"""
+from collections import defaultdict
+from datetime import datetime, timedelta
+from typing import Dict, List, Tuple
+import argparse
+import heapq
+import logging
+import time
+
+from sqlalchemy import String, and_, cast, exists, or_
+from sqlalchemy.orm import Session
+
+from app.core.config import SCHEDULER_LOOKAHEAD, SCHEDULER_REFRESH_INTERVAL
+from app.db import SessionLocal
+from app.models.campaign import Campaign, CampaignContact
+from app.models.outbox import OutboxEmail, OutboxStatus
+from app.models.user import User
+from app.services.campaign_stats import compact_campaign_stats
+from app.services.imports.jobs import requeue_stale_import_jobs
+from app.services.task_queue import wait_for_local_tasks
+from app.services.outbox.outbox_service import enqueue_campaign_emails
+from app.services.outbox.worker import requeue_stale_outbox_emails
+
+logger = logging.getLogger(__name__)
+
+# (due_at, campaign_contact_id, campaign_id)
+DueFollowUp = Tuple[datetime, int, int]
+
+
+def load_due_followups(db: Session, until: datetime) -> List[DueFollowUp]:
+    """
+    Get every follow-up due before `until`, across all users and campaigns.
+
+    Skipped: users without a connected mailbox, and contacts whose email
+    for the current step is already in the outbox (waiting / being sent,
+    or failed since the follow-up was due).
+
+    Args:
+        db: Database session
+        until: Upper bound of next_follow_up_scheduled_at
+
+    Returns:
+        Heap of (due_at, campaign_contact_id, campaign_id), earliest first
+    """
+    # Same key as the outbox idempotency_key: "<campaign_contact_id>:<sequence_step>"
+    outbox_key = (
+        cast(CampaignContact.id, String) + ":" + cast(CampaignContact.email_sequence_step, String)
+    )
+    in_outbox = exists().where(
+        OutboxEmail.idempotency_key == outbox_key,
+        or_(
+            OutboxEmail.status.in_([OutboxStatus.DRAFT, OutboxStatus.READY, OutboxStatus.SENDING]),
+            and_(
+                OutboxEmail.status == OutboxStatus.FAILED,
+                OutboxEmail.updated_at >= CampaignContact.next_follow_up_scheduled_at
+            )
+        )
+    )
+
+    rows = db.query(
+        CampaignContact.next_follow_up_scheduled_at,
+        CampaignContact.id,
+        CampaignContact.campaign_id
+    ).join(
+        Campaign, Campaign.id == CampaignContact.campaign_id
+    ).join(
+        User, User.id == Campaign.user_id
+    ).filter(
+        CampaignContact.status == "contacted",
+        CampaignContact.next_follow_up_scheduled_at.isnot(None),
+        CampaignContact.next_follow_up_scheduled_at <= until,
+        or_(User.gmail_connected.is_(True), User.outlook_connected.is_(True)),
+        ~in_outbox
+    ).all()
+
+    heap = [(due_at, contact_id, campaign_id) for due_at, contact_id, campaign_id in rows]
+    heapq.heapify(heap)
+    return heap
+
+
+def dispatch_due_followups(db: Session, due: List[DueFollowUp]) -> Dict[str, int]:
+    """
+    Queue the due follow-ups in the outbox, one job per campaign.
+
+    Contacts are checked again and locked (FOR UPDATE SKIP LOCKED): a
+    follow-up cancelled or moved since it was loaded is not sent, and two
+    schedulers never queue the same contact. The scheduled date is kept:
+    the worker clears it once the email is sent.
+
+    Args:
+        db: Database session
+        due: Entries popped from the heap
+
+    Returns:
+        Dictionary with queued, skipped (already queued / user without
+        mailbox) and ignored (no longer due) counts
+    """
+    contact_ids_by_campaign: Dict[int, List[int]] = defaultdict(list)
+    for _, contact_id, campaign_id in due:
+        contact_ids_by_campaign[campaign_id].append(contact_id)
+
+    queued = 0
+    skipped = 0
+    ignored = 0
+    now = datetime.utcnow()
+
+    for campaign_id, contact_ids in contact_ids_by_campaign.items():
+        contacts = db.query(CampaignContact).filter(
+            CampaignContact.id.in_(contact_ids),
+            CampaignContact.status == "contacted",
+            CampaignContact.next_follow_up_scheduled_at <= now
+        ).with_for_update(skip_locked=True).all()
+
+        ignored += len(contact_ids) - len(contacts)
+
+        if not contacts:
+            db.rollback()
+            continue
+
+        campaign = db.get(Campaign, campaign_id)
+        user = db.get(User, campaign.user_id)
+
+        if not user.has_email_configured:
+            # Stays scheduled: goes out once the user reconnects a mailbox
+            logger.warning(
+                "Skipping %s follow-ups of campaign %s: user %s has no email configured",
+                len(contacts), campaign_id, user.id
+            )
+            skipped += len(contacts)
+            db.rollback()
+            continue
+
+        # Commits the outbox rows (and releases the locks)
+        result = enqueue_campaign_emails(db, campaign, contacts, user)
+        queued += result["queued"]
+        skipped += result["skipped"]
+
+        logger.info(
+            "Campaign %s: %s follow-ups queued (job %s)",
+            campaign_id, result["queued"], result["job_id"]
+        )
+
+    return {"queued": queued, "skipped": skipped, "ignored": ignored}
+
+
+class FollowUpScheduler:
+    """
+    Timer queue of upcoming follow-ups.
+    """
+
+    def __init__(self):
+        self.heap: List[DueFollowUp] = []
+        self.next_reload = 0.0  # time.monotonic() of the next reload
+
+    def reload(self, db: Session) -> None:
+        """Reload the follow-ups due within the lookahead window."""
+        until = datetime.utcnow() + timedelta(seconds=SCHEDULER_LOOKAHEAD)
+        self.heap = load_due_followups(db, until)
+        self.next_reload = time.monotonic() + SCHEDULER_REFRESH_INTERVAL
+
+    def pop_due(self, now: datetime) -> List[DueFollowUp]:
+        """Remove and return every follow-up due at `now`."""
+        due = []
+        while self.heap and self.heap[0][0] <= now:
+            due.append(heapq.heappop(self.heap))
+        return due
+
+    def seconds_until_next(self, now: datetime) -> float:
+        """Time to sleep: until the next follow-up is due, or the next reload."""
+        wait = self.next_reload - time.monotonic()
+        if self.heap:
+            wait = min(wait, (self.heap[0][0] - now).total_seconds())
+        return max(wait, 0.0)
+
+    def tick(self) -> float:
+        """
+        Reload if needed, dispatch what is due.
+
+        Returns:
+            Seconds to sleep before the next tick
+        """
+        db = SessionLocal()
+
+        try:
+            if time.monotonic() >= self.next_reload:
+                self.reload(db)
+                requeue_stale_outbox_emails(db)
+                requeue_stale_import_jobs(db)
+                compact_campaign_stats(db)
+
+            due = self.pop_due(datetime.utcnow())
+            if due:
+                dispatch_due_followups(db, due)
+
+            return self.seconds_until_next(datetime.utcnow())
+        finally:
+            db.close()
+
+    def run_forever(self) -> None:
+        """Daemon loop: wake up exactly when the next follow-up is due."""
+        logger.info(
+            "Follow-up scheduler started (lookahead %ss, reload every %ss)",
+            SCHEDULER_LOOKAHEAD, SCHEDULER_REFRESH_INTERVAL
+        )
+
+        while True:
+            try:
+                wait = self.tick()
+            except Exception:
+                logger.exception("Follow-up scheduler tick failed")
+                self.next_reload = 0.0
+                wait = SCHEDULER_REFRESH_INTERVAL
+
+            time.sleep(wait)
+
+
+def run_once() -> Dict[str, int]:
+    """
+    Requeue stale outbox emails and import jobs, compact the campaign
+    stats, queue every follow-up due now, then return.
+
+    Without REDIS_URL, waits for the in-process workers to run them.
+    """
+    db = SessionLocal()
+
+    try:
+        requeue_stale_outbox_emails(db)
+        requeue_stale_import_jobs(db)
+        compact_campaign_stats(db)
+        due = load_due_followups(db, datetime.utcnow())
+        result = dispatch_due_followups(db, due) if due else {"queued": 0, "skipped": 0, "ignored": 0}
+    finally:
+        db.close()
+
+    wait_for_local_tasks()
+    return result
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Send scheduled follow-ups when they are due.")
+    parser.add_argument("--once", action="store_true", help="Queue the follow-ups due now and exit (cron)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format="%(asctime)s %(levelname)s %(name)s: %(message)s")
+
+    if args.once:
+        result = run_once()
+        logger.info(
+            "%s follow-ups queued, %s skipped, %s no longer due",
+            result["queued"], result["skipped"], result["ignored"]
+        )
+    else:
+        FollowUpScheduler().run_forever()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,216 @@
+"""
+Outbox worker - sends one outbox email.
+
+Run RQ workers with (the scheduler runs delayed retries):
+    rq worker outbox --with-scheduler --url $REDIS_URL
+Without REDIS_URL, jobs run on an in-process thread pool instead.
+
+Emails left behind by a dead worker ('sending' for too long), by a lost
+job ('ready' for too long, e.g. in-process queue lost on restart) or by a
+bulk request that died before publishing them ('draft') are picked up by
+requeue_stale_outbox_emails, run by the follow-up scheduler.
+"""
+from datetime import datetime, timedelta
+from typing import Dict
+import logging
+
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+from app.core.config import (
+    OUTBOX_QUEUE_NAME,
+    OUTBOX_MAX_ATTEMPTS,
+    OUTBOX_RETRY_DELAY,
+    OUTBOX_SENDING_TIMEOUT,
+    OUTBOX_STALE_AFTER,
+)
+from app.db import SessionLocal
+from app.models.campaign import Campaign
+from app.models.outbox import OutboxEmail, OutboxStatus
+from app.models.prospect import Prospect
+from app.models.user import User
+from app.services.task_queue import enqueue
+from app.services.email.email_service import EmailService
+
+logger = logging.getLogger(__name__)
+
+
+def process_outbox_email(outbox_id: int) -> None:
+    """
+    Send an outbox email and record the result.
+
+    The row is claimed with a conditional UPDATE (ready -> sending) so two
+    workers can never send the same email. On failure the email goes back
+    to 'ready' and is retried with exponential backoff until
+    OUTBOX_MAX_ATTEMPTS is reached, then it is 'failed'.
+
+    Args:
+        outbox_id: ID of the OutboxEmail to send
+    """
+    db = SessionLocal()
+
+    try:
+        # STEP 1: Claim the email
+        claimed = db.query(OutboxEmail).filter(
+            OutboxEmail.id == outbox_id,
+            OutboxEmail.status == OutboxStatus.READY
+        ).update(
+            {
+                OutboxEmail.status: OutboxStatus.SENDING,
+                OutboxEmail.attempts: OutboxEmail.attempts + 1,
+                OutboxEmail.updated_at: datetime.utcnow(),
+            },
+            synchronize_session=False
+        )
+        db.commit()
+
+        if not claimed:
+            # Already taken by another worker (or no longer ready)
+            return
+
+        outbox = db.get(OutboxEmail, outbox_id)
+        contact = outbox.contact
+
+        # STEP 2: The contact moved on since the email was queued (sent manually)
+        if contact.email_sequence_step != outbox.sequence_step:
+            outbox.status = OutboxStatus.FAILED
+            outbox.last_error = (
+                f"Contact is at step {contact.email_sequence_step}, "
+                f"email was queued for step {outbox.sequence_step}"
+            )
+            db.commit()
+            return
+
+        campaign = db.get(Campaign, outbox.campaign_id)
+        user = db.get(User, outbox.user_id)
+        prospect = db.get(Prospect, contact.prospect_id)
+
+        # STEP 3: Send + mark as sent in the same transaction
+        try:
+            if not prospect:
+                raise Exception("Prospect not found")
+
+            result = EmailService(db).send_campaign_email(
+                campaign=campaign,
+                contact=contact,
+                prospect=prospect,
+                user=user,
+                template_override=outbox.template_override,
+                commit=False
+            )
+        except Exception as e:
+            db.rollback()
+            _record_failure(db, outbox_id, str(e))
+            return
+
+        outbox.status = OutboxStatus.SENT
+        outbox.provider_message_id = result["message_id"] or None
+        outbox.sent_at = contact.last_email_sent_at
+        outbox.last_error = None
+
+        # A due follow-up went out (the scheduler leaves the date until then)
+        due_at = contact.next_follow_up_scheduled_at
+        if due_at is not None and due_at <= outbox.sent_at:
+            contact.next_follow_up_scheduled_at = None
+
+        db.commit()
+
+    finally:
+        db.close()
+
+
+def _record_failure(db, outbox_id: int, error: str) -> None:
+    """Retry the email later, or mark it failed after the last attempt."""
+    outbox = db.get(OutboxEmail, outbox_id)
+    outbox.last_error = error[:2000]
+
+    if outbox.attempts < OUTBOX_MAX_ATTEMPTS:
+        outbox.status = OutboxStatus.READY
+        db.commit()
+        enqueue(OUTBOX_QUEUE_NAME, process_outbox_email, outbox_id, delay=retry_delay(outbox.attempts))
+    else:
+        outbox.status = OutboxStatus.FAILED
+        db.commit()
+        logger.warning("Outbox email %s failed after %s attempts: %s", outbox_id, outbox.attempts, error)
+
+
+def retry_delay(attempts: int) -> int:
+    """Seconds before the next attempt: OUTBOX_RETRY_DELAY, doubled at each failed attempt."""
+    return OUTBOX_RETRY_DELAY * 2 ** max(attempts - 1, 0)
+
+
+def requeue_stale_outbox_emails(db: Session) -> Dict[str, int]:
+    """
+    Recover emails no worker is taking care of any more.
+
+    - 'sending' for OUTBOX_SENDING_TIMEOUT: the worker died mid-send (the
+      contact update was never committed). Retried like a failed attempt,
+      or 'failed' if it was the last one.
+    - 'ready' for OUTBOX_STALE_AFTER: its job was lost. Enqueued again;
+      a duplicate job is harmless, the claim lets only one through.
+    - 'draft' for OUTBOX_STALE_AFTER: the bulk request died before
+      publishing it. Made ready and enqueued.
+
+    Each row is taken with a conditional UPDATE: concurrent sweeps and
+    workers don't step on each other.
+
+    Args:
+        db: Database session (committed here)
+
+    Returns:
+        Dictionary with requeued and failed counts
+    """
+    now = datetime.utcnow()
+    stuck = now - timedelta(seconds=OUTBOX_SENDING_TIMEOUT)
+    error = f"Worker stopped while sending (no result after {OUTBOX_SENDING_TIMEOUT}s)"
+
+    # STEP 1: Dead worker, last attempt
+    failed = db.query(OutboxEmail).filter(
+        OutboxEmail.status == OutboxStatus.SENDING,
+        OutboxEmail.updated_at < stuck,
+        OutboxEmail.attempts >= OUTBOX_MAX_ATTEMPTS
+    ).update(
+        {
+            OutboxEmail.status: OutboxStatus.FAILED,
+            OutboxEmail.last_error: error,
+            OutboxEmail.updated_at: now,
+        },
+        synchronize_session=False
+    )
+
+    # STEP 2: Dead worker, attempts left
+    retried = db.execute(
+        update(OutboxEmail).where(
+            OutboxEmail.status == OutboxStatus.SENDING,
+            OutboxEmail.updated_at < stuck
+        ).values(
+            status=OutboxStatus.READY,
+            last_error=error,
+            updated_at=now
+        ).returning(OutboxEmail.id)
+    ).scalars().all()
+
+    # STEP 3: Ready without job, or never published (touched, so they are
+    # not enqueued again next sweep)
+    lost = db.execute(
+        update(OutboxEmail).where(
+            OutboxEmail.status.in_([OutboxStatus.DRAFT, OutboxStatus.READY]),
+            OutboxEmail.updated_at < now - timedelta(seconds=OUTBOX_STALE_AFTER)
+        ).values(
+            status=OutboxStatus.READY,
+            updated_at=now
+        ).returning(OutboxEmail.id)
+    ).scalars().all()
+
+    db.commit()
+
+    for outbox_id in [*retried, *lost]:
+        enqueue(OUTBOX_QUEUE_NAME, process_outbox_email, outbox_id)
+
+    if failed or retried or lost:
+        logger.warning(
+            "Stale outbox emails: %s requeued after a dead worker, %s failed, %s lost jobs requeued",
+            len(retried), failed, len(lost)
+        )
+
+    return {"requeued": len(retried) + len(lost), "failed": failed}
@@ -0,0 +1,127 @@
+"""
+Background task queue.
+Uses RQ + Redis when REDIS_URL is set, otherwise runs tasks on an
+in-process thread pool (dev & tests).
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from typing import Callable, Dict, Optional, Set
+import logging
+import threading
+
+from app.core.config import REDIS_URL, IN_PROCESS_WORKERS
+
+logger = logging.getLogger(__name__)
+
+_rq_queues: Dict[str, object] = {}
+_executors: Dict[str, ThreadPoolExecutor] = {}
+_timers: Set[threading.Timer] = set()  # delayed in-process tasks not started yet
+_lock = threading.Lock()
+
+
+def _get_rq_queue(queue_name: str):
+    """Return (and memoize) the RQ queue for this name."""
+    with _lock:
+        queue = _rq_queues.get(queue_name)
+        if queue is None:
+            from redis import Redis
+            from rq import Queue
+
+            queue = Queue(queue_name, connection=Redis.from_url(REDIS_URL))
+            _rq_queues[queue_name] = queue
+        return queue
+
+
+def _get_executor(queue_name: str) -> ThreadPoolExecutor:
+    """Return (and memoize) the in-process pool for this queue name."""
+    with _lock:
+        executor = _executors.get(queue_name)
+        if executor is None:
+            executor = ThreadPoolExecutor(
+                max_workers=IN_PROCESS_WORKERS,
+                thread_name_prefix=f"{queue_name}-worker",
+            )
+            _executors[queue_name] = executor
+        return executor
+
+
+def _run_logged(func: Callable, *args, **kwargs) -> None:
+    """Run a task, logging instead of swallowing exceptions silently."""
+    try:
+        func(*args, **kwargs)
+    except Exception:
+        logger.exception("Background task %s failed", getattr(func, "__name__", func))
+
+
+def uses_redis() -> bool:
+    """True if tasks go to RQ workers, False if they run in this process."""
+    return bool(REDIS_URL)
+
+
+def enqueue(
+    queue_name: str,
+    func: Callable,
+    *args,
+    delay: Optional[float] = None,
+    job_timeout: Optional[int] = None,
+    **kwargs
+) -> None:
+    """
+    Enqueue a task.
+
+    Args:
+        queue_name: Queue to use (one RQ queue / one local pool per name)
+        func: Module-level function (RQ imports it by dotted path)
+        *args, **kwargs: Arguments for func (must be serializable for RQ)
+        delay: Seconds to wait before the task can start (RQ workers must
+               run with --with-scheduler)
+        job_timeout: Seconds before RQ kills the task (default: RQ's 180s).
+                     Not enforced in-process.
+    """
+    if uses_redis():
+        queue = _get_rq_queue(queue_name)
+        if delay:
+            queue.enqueue_in(timedelta(seconds=delay), func, *args, job_timeout=job_timeout, **kwargs)
+        else:
+            queue.enqueue(func, *args, job_timeout=job_timeout, **kwargs)
+    elif delay:
+        timer = threading.Timer(delay, _enqueue_delayed, (queue_name, func, args, kwargs))
+        timer.daemon = True
+        with _lock:
+            _timers.add(timer)
+        timer.start()
+    else:
+        _get_executor(queue_name).submit(_run_logged, func, *args, **kwargs)
+
+
+def _enqueue_delayed(queue_name: str, func: Callable, args: tuple, kwargs: dict) -> None:
+    """Timer callback: hand a delayed task to its pool."""
+    try:
+        _get_executor(queue_name).submit(_run_logged, func, *args, **kwargs)
+    finally:
+        with _lock:
+            _timers.discard(threading.current_thread())
+
+
+def wait_for_local_tasks() -> None:
+    """
+    Wait until every in-process task is done (no-op with RQ).
+
+    Used by one-shot commands, which must not exit before the tasks they
+    enqueued ran. Tasks enqueued while waiting (retries, delayed or not)
+    are waited for too.
+    """
+    while True:
+        with _lock:
+            timers = list(_timers)
+            executors = list(_executors.values())
+            _executors.clear()
+
+        if not timers and not executors:
+            return
+
+        for timer in timers:
+            timer.join()
+
+        for executor in executors:
+            executor.shutdown(wait=True)
@@ -0,0 +1,57 @@
+"""
+Benchmark email template rendering (renders per second).
+
+Usage (from backend/):
+    python bench_render.py [number_of_contacts] [template]
+"""
+import sys
+import time
+
+from app.services.email.template_renderer import EmailTemplateRenderer
+
+count = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+template_name = sys.argv[2] if len(sys.argv) > 2 else "initial.html"
+
+campaign_ctx = {
+    "campaign_name": "Show Chefs LA 2026",
+    "campaign_location": "Los Angeles",
+    "sender_name": "Jane Smith",
+    "distributor_name": "Spine Distribution",
+}
+contacts = [
+    {
+        "first_name": f"First{i}",
+        "last_name": f"Last{i}",
+        "company_name": f"Company {i}",
+    }
+    for i in range(count)
+]
+
+
+def bench(label, render):
+    start = time.perf_counter()
+    render()
+    elapsed = time.perf_counter() - start
+    print(f"   - {label:<32} {count / elapsed:>10,.0f} renders/s  ({elapsed:.3f}s)")
+
+
+dev_renderer = EmailTemplateRenderer(production=False)
+prod_renderer = EmailTemplateRenderer(production=True)
+
+# Warm up: compile the template once in each environment
+dev_renderer.render_campaign_batch(template_name, campaign_ctx, contacts[:1])
+prod_renderer.render_campaign_batch(template_name, campaign_ctx, contacts[:1])
+
+print(f"📊 Rendering campaigns/{template_name} for {count:,} contacts:")
+
+bench("one by one, auto-reload", lambda: [
+    dev_renderer.render(f"campaigns/{template_name}", {**campaign_ctx, **contact})
+    for contact in contacts
+])
+bench("one by one, production", lambda: [
+    prod_renderer.render(f"campaigns/{template_name}", {**campaign_ctx, **contact})
+    for contact in contacts
+])
+bench("render_batch, production", lambda: prod_renderer.render_campaign_batch(
+    template_name, campaign_ctx, contacts
+))
@@ -0,0 +1,117 @@
+"""
+Shared test fixtures.
+
+Database tests run against PostgreSQL (partial indexes, ON CONFLICT, the
+campaign_stats trigger), on a schema built by the Alembic migrations. Point
+TEST_DATABASE_URL to an empty database, e.g.:
+
+    TEST_DATABASE_URL=postgresql+psycopg://postgres@localhost/spine_test pytest
+
+Without it, the database tests are skipped.
+"""
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, List, Set, Tuple
+import json
+import os
+
+import pytest
+
+TEST_DATABASE_URL = os.getenv("TEST_DATABASE_URL")
+
+# app.db reads DATABASE_URL at import: never let tests reach another database
+os.environ["DATABASE_URL"] = TEST_DATABASE_URL or "sqlite://"
+
+from alembic import command  # noqa: E402
+from alembic.config import Config  # noqa: E402
+from sqlalchemy import event  # noqa: E402
+from sqlalchemy.engine import Connection, Engine  # noqa: E402
+from sqlalchemy.orm import Session  # noqa: E402
+
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (SQL, parameters) as sent to the driver
+Statement = Tuple[str, Any]
+
+
+@pytest.fixture(scope="session")
+def engine() -> Engine:
+    """Engine of the app, on the migrated test database."""
+    if not TEST_DATABASE_URL:
+        pytest.skip("TEST_DATABASE_URL is not set")
+
+    import app.main  # noqa: F401  (registers every model and module)
+    from app.db import engine
+
+    if engine.dialect.name != "postgresql":
+        pytest.skip("TEST_DATABASE_URL must point to PostgreSQL")
+
+    config = Config(os.path.join(BACKEND_DIR, "alembic.ini"))
+    config.set_main_option("script_location", os.path.join(BACKEND_DIR, "alembic"))
+    command.upgrade(config, "head")
+
+    return engine
+
+
+@pytest.fixture
+def connection(engine: Engine) -> Iterator[Connection]:
+    """Connection inside a transaction rolled back after the test."""
+    with engine.connect() as connection:
+        transaction = connection.begin()
+        try:
+            yield connection
+        finally:
+            transaction.rollback()
+
+
+@pytest.fixture
+def db(connection: Connection) -> Iterator[Session]:
+    """Session whose commits stay inside the test transaction."""
+    session = Session(bind=connection, join_transaction_mode="create_savepoint", autoflush=False)
+    try:
+        yield session
+    finally:
+        session.close()
+
+
+@contextmanager
+def recorded_statements(engine: Engine) -> Iterator[List[Statement]]:
+    """Record every statement the engine runs in the block (savepoints excluded)."""
+    statements: List[Statement] = []
+
+    def record(conn, cursor, statement, parameters, context, executemany):
+        if not statement.lstrip().upper().startswith(("SAVEPOINT", "RELEASE SAVEPOINT", "ROLLBACK TO SAVEPOINT")):
+            statements.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        yield statements
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+
+@pytest.fixture
+def count_queries(engine: Engine) -> Callable[..., int]:
+    """count_queries(func, *args, **kwargs): number of statements the call runs."""
+    def count(func: Callable, *args: Any, **kwargs: Any) -> int:
+        with recorded_statements(engine) as statements:
+            func(*args, **kwargs)
+        return len(statements)
+
+    return count
+
+
+def explain(connection: Connection, statement: Statement) -> Dict[str, Any]:
+    """PostgreSQL plan (EXPLAIN FORMAT JSON) of a recorded statement."""
+    sql, parameters = statement
+    plan = connection.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {sql}", parameters).scalar()
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return plan[0]["Plan"]
+
+
+def plan_indexes(plan: Dict[str, Any]) -> Set[str]:
+    """Every index a plan reads."""
+    indexes = {plan["Index Name"]} if "Index Name" in plan else set()
+    for child in plan.get("Plans", []):
+        indexes |= plan_indexes(child)
+    return indexes
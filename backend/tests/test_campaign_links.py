@@ -0,0 +1,104 @@
+"""
+NDJSON linking of prospects to a campaign: chunks are committed as they
+come, an error reports what was linked before it.
+"""
+import asyncio
+from datetime import date
+
+import pytest
+from fastapi import HTTPException
+
+from app.models.campaign import Campaign, CampaignContact
+from app.models.prospect import Prospect, ProspectSource
+from app.models.user import User
+from app.routes import campaigns
+from app.services.campaign_links import iter_ndjson_ids
+
+
+class NDJSONRequest:
+    """Stands for the Request of the route: only stream() is read."""
+
+    def __init__(self, body: bytes):
+        self.body = body
+
+    async def stream(self):
+        for line in self.body.splitlines(keepends=True):
+            yield line
+
+
+@pytest.fixture
+def setup(db, monkeypatch):
+    monkeypatch.setattr(campaigns, "CAMPAIGN_LINK_CHUNK_SIZE", 2)
+    monkeypatch.setattr(campaigns, "CAMPAIGN_LINK_MAX_IDS", 5)
+
+    user = User(email="owner@links.test")
+    db.add(user)
+    db.flush()
+    campaign = Campaign(user_id=user.id, name="Show", event_date=date(2026, 1, 1))
+    prospects = [
+        Prospect(user_id=user.id, first_name="P", last_name=str(i), email=f"p{i}@links.test", source=ProspectSource.other)
+        for i in range(6)
+    ]
+    db.add_all([campaign, *prospects])
+    db.flush()
+    return user, campaign, [prospect.id for prospect in prospects]
+
+
+def link(db, user, campaign, body: bytes):
+    return asyncio.run(campaigns._link_ndjson(
+        NDJSONRequest(body), db, campaign.id, user, "prospects", "prospect_id", "contacts"
+    ))
+
+
+def linked(db, campaign):
+    db.expire_all()
+    return db.query(CampaignContact).filter(CampaignContact.campaign_id == campaign.id).count()
+
+
+def test_link_ndjson(db, setup):
+    user, campaign, ids = setup
+
+    result = link(db, user, campaign, b"%d\n{\"prospect_id\": %d}\n%d\n%d\n" % (ids[0], ids[1], ids[2], ids[0]))
+
+    assert result["added"] == ids[:3]
+    assert result["skipped"] == [ids[0]]
+    assert linked(db, campaign) == 3
+
+
+def test_invalid_line_keeps_previous_ids(db, setup):
+    user, campaign, ids = setup
+
+    with pytest.raises(HTTPException) as error:
+        link(db, user, campaign, b"%d\n%d\n%d\nnope\n%d\n" % (ids[0], ids[1], ids[2], ids[3]))
+
+    assert error.value.status_code == 400
+    assert error.value.detail["error"] == "Line 4: expected an id or {\"prospect_id\": id}"
+    assert error.value.detail["added"] == ids[:3]
+    assert linked(db, campaign) == 3
+
+
+def test_too_many_ids(db, setup):
+    user, campaign, ids = setup
+
+    with pytest.raises(HTTPException) as error:
+        link(db, user, campaign, b"\n".join(b"%d" % item_id for item_id in ids))
+
+    assert error.value.status_code == 413
+    assert error.value.detail["added"] == ids[:5]
+    assert linked(db, campaign) == 5
+
+
+def test_line_without_end_is_not_buffered():
+    received = []
+
+    async def endless_line():
+        while True:
+            received.append(1)
+            yield b"1" * 1024
+
+    async def read_ids():
+        return [item_id async for item_id in iter_ndjson_ids(endless_line(), "prospect_id")]
+
+    with pytest.raises(ValueError, match="Line 1: longer than 64 bytes"):
+        asyncio.run(read_ids())
+    assert len(received) == 1
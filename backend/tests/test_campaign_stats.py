@@ -0,0 +1,158 @@
+"""
+Campaign stats counters (PostgreSQL triggers + compaction): same numbers as
+the aggregate over campaign_contacts, and no lock shared by concurrent senders.
+"""
+from datetime import date, datetime, timedelta
+import asyncio
+
+import pytest
+from sqlalchemy import delete, insert, text, update
+from sqlalchemy.orm import Session
+
+from app.models.campaign import Campaign, CampaignContact
+from app.models.campaign_stats import CampaignStat, CampaignStatDelta
+from app.models.prospect import Prospect, ProspectSource
+from app.models.user import User
+from app.services import campaign_stats
+from app.services.campaign_stats import (
+    aggregate_contact_stats,
+    compact_campaign_stats,
+    compact_campaign_stats_periodically,
+    contacts_by_status,
+    get_contact_stats,
+)
+
+
+def add_campaign(db, contacts: int):
+    user = User(email=f"owner{datetime.utcnow().timestamp()}@stats.test")
+    db.add(user)
+    db.flush()
+    campaign = Campaign(user_id=user.id, name="Show", event_date=date(2026, 1, 1))
+    db.add(campaign)
+    db.flush()
+
+    prospect_ids = db.execute(insert(Prospect).returning(Prospect.id), [
+        {"user_id": user.id, "first_name": "P", "last_name": str(i), "email": f"p{i}-{campaign.id}@stats.test",
+         "source": ProspectSource.other, "created_at": datetime.utcnow(), "updated_at": datetime.utcnow()}
+        for i in range(contacts)
+    ]).scalars().all()
+    db.execute(insert(CampaignContact), [
+        {"campaign_id": campaign.id, "prospect_id": prospect_id, "status": "pending",
+         "email_sequence_step": 0, "added_at": datetime.utcnow()}
+        for prospect_id in prospect_ids
+    ])
+    return campaign
+
+
+def expected_stats(db, campaign_id):
+    by_status = {row[0]: row[1] for row in aggregate_contact_stats(db, campaign_id) if row[1]}
+    return by_status, sum(row[2] for row in aggregate_contact_stats(db, campaign_id))
+
+
+def test_counters_follow_contacts(db):
+    campaign = add_campaign(db, 10)
+    sent_at = datetime.utcnow()
+
+    # Sends, a status change, a removal
+    db.execute(update(CampaignContact).where(
+        CampaignContact.campaign_id == campaign.id,
+        CampaignContact.prospect_id.in_(
+            db.query(CampaignContact.prospect_id).filter(CampaignContact.campaign_id == campaign.id).limit(6)
+        )
+    ).values(status="contacted", email_sequence_step=CampaignContact.email_sequence_step + 1, last_email_sent_at=sent_at))
+    contact = db.query(CampaignContact).filter_by(campaign_id=campaign.id, status="contacted").first()
+    contact.status = "replied"
+    contact.email_sequence_step = 2
+    db.flush()
+    db.delete(db.query(CampaignContact).filter_by(campaign_id=campaign.id, status="pending").first())
+    db.flush()
+
+    by_status, emails_sent = expected_stats(db, campaign.id)
+    assert by_status == {"pending": 3, "contacted": 5, "replied": 1}
+
+    for compacted in (False, True):
+        if compacted:
+            compact_campaign_stats(db)
+            assert db.query(CampaignStatDelta).filter_by(campaign_id=campaign.id).count() == 0
+            assert db.query(CampaignStat).filter_by(campaign_id=campaign.id).count() == 3
+
+        stats = get_contact_stats(db, campaign.id)
+        assert stats["by_status"] == by_status
+        assert stats["total"] == 9
+        assert stats["total_emails_sent"] == emails_sent == 7
+        assert contacts_by_status(db, [campaign.id]) == {campaign.id: by_status}
+
+
+def test_last_email_sent_at_ignores_removed_contacts(db):
+    campaign = add_campaign(db, 2)
+    first, second = db.query(CampaignContact).filter_by(campaign_id=campaign.id).order_by(CampaignContact.id).all()
+    first.last_email_sent_at = datetime(2026, 1, 1)
+    second.last_email_sent_at = datetime(2026, 2, 1)
+    db.flush()
+    assert get_contact_stats(db, campaign.id)["last_email_sent_at"] == datetime(2026, 2, 1)
+
+    db.delete(second)
+    db.flush()
+    assert get_contact_stats(db, campaign.id)["last_email_sent_at"] == datetime(2026, 1, 1)
+
+
+@pytest.fixture
+def committed_campaign(engine):
+    """Campaign with 2 pending contacts, committed (seen by other connections), removed afterwards."""
+    with Session(engine) as db:
+        campaign = add_campaign(db, 2)
+        db.commit()
+        campaign_id, user_id = campaign.id, campaign.user_id
+        contact_ids = [row for (row,) in db.query(CampaignContact.id).filter_by(campaign_id=campaign_id)]
+
+    yield campaign_id, contact_ids
+
+    with Session(engine) as db:
+        db.execute(delete(CampaignContact).where(CampaignContact.campaign_id == campaign_id))
+        db.execute(delete(Campaign).where(Campaign.id == campaign_id))
+        db.execute(delete(User).where(User.id == user_id))
+        db.commit()
+
+
+def test_concurrent_sends_do_not_wait_on_each_other(engine, committed_campaign):
+    campaign_id, (first_id, second_id) = committed_campaign
+    sent_at = datetime.utcnow() - timedelta(minutes=1)
+
+    def send(connection, contact_id):
+        connection.execute(update(CampaignContact).where(CampaignContact.id == contact_id).values(
+            status="contacted", email_sequence_step=1, last_email_sent_at=sent_at
+        ))
+
+    with engine.connect() as first, engine.connect() as second:
+        # Both transactions stay open: the second one must not wait for the first
+        send(first, first_id)
+        second.execute(text("SET LOCAL lock_timeout = '2s'"))
+        send(second, second_id)
+        second.commit()
+        first.commit()
+
+    with Session(engine) as db:
+        stats = get_contact_stats(db, campaign_id)
+        assert stats["by_status"] == {"contacted": 2}
+        assert stats["total_emails_sent"] == 2
+        assert stats["last_email_sent_at"] == sent_at
+
+
+def test_api_compacts_periodically(db, connection, monkeypatch):
+    monkeypatch.setattr(
+        campaign_stats, "SessionLocal",
+        lambda: Session(bind=connection, join_transaction_mode="create_savepoint")
+    )
+    campaign = add_campaign(db, 5)
+    db.commit()
+    assert db.query(CampaignStatDelta).filter_by(campaign_id=campaign.id).count() > 0
+
+    async def run_for_a_while():
+        task = asyncio.create_task(compact_campaign_stats_periodically(interval=0.01))
+        await asyncio.sleep(0.2)
+        task.cancel()
+
+    asyncio.run(run_for_a_while())
+
+    assert db.query(CampaignStatDelta).filter_by(campaign_id=campaign.id).count() == 0
+    assert get_contact_stats(db, campaign.id)["by_status"] == {"pending": 5}
@@ -0,0 +1,40 @@
+"""
+Email staging: big runs are rendered on spawned pool processes, with the
+same payloads as in-process.
+"""
+from app.services.email import email_staging
+from app.services.email.email_staging import build_payloads, decode_payload, render_staged_payloads
+
+CAMPAIGN_CTX = {
+    "campaign_name": "Show",
+    "campaign_location": "Paris",
+    "sender_name": "The Team",
+    "distributor_name": None,
+}
+
+
+def jobs(count: int):
+    return [
+        {
+            "contact_id": i,
+            "to_email": f"p{i}@staging.test",
+            "subject": "Nice to meet you",
+            "prospect_vars": {"first_name": "P", "last_name": str(i), "company_name": "Acme"},
+            "reply_to_message_id": None,
+        }
+        for i in range(count)
+    ]
+
+
+def test_pool_renders_like_in_process(monkeypatch):
+    monkeypatch.setattr(email_staging, "EMAIL_STAGING_PROCESS_THRESHOLD", 2)
+    monkeypatch.setattr(email_staging, "EMAIL_STAGING_CHUNK_SIZE", 2)
+    monkeypatch.setattr(email_staging, "EMAIL_STAGING_PROCESSES", 2)
+
+    pooled = render_staged_payloads({"initial.html": jobs(4)}, CAMPAIGN_CTX, "outlook", None)
+    local = build_payloads("initial.html", CAMPAIGN_CTX, "outlook", None, jobs(4))
+
+    assert [error for _, _, error in pooled] == [None] * 4
+    assert [(contact_id, decode_payload(payload)) for contact_id, payload, _ in pooled] == [
+        (contact_id, decode_payload(payload)) for contact_id, payload, _ in local
+    ]
@@ -0,0 +1,53 @@
+"""
+Gmail service cache: one service per user for every thread, requests on an
+http connection of the calling thread.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from google.oauth2.credentials import Credentials
+
+from app.services.email import gmail_client
+from app.services.email.gmail_client import get_gmail_service, invalidate_gmail_service
+
+
+@pytest.fixture(autouse=True)
+def empty_cache():
+    gmail_client._services.clear()
+    yield
+    gmail_client._services.clear()
+
+
+def request_http(credentials: Credentials):
+    """(service, http of a request) as seen from the calling thread."""
+    service = get_gmail_service(1, credentials)
+    return service, service.users().messages().get(userId="me", id="m1").http
+
+
+def test_service_is_shared_by_short_lived_pools():
+    credentials = Credentials(token="token")
+    cached, _ = request_http(credentials)
+
+    # Two bulk runs, each on its own new pool
+    runs = []
+    for _ in range(2):
+        with ThreadPoolExecutor(max_workers=2) as executor:
+            runs.extend(executor.map(lambda _: request_http(credentials), range(4)))
+
+    assert all(service is cached for service, _ in runs)
+    assert len(gmail_client._services) == 1
+
+    # Same thread, same connection
+    _, http = request_http(credentials)
+    assert request_http(credentials)[1] is http
+    assert all(other is not http for _, other in runs)
+
+
+def test_new_token_or_invalidation_rebuilds_the_service():
+    service = get_gmail_service(1, Credentials(token="token"))
+
+    assert get_gmail_service(1, Credentials(token="refreshed")) is not service
+
+    service = get_gmail_service(1, Credentials(token="refreshed"))
+    invalidate_gmail_service(1)
+    assert get_gmail_service(1, Credentials(token="refreshed")) is not service
@@ -0,0 +1,87 @@
+"""
+Incremental Gmail reply sync: the checkpoint only moves past messages that
+were looked at (or deleted since).
+"""
+from datetime import date
+
+import httplib2
+import pytest
+from googleapiclient.errors import HttpError
+
+from app.models.campaign import Campaign, CampaignContact
+from app.models.prospect import Prospect, ProspectSource
+from app.models.user import User
+from app.services.email import gmail_sync
+
+
+def http_error(status: int) -> HttpError:
+    return HttpError(httplib2.Response({"status": status}), b"{}")
+
+
+@pytest.fixture
+def user(db, monkeypatch):
+    user = User(email="owner@sync.test", gmail_connected=True, gmail_history_id="100")
+    db.add(user)
+    db.flush()
+    campaign = Campaign(user_id=user.id, name="Show", event_date=date(2026, 1, 1))
+    prospect = Prospect(user_id=user.id, first_name="P", last_name="1", email="p1@sync.test", source=ProspectSource.other)
+    db.add_all([campaign, prospect])
+    db.flush()
+    db.add(CampaignContact(campaign_id=campaign.id, prospect_id=prospect.id, status="contacted", email_thread_id="t1"))
+    db.commit()
+
+    monkeypatch.setattr(gmail_sync, "get_user_gmail_service", lambda user, db: None)
+    monkeypatch.setattr(
+        gmail_sync, "_list_new_messages",
+        lambda service, user_id, start, threads: ({"m1": "t1", "m2": "t1"}, "200")
+    )
+    return user
+
+
+def fetched(monkeypatch, results):
+    monkeypatch.setattr(gmail_sync, "execute_gmail_batch", lambda **kwargs: results)
+
+
+def test_failed_fetch_keeps_the_checkpoint(db, user, monkeypatch):
+    fetched(monkeypatch, {"m1": (None, http_error(503)), "m2": (None, http_error(404))})
+
+    result = gmail_sync.sync_gmail_replies(user, db)
+
+    assert result["mode"] == "incremental"
+    assert len(result["errors"]) == 1
+    assert "503" in result["errors"][0]["error"]
+    assert user.gmail_history_id == "100"
+
+
+def test_deleted_messages_are_skipped(db, user, monkeypatch):
+    fetched(monkeypatch, {"m1": (None, http_error(404)), "m2": (None, http_error(404))})
+
+    result = gmail_sync.sync_gmail_replies(user, db)
+
+    assert result["errors"] == []
+    assert user.gmail_history_id == "200"
+
+
+def test_full_check_with_errors_is_run_again(db, user, monkeypatch):
+    class Profile:
+        def users(self):
+            return self
+
+        def getProfile(self, userId):
+            return self
+
+        def execute(self):
+            return {"historyId": "300"}
+
+    user.gmail_history_id = None
+    monkeypatch.setattr(gmail_sync, "get_user_gmail_service", lambda user, db: Profile())
+    monkeypatch.setattr(
+        gmail_sync, "check_gmail_threads_for_responses",
+        lambda user, db, threads: {"t1": {"error": "Failed to check Gmail thread: 500", "not_found": False}}
+    )
+
+    result = gmail_sync.sync_gmail_replies(user, db)
+
+    assert result["mode"] == "full"
+    assert len(result["errors"]) == 1
+    assert user.gmail_history_id is None
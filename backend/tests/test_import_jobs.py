@@ -0,0 +1,135 @@
+"""
+Background import jobs: failed runs are retried with backoff, jobs left
+behind by a dead worker are queued again, the file is kept until the job
+is completed or failed.
+"""
+from datetime import datetime, timedelta
+
+import pytest
+from sqlalchemy.orm import Session
+
+from app.core.config import IMPORT_JOB_STALE_AFTER, IMPORT_JOB_TIMEOUT
+from app.models.import_job import ImportJob, ImportJobStatus
+from app.models.user import User
+from app.services.imports import jobs
+
+
+@pytest.fixture
+def enqueued(connection, monkeypatch):
+    """Jobs run against the test transaction, enqueued tasks are recorded instead of run."""
+    calls = []
+    monkeypatch.setattr(
+        jobs, "SessionLocal",
+        lambda: Session(bind=connection, join_transaction_mode="create_savepoint", autoflush=False)
+    )
+    monkeypatch.setattr(jobs, "enqueue", lambda *args, **kwargs: calls.append((args, kwargs)))
+    monkeypatch.setattr(jobs, "IMPORT_MAX_ATTEMPTS", 3)
+    monkeypatch.setattr(jobs, "IMPORT_RETRY_DELAY", 30)
+    return calls
+
+
+@pytest.fixture
+def add_job(db, tmp_path):
+    user = User(email="owner@jobs.test")
+    db.add(user)
+    db.flush()
+
+    def add(status: ImportJobStatus, attempts: int = 0, idle: int = 0) -> ImportJob:
+        file_path = tmp_path / f"{status.value}-{attempts}-{idle}.csv"
+        file_path.write_text("item_number,name\nA-1,Widget\n")
+
+        job = ImportJob(
+            id=f"{status.value}-{attempts}-{idle}",
+            user_id=user.id,
+            kind="products",
+            filename="catalog.csv",
+            file_path=str(file_path),
+            status=status,
+            attempts=attempts,
+            updated_at=datetime.utcnow() - timedelta(seconds=idle),
+        )
+        db.add(job)
+        db.commit()
+        return job
+
+    return add
+
+
+def test_failed_run_is_retried_with_backoff_then_failed(db, add_job, enqueued, monkeypatch):
+    def fail(db, job):
+        raise RuntimeError("disk full")
+
+    monkeypatch.setattr(jobs, "_run", fail)
+    job = add_job(ImportJobStatus.QUEUED)
+
+    for delay in (30, 60):
+        jobs.run_import_job(job.id)
+        db.refresh(job)
+
+        assert job.status == ImportJobStatus.QUEUED
+        assert job.last_error == "disk full"
+        assert enqueued[-1] == (
+            (jobs.IMPORT_QUEUE_NAME, jobs.run_import_job, job.id),
+            {"delay": delay, "job_timeout": IMPORT_JOB_TIMEOUT}
+        )
+        with open(job.file_path):
+            pass  # Kept for the next attempt
+
+    jobs.run_import_job(job.id)
+    db.refresh(job)
+
+    assert job.status == ImportJobStatus.FAILED
+    assert job.attempts == 3
+    assert job.finished_at is not None
+    assert len(enqueued) == 2
+    with pytest.raises(FileNotFoundError):
+        open(job.file_path)
+
+
+def test_sweep_requeues_stale_jobs(db, add_job, enqueued):
+    stale = IMPORT_JOB_STALE_AFTER + 60
+
+    dead = add_job(ImportJobStatus.RUNNING, attempts=1, idle=stale)
+    dead_last_attempt = add_job(ImportJobStatus.RUNNING, attempts=3, idle=stale)
+    alive = add_job(ImportJobStatus.RUNNING, attempts=1)
+    lost = add_job(ImportJobStatus.QUEUED, idle=stale)
+    waiting = add_job(ImportJobStatus.QUEUED)
+
+    result = jobs.requeue_stale_import_jobs(db)
+    db.expire_all()
+
+    assert result == {"requeued": 2, "failed": 1}
+    assert sorted(args[2] for args, _ in enqueued) == sorted([dead.id, lost.id])
+    assert all(kwargs["job_timeout"] == IMPORT_JOB_TIMEOUT for _, kwargs in enqueued)
+
+    assert dead.status == ImportJobStatus.QUEUED
+    assert dead_last_attempt.status == ImportJobStatus.FAILED
+    assert alive.status == ImportJobStatus.RUNNING
+    assert waiting.status == ImportJobStatus.QUEUED
+    with pytest.raises(FileNotFoundError):
+        open(dead_last_attempt.file_path)
+
+    # Touched: not enqueued twice by the next sweep
+    assert jobs.requeue_stale_import_jobs(db) == {"requeued": 0, "failed": 0}
+
+
+def test_in_process_startup_resumes_orphaned_running_jobs(db, add_job, enqueued, monkeypatch):
+    monkeypatch.setattr(jobs, "uses_redis", lambda: False)
+    orphan = add_job(ImportJobStatus.RUNNING, attempts=1)
+
+    assert jobs.resume_import_jobs() == 1
+    db.expire_all()
+
+    assert orphan.status == ImportJobStatus.QUEUED
+    assert enqueued[0][0][2] == orphan.id
+
+
+def test_startup_with_redis_leaves_running_jobs_to_their_worker(db, add_job, enqueued, monkeypatch):
+    monkeypatch.setattr(jobs, "uses_redis", lambda: True)
+    running = add_job(ImportJobStatus.RUNNING, attempts=1)
+
+    assert jobs.resume_import_jobs() == 0
+    db.expire_all()
+
+    assert running.status == ImportJobStatus.RUNNING
+    assert enqueued == []
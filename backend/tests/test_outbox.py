@@ -0,0 +1,88 @@
+"""
+Outbox: bulk sends write one outbox email per contact and step, handed to
+the workers once written.
+"""
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from app.core.config import OUTBOX_STALE_AFTER
+from app.models.campaign import Campaign, CampaignContact
+from app.models.outbox import OutboxEmail, OutboxStatus
+from app.models.prospect import Prospect, ProspectSource
+from app.models.user import User
+from app.services.outbox import outbox_service, worker
+from app.services.outbox.outbox_service import enqueue_campaign_emails, get_job_progress
+
+
+@pytest.fixture
+def enqueued(monkeypatch):
+    """Outbox ids handed to the workers (not run)."""
+    outbox_ids = []
+    monkeypatch.setattr(outbox_service, "enqueue", lambda queue, func, outbox_id: outbox_ids.append(outbox_id))
+    return outbox_ids
+
+
+@pytest.fixture
+def campaign(db):
+    user = User(email="owner@outbox.test", gmail_connected=True)
+    db.add(user)
+    db.flush()
+    campaign = Campaign(user_id=user.id, name="Show", event_date=date(2026, 1, 1))
+    prospects = [
+        Prospect(user_id=user.id, first_name="P", last_name=str(i), email=f"p{i}@outbox.test", source=ProspectSource.other)
+        for i in range(3)
+    ]
+    db.add_all([campaign, *prospects])
+    db.flush()
+    db.add_all([CampaignContact(campaign_id=campaign.id, prospect_id=prospect.id) for prospect in prospects])
+    db.commit()
+    return campaign
+
+
+def contacts(db, campaign):
+    return db.query(CampaignContact).filter(CampaignContact.campaign_id == campaign.id).all()
+
+
+def test_bulk_send_queues_each_contact_once(db, campaign, enqueued):
+    user = db.get(User, campaign.user_id)
+
+    first = enqueue_campaign_emails(db, campaign, contacts(db, campaign), user)
+
+    assert first["queued"] == 3
+    assert sorted(enqueued) == sorted(id for (id,) in db.query(OutboxEmail.id))
+    assert get_job_progress(db, user.id, first["job_id"])["ready"] == 3
+
+    # Nothing left to send: no job to poll
+    again = enqueue_campaign_emails(db, campaign, contacts(db, campaign), user)
+
+    assert again == {"job_id": None, "queued": 0, "skipped": 3}
+    assert len(enqueued) == 3
+
+
+def test_sweep_publishes_drafts_of_an_interrupted_request(db, campaign, monkeypatch):
+    enqueued = []
+    monkeypatch.setattr(worker, "enqueue", lambda queue, func, outbox_id: enqueued.append(outbox_id))
+
+    contact = contacts(db, campaign)[0]
+    draft = OutboxEmail(
+        user_id=campaign.user_id,
+        campaign_id=campaign.id,
+        campaign_contact_id=contact.id,
+        job_id="interrupted",
+        status=OutboxStatus.DRAFT,
+        sequence_step=0,
+        idempotency_key=f"{contact.id}:0",
+        attempts=0,
+        updated_at=datetime.utcnow() - timedelta(seconds=OUTBOX_STALE_AFTER + 60),
+    )
+    db.add(draft)
+    db.commit()
+
+    assert get_job_progress(db, campaign.user_id, "interrupted")["draft"] == 1
+
+    worker.requeue_stale_outbox_emails(db)
+    db.refresh(draft)
+
+    assert draft.status == OutboxStatus.READY
+    assert enqueued == [draft.id]
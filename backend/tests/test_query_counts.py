@@ -0,0 +1,104 @@
+"""
+Statement counts of the campaign list routes: constant whatever the number
+of rows (no query per contact / product).
+"""
+from datetime import date, datetime, timedelta
+from itertools import count
+
+import pytest
+
+from app.models.campaign import Campaign, CampaignContact, CampaignProduct
+from app.models.product import Product
+from app.models.prospect import Prospect, ProspectSource
+from app.models.user import User
+from app.routes.campaigns import list_campaign_contacts, list_campaign_products
+from app.routes.followups import get_scheduled_followups
+
+_ids = count()
+
+
+@pytest.fixture
+def user(db):
+    user = User(email="owner@counts.test", outlook_connected=True)
+    db.add(user)
+    db.flush()
+    return user
+
+
+@pytest.fixture
+def campaign(db, user):
+    campaign = Campaign(user_id=user.id, name="Show", event_date=date(2026, 1, 1))
+    db.add(campaign)
+    db.flush()
+    return campaign
+
+
+def add_contacts(db, user, campaign, n):
+    """n prospects linked to the campaign, contacted, follow-up scheduled."""
+    now = datetime.utcnow()
+    for _ in range(n):
+        i = next(_ids)
+        prospect = Prospect(
+            user_id=user.id, first_name="P", last_name=str(i),
+            email=f"p{i}@counts.test", source=ProspectSource.trade_show
+        )
+        db.add(prospect)
+        db.flush()
+        db.add(CampaignContact(
+            campaign_id=campaign.id, prospect_id=prospect.id, status="contacted",
+            email_sequence_step=1, last_email_sent_at=now,
+            next_follow_up_scheduled_at=now + timedelta(days=3)
+        ))
+    db.flush()
+
+
+def add_products(db, user, campaign, n):
+    for _ in range(n):
+        i = next(_ids)
+        product = Product(user_id=user.id, item_number=f"ITEM-{i}", name=f"Product {i}")
+        db.add(product)
+        db.flush()
+        db.add(CampaignProduct(campaign_id=campaign.id, product_id=product.id))
+    db.flush()
+
+
+def _list_contacts(db, user, campaign):
+    page = list_campaign_contacts(
+        campaign_id=campaign.id, limit=500, cursor=None, status_filter=None,
+        sequence_step=None, responded=None, followup_due=None,
+        sort="added_at", order="asc", db=db, current_user=user
+    )
+    return len(page.items)
+
+
+def test_list_campaign_contacts_query_count(db, user, campaign, count_queries):
+    add_contacts(db, user, campaign, 2)
+    few = count_queries(_list_contacts, db, user, campaign)
+
+    add_contacts(db, user, campaign, 50)
+    assert _list_contacts(db, user, campaign) == 52
+    assert count_queries(_list_contacts, db, user, campaign) == few
+
+
+def test_list_campaign_products_query_count(db, user, campaign, count_queries):
+    def run():
+        return list_campaign_products(campaign_id=campaign.id, db=db, current_user=user)
+
+    add_products(db, user, campaign, 2)
+    few = count_queries(run)
+
+    add_products(db, user, campaign, 50)
+    assert len(run()) == 52
+    assert count_queries(run) == few
+
+
+def test_get_scheduled_followups_query_count(db, user, campaign, count_queries):
+    def run():
+        return get_scheduled_followups(campaign_id=campaign.id, db=db, current_user=user)
+
+    add_contacts(db, user, campaign, 2)
+    few = count_queries(run)
+
+    add_contacts(db, user, campaign, 50)
+    assert run().total_scheduled == 52
+    assert count_queries(run) == few
@@ -0,0 +1,142 @@
+"""
+Query plans of the hot campaign_contacts queries on a large table: each one
+must read its index (migration 8d1e4f6a2b57), not scan every contact.
+"""
+from datetime import date, datetime
+from typing import Any, Dict, Iterator
+
+import pytest
+from sqlalchemy import Integer, bindparam, insert, text
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.engine import Connection, Engine
+from sqlalchemy.orm import Session
+
+from tests.conftest import explain, plan_indexes, recorded_statements
+
+CAMPAIGNS = 100
+CONTACTS_PER_CAMPAIGN = 10_000
+
+# Contact i of each campaign: 70% pending, 25% contacted (1 in 25 with a
+# follow-up due), 5% replied. Generated by the server, 1M rows in seconds.
+SEED_CONTACTS = text("""
+    INSERT INTO campaign_contacts (
+        campaign_id, prospect_id, status, email_sequence_step, email_thread_id,
+        next_follow_up_scheduled_at, added_at
+    )
+    SELECT
+        c.id,
+        p.id,
+        CASE WHEN p.i % 20 BETWEEN 14 AND 18 THEN 'contacted' WHEN p.i % 20 = 19 THEN 'replied' ELSE 'pending' END,
+        CASE WHEN p.i % 20 BETWEEN 14 AND 18 THEN 1 ELSE 0 END,
+        CASE WHEN p.i % 20 BETWEEN 14 AND 18 THEN 'conv-' || c.id || '-' || p.i END,
+        CASE
+            WHEN p.i % 20 BETWEEN 14 AND 18 AND p.i % 25 = 0 THEN :now - interval '1 hour'
+            WHEN p.i % 20 BETWEEN 14 AND 18 THEN :now + interval '7 days'
+        END,
+        :now - p.i * interval '1 second'
+    FROM unnest(:campaign_ids) AS c(id)
+    CROSS JOIN (SELECT id, n - 1 AS i FROM unnest(:prospect_ids) WITH ORDINALITY AS u(id, n)) AS p
+""").bindparams(
+    bindparam("campaign_ids", type_=ARRAY(Integer)),
+    bindparam("prospect_ids", type_=ARRAY(Integer)),
+)
+
+
+@pytest.fixture(scope="module")
+def large_db(engine: Engine) -> Iterator[Dict[str, Any]]:
+    """
+    100 campaigns of 10,000 contacts (1,000,000 rows), rolled back at the
+    end: 70% pending, 25% contacted (1 in 25 with a follow-up due), 5% replied.
+    The tested user owns 2 campaigns, the others belong to 49 other users.
+    """
+    from app.models.campaign import Campaign, TradeShowStatus
+    from app.models.prospect import Prospect, ProspectSource, ProspectStatus
+    from app.models.user import User
+
+    now = datetime.utcnow()
+
+    with engine.connect() as connection:
+        transaction = connection.begin()
+
+        user_ids = connection.execute(insert(User).returning(User.id), [
+            {"email": f"user{i}@plans.test", "outlook_connected": True, "created_at": now, "updated_at": now}
+            for i in range(50)
+        ]).scalars().all()
+
+        campaign_ids = connection.execute(insert(Campaign).returning(Campaign.id), [
+            {"user_id": user_ids[i // 2], "name": f"Show {i}", "event_date": date(2026, 1, 1),
+             "status": TradeShowStatus.UPCOMING, "created_at": now, "updated_at": now}
+            for i in range(CAMPAIGNS)
+        ]).scalars().all()
+
+        prospect_ids = connection.execute(insert(Prospect).returning(Prospect.id), [
+            {"user_id": user_ids[0], "first_name": "P", "last_name": str(i), "email": f"p{i}@plans.test",
+             "source": ProspectSource.trade_show, "status": ProspectStatus.new, "created_at": now, "updated_at": now}
+            for i in range(CONTACTS_PER_CAMPAIGN)
+        ]).scalars().all()
+
+        connection.execute(SEED_CONTACTS, {
+            "campaign_ids": campaign_ids,
+            "prospect_ids": prospect_ids,
+            "now": now,
+        })
+        connection.execute(text("ANALYZE users, campaigns, prospects, campaign_contacts, outbox_emails"))
+
+        try:
+            yield {
+                "connection": connection,
+                "user_id": user_ids[0],
+                "campaign_id": campaign_ids[0],
+            }
+        finally:
+            transaction.rollback()
+
+
+def _indexes_read(engine: Engine, connection: Connection, run) -> set:
+    """Indexes read by the statements of run(session)."""
+    session = Session(bind=connection, join_transaction_mode="create_savepoint")
+    try:
+        with recorded_statements(engine) as statements:
+            run(session)
+    finally:
+        session.close()
+
+    assert statements
+    indexes = set()
+    for statement in statements:
+        indexes |= plan_indexes(explain(connection, statement))
+    return indexes
+
+
+def test_due_followups_use_followup_due_index(engine, large_db):
+    from app.services.outbox.scheduler import load_due_followups
+
+    indexes = _indexes_read(
+        engine, large_db["connection"],
+        lambda db: load_due_followups(db, datetime.utcnow())
+    )
+    assert "ix_campaign_contacts_followup_due" in indexes
+
+
+def test_open_conversations_use_open_threads_index(engine, large_db):
+    from app.services.email.outlook_sync import _get_open_conversations
+
+    indexes = _indexes_read(
+        engine, large_db["connection"],
+        lambda db: _get_open_conversations(db, large_db["user_id"])
+    )
+    assert "ix_campaign_contacts_open_threads" in indexes
+
+
+def test_contacts_by_status_use_campaign_status_index(engine, large_db):
+    from app.models.campaign import CampaignContact
+
+    # Contacts of a campaign selected by status (bulk send / staging)
+    indexes = _indexes_read(
+        engine, large_db["connection"],
+        lambda db: db.query(CampaignContact).filter(
+            CampaignContact.campaign_id == large_db["campaign_id"],
+            CampaignContact.status == "replied"
+        ).all()
+    )
+    assert "ix_campaign_contacts_campaign_status" in indexes